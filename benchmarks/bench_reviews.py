@@ -0,0 +1,90 @@
+"""
+Compares CPU time and peak memory of picking review lines out of a store
+page directly with parsing the whole page through BeautifulSoup.
+
+Usage:
+    >>> python -m benchmarks.bench_reviews [path/to/store_page.html ...]
+
+Store pages can be recorded with, e.g.:
+    >>> curl -b birthtime=536450401 http://store.steampowered.com/app/49520/
+
+Without paths, a synthetic page of ~400 KB is used.
+"""
+
+import random
+import sys
+import tracemalloc
+from unittest import mock
+
+from benchmarks.bench_title_index import best_of
+from steamCLI.steamapp import SteamApp
+
+ELEMENT = 'span'
+CLASSES = 'nonresponsive_hidden responsive_reviewdesc'
+
+
+def synthetic_store_page(size: int=400 * 1024) -> str:
+    """
+    Builds a page that resembles a store page: lots of nested markup and
+    scripts, with two review lines in the middle.
+    """
+
+    rng = random.Random(0)
+    filler = []
+    length = 0
+    while length < size:
+        words = ' '.join(rng.choice(['lorem', 'ipsum', 'dolor', 'sit', 'amet'])
+                         for _ in range(8))
+        block = (f'<div class="block_{rng.randrange(100)}"><a href="/app/'
+                 f'{rng.randrange(10 ** 6)}/"><img src="x.jpg" alt="{words}">'
+                 f'<span class="tag">{words}</span></a></div>\n')
+        filler.append(block)
+        length += len(block)
+
+    reviews = (f'<span class="{CLASSES}">\n\t\t- 90% of the 1,024 user reviews '
+               f'in the last 30 days are positive.\t</span>\n'
+               f'<span class="{CLASSES}">\n\t\t- 85% of the 16,855 user '
+               f'reviews for this game are positive.\t</span>\n')
+    script = '<script>var data = %s;</script>\n' % ('[1,2,3],' * 1000)
+    half = len(filler) // 2
+
+    return ('<html><head>' + script + '</head><body>' + ''.join(filler[:half]) +
+            reviews + ''.join(filler[half:]) + '</body></html>')
+
+
+def peak_memory(function) -> int:
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    if len(sys.argv) > 1:
+        pages = []
+        for path in sys.argv[1:]:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                pages.append((path, f.read()))
+    else:
+        pages = [('synthetic', synthetic_store_page())]
+
+    config = mock.Mock()
+    config.get_value.side_effect = lambda section, key: {
+        'reviews_element': ELEMENT, 'reviews_class': CLASSES}[key]
+    app = SteamApp(config=config)
+
+    for name, html in pages:
+        targeted = lambda: app._extract_review_text(html)
+        full = lambda: app._parse_review_text(html, ELEMENT, CLASSES)
+        assert targeted() == full(), f'{name}: review lines differ'
+
+        print(f'{name} ({len(html) / 1024:.0f} KB)')
+        print(f'  targeted:   {best_of(targeted) * 1000:10.3f} ms'
+              f' {peak_memory(targeted) / 1024:10.1f} KB peak')
+        print(f'  full parse: {best_of(full) * 1000:10.3f} ms'
+              f' {peak_memory(full) / 1024:10.1f} KB peak')
+
+
+if __name__ == '__main__':
+    main()
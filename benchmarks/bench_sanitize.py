@@ -0,0 +1,38 @@
+"""
+Compares sanitizing every title of the app list one at a time with
+sanitize_title() and in bulk with sanitize_titles().
+
+Usage:
+    >>> python -m benchmarks.bench_sanitize [path/to/applist.json]
+
+Without a path, a synthetic app list of 150k entries is used.
+"""
+
+import json
+import sys
+
+from benchmarks.bench_title_index import best_of, synthetic_app_list
+from steamCLI.utils import sanitize_title, sanitize_titles
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text = synthetic_app_list()
+
+    titles = [app['name'] for app in json.loads(text)['applist']['apps']]
+    assert [sanitize_title(title) for title in titles] == list(sanitize_titles(titles))
+
+    single = best_of(lambda: [sanitize_title(title) for title in titles])
+    bulk = best_of(lambda: list(sanitize_titles(titles)))
+
+    print(f'titles:           {len(titles)}')
+    print(f'sanitize_title:   {single * 1000:10.2f} ms')
+    print(f'sanitize_titles:  {bulk * 1000:10.2f} ms')
+    print(f'speedup:          {single / bulk:10.2f}x')
+
+
+if __name__ == '__main__':
+    main()
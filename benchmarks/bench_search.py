@@ -0,0 +1,58 @@
+"""
+Measures how quickly the fuzzy title index ranks near matches.
+
+Usage:
+    >>> python -m benchmarks.bench_search [path/to/applist.json]
+
+Without a path, a synthetic app list of 150k entries is used. Queries are
+titles from the list with a typo or with the last word missing.
+"""
+
+import json
+import random
+import sys
+import time
+
+from benchmarks.bench_title_index import synthetic_app_list
+from steamCLI.index import normalize_title
+from steamCLI.search import FuzzyIndex
+
+QUERIES = 500
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text = synthetic_app_list()
+
+    titles = [normalize_title(app['name'])
+              for app in json.loads(text)['applist']['apps']]
+
+    start = time.perf_counter()
+    index = FuzzyIndex.build(titles)
+    build = time.perf_counter() - start
+
+    rng = random.Random(0)
+    queries = []
+    for title in rng.sample(titles, QUERIES):
+        if ' ' in title and rng.random() < 0.5:
+            query = title.rsplit(' ', 1)[0]
+        else:
+            position = rng.randrange(len(title))
+            query = title[:position] + 'x' + title[position + 1:]
+        queries.append((query, title))
+
+    start = time.perf_counter()
+    found = sum(title in index.suggest(query) for query, title in queries)
+    elapsed = time.perf_counter() - start
+
+    print(f'titles:        {len(index.titles)}')
+    print(f'build (once):  {build * 1000:10.2f} ms')
+    print(f'suggest:       {elapsed / QUERIES * 1000:10.3f} ms per query')
+    print(f'recall @5:     {found / QUERIES:10.2%}')
+
+
+if __name__ == '__main__':
+    main()
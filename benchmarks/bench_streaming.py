@@ -0,0 +1,104 @@
+"""
+Compares time-to-match and peak memory of the streaming app list parser and
+the memory-mapped app id index with decoding the whole list through
+json.loads and an object_hook.
+
+Usage:
+    >>> python -m benchmarks.bench_streaming [path/to/applist.json]
+
+Without a path, a synthetic app list of 150k entries is used.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_title_index import synthetic_app_list
+from steamCLI.applist import CHUNK_SIZE, find_app_by_id, find_apps_by_title
+from steamCLI.index import AppIdIndex
+
+
+def file_chunks(path: str):
+    with open(path, 'rb') as f:
+        yield from iter(lambda: f.read(CHUNK_SIZE), b'')
+
+
+def object_hook_scan(path: str, title: str=None, app_id: int=None):
+    """ What SteamApp._extract_app_dictionary used to do. """
+
+    matches = []
+
+    def _decode_dictionary(dictionary):
+        try:
+            if title:
+                if dictionary["name"].lower() == title.lower():
+                    matches.append(dictionary)
+            elif dictionary["appid"] == app_id:
+                matches.append(dictionary)
+        except KeyError:
+            pass
+        return dictionary
+
+    with open(path, 'rb') as f:
+        text = f.read().decode('utf-8')
+    json.loads(text, object_hook=_decode_dictionary)
+    return matches
+
+
+def measure(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def report(label: str, elapsed: float, peak: int):
+    print(f'{label:34} {elapsed * 1000:9.2f} ms {peak / 2 ** 20:9.2f} MiB peak')
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        if len(sys.argv) > 1:
+            path = sys.argv[1]
+        else:
+            path = os.path.join(directory, 'applist.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(synthetic_app_list())
+
+        with open(path, encoding='utf-8') as f:
+            apps = json.load(f)['applist']['apps']
+        first, middle, last = apps[0], apps[len(apps) // 2], apps[-1]
+
+        for label, app in (('first', first), ('middle', middle), ('last', last)):
+            report(f'object_hook -id ({label})',
+                   *measure(lambda: object_hook_scan(path, app_id=app['appid'])))
+            report(f'streaming -id ({label})',
+                   *measure(lambda: find_app_by_id(file_chunks(path), app['appid'])))
+
+        index_path = os.path.join(directory, 'appids.idx')
+        with open(path, encoding='utf-8') as f:
+            data = AppIdIndex.build(f.read())
+        with open(index_path, 'wb') as f:
+            f.write(data)
+
+        def mapped_lookup():
+            index = AppIdIndex.open(index_path)
+            index.lookup(last['appid'])
+            index.close()
+
+        report('mmap index -id (open + lookup)', *measure(mapped_lookup))
+
+        report('object_hook -t',
+               *measure(lambda: object_hook_scan(path, title=middle['name'])))
+        report('streaming -t',
+               *measure(lambda: find_apps_by_title(file_chunks(path), middle['name'])))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Compares title resolution through the prebuilt title index with the
+streaming scan of the whole app list.
+
+Usage:
+    >>> python -m benchmarks.bench_title_index [path/to/applist.json]
+
+Without a path, a synthetic app list of 150k entries is used.
+"""
+
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from steamCLI.index import TitleIndex
+from steamCLI.steamapp import SteamApp
+
+REPEATS = 5
+
+
+def synthetic_app_list(size: int=150000) -> str:
+    rng = random.Random(0)
+    apps = []
+    for appid in range(size):
+        words = (''.join(rng.choices(string.ascii_letters, k=rng.randint(3, 9)))
+                 for _ in range(rng.randint(1, 4)))
+        apps.append({"appid": appid * 10, "name": ' '.join(words)})
+    return json.dumps({"applist": {"apps": apps}})
+
+
+def best_of(function, repeats: int=REPEATS) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text = synthetic_app_list()
+
+    apps = json.loads(text)['applist']['apps']
+    title = apps[len(apps) // 2]['name']
+
+    app = SteamApp(config='unused')
+    chunks = [text.encode('utf-8')]
+    with mock.patch.object(SteamApp, '_pick_complete_json',
+                           lambda self, d, region, deadline=None: d):
+        scan = best_of(lambda: app._extract_app_dictionary(chunks, title=title))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'titles.json')
+        build = best_of(lambda: TitleIndex.build(text).save(path), repeats=1)
+        load = best_of(lambda: TitleIndex.load(path))
+        index = TitleIndex.load(path)
+        probe = best_of(lambda: index.lookup(title), repeats=1000)
+
+    print(f'apps in list:             {len(apps)}')
+    print(f'streaming scan:           {scan * 1000:10.2f} ms per lookup')
+    print(f'index build (once):       {build * 1000:10.2f} ms')
+    print(f'index load (per process): {load * 1000:10.2f} ms')
+    print(f'index probe:              {probe * 1e6:10.2f} us per lookup')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,490 @@
+import codecs
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from itertools import chain
+from typing import Callable, Iterable, Iterator, List, Optional, Pattern
+
+import requests
+
+from steamCLI.deadline import Deadline, DeadlineExceeded
+from steamCLI.index import AppIdIndex, TitleIndex, normalize_title
+from steamCLI.search import FuzzyIndex
+from steamCLI.utils import write_atomically
+
+CHUNK_SIZE = 64 * 1024
+# App dicts are tiny. If something that looks like one does not decode after
+# this many characters, it is malformed rather than cut off by a chunk.
+MAX_OBJECT_SIZE = 64 * 1024
+
+APP_KEY = re.compile(r'"appid"\s*:')
+# Letters and digits are never escaped in JSON, hence they can be searched
+# for in the raw text.
+LITERAL_RUN = re.compile(r'[A-Za-z0-9]+')
+
+
+class AppListCache:
+    """
+    Keeps a copy of Steam's app list on disk, so that it does not have to be
+    downloaded on every run.
+
+    The list weighs many megabytes and changes slowly, hence a copy that is
+    older than the TTL is still served. A fresh one is downloaded in the
+    background, so that the next lookup picks it up.
+    """
+
+    # Other processes may be refreshing the same file. If their lock is older
+    # than this (in seconds), we assume they have crashed.
+    lock_timeout = 600
+
+    def __init__(self, directory: str, ttl: int,
+                 fetch: Callable[[str], Iterable[bytes]],
+                 filename: str='applist.json',
+                 index_filename: str='titles.json',
+                 appid_index_filename: str='appids.idx',
+                 fuzzy_index_filename: str='fuzzy.idx'):
+        """
+        :param directory: folder in which the app list should be kept.
+        :param ttl: seconds for which a downloaded app list is fresh.
+        :param fetch: callable that streams response bytes given a url.
+        :param filename: name of the file in which the app list is stored.
+        :param index_filename: name of the file in which the title index is
+                               stored.
+        :param appid_index_filename: name of the file in which the app id
+                                     index is stored.
+        :param fuzzy_index_filename: name of the file in which the fuzzy
+                                     title index is stored.
+        """
+
+        self.directory = os.path.expanduser(directory)
+        self.path = os.path.join(self.directory, filename)
+        self.index_path = os.path.join(self.directory, index_filename)
+        self.appid_index_path = os.path.join(self.directory,
+                                             appid_index_filename)
+        self.fuzzy_index_path = os.path.join(self.directory,
+                                             fuzzy_index_filename)
+        self.ttl = ttl
+        self.fetch = fetch
+
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+        self._title_index = None
+        self._appid_index = None
+        self._fuzzy_index = None
+        # Attribute name of an index -> (source mtime, Future) of its build.
+        self._builds = {}
+
+    @classmethod
+    def from_config(cls, config, fetch: Callable[[str], Iterable[bytes]]):
+        """
+        Creates a cache with settings taken from the configuration file.
+        """
+
+        directory = config.get_value('Cache', 'directory')
+        ttl = config.get_int('Cache', 'applist_ttl')
+
+        return cls(directory, ttl, fetch=fetch)
+
+    def title_index(self, origin: str, deadline: Deadline=None) -> TitleIndex:
+        """
+        Returns the title index of the current app list.
+
+        The index is kept in memory and on disk. It is rebuilt only when the
+        app list it was built from has been replaced.
+
+        :param origin: url to resource: where a list of games is located.
+        :param deadline: time budget of the caller. DeadlineExceeded is
+                         raised if the list or the index is not ready in
+                         time (the index is still built, for later calls).
+        """
+
+        self._ensure_copy(origin, deadline)
+
+        source_mtime = os.path.getmtime(self.path)
+        index = self._title_index
+        if index and index.source_mtime == source_mtime:
+            return index
+
+        def _build():
+            index = TitleIndex.load(self.index_path, source_mtime=source_mtime)
+            if not index:
+                index = TitleIndex.build(self._read(), source_mtime=source_mtime)
+                index.save(self.index_path)
+            return index
+
+        return self._build_once('_title_index', source_mtime, _build, deadline)
+
+    def appid_index(self, origin: str, deadline: Deadline=None) -> AppIdIndex:
+        """
+        Returns the memory-mapped app id index of the current app list.
+
+        The index file is shared by all processes that use the same cache
+        directory. It is rebuilt only when the app list it was built from has
+        been replaced.
+
+        :param origin: url to resource: where a list of games is located.
+        :param deadline: time budget of the caller (see title_index()).
+        """
+
+        self._ensure_copy(origin, deadline)
+
+        source_mtime = os.path.getmtime(self.path)
+        index = self._appid_index
+        if index is not None and index.source_mtime == source_mtime:
+            return index
+
+        def _build():
+            index = AppIdIndex.open(self.appid_index_path,
+                                    source_mtime=source_mtime)
+            if index is None:
+                data = AppIdIndex.build(self._read(), source_mtime=source_mtime)
+                write_atomically(self.appid_index_path, [data])
+                index = AppIdIndex.open(self.appid_index_path,
+                                        source_mtime=source_mtime)
+            return index
+
+        # Previous index (if any) is unmapped once nothing refers to it.
+        return self._build_once('_appid_index', source_mtime, _build, deadline)
+
+    def fuzzy_index(self, origin: str, deadline: Deadline=None) -> FuzzyIndex:
+        """
+        Returns the fuzzy title index of the current app list. It is built
+        from the title index, and only when a title is not found, as that
+        takes a couple of seconds.
+
+        :param origin: url to resource: where a list of games is located.
+        :param deadline: time budget of the caller (see title_index()).
+        """
+
+        titles = self.title_index(origin, deadline)
+        index = self._fuzzy_index
+        if index and index.source_mtime == titles.source_mtime:
+            return index
+
+        def _build():
+            index = FuzzyIndex.load(self.fuzzy_index_path,
+                                    source_mtime=titles.source_mtime)
+            if not index:
+                index = FuzzyIndex.build(titles.titles,
+                                         source_mtime=titles.source_mtime)
+                index.save(self.fuzzy_index_path)
+            return index
+
+        return self._build_once('_fuzzy_index', titles.source_mtime, _build,
+                                deadline)
+
+    def _build_once(self, name: str, source_mtime: float, build: Callable,
+                    deadline: Deadline=None):
+        """
+        Loads or builds an index, unless another thread is already doing so
+        for the same app list, in which case its result is shared. Otherwise
+        every caller that arrives after a refresh would rebuild the index on
+        its own, and all of them would stall.
+
+        The build runs in a thread of its own, so that a caller whose
+        deadline runs out can give up without cancelling it.
+
+        :param name: attribute that holds the index.
+        :param source_mtime: mtime of the app list the index is built from.
+        :param build: callable that returns the index.
+        :param deadline: how long the caller may wait for the index.
+        """
+
+        with self._lock:
+            index = getattr(self, name)
+            if index is not None and index.source_mtime == source_mtime:
+                return index
+            pending = self._builds.get(name)
+            owner = pending is None or pending[0] != source_mtime
+            if owner:
+                pending = self._builds[name] = (source_mtime, Future())
+        future = pending[1]
+
+        def _run():
+            try:
+                index = build()
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                setattr(self, name, index)
+                future.set_result(index)
+            finally:
+                with self._lock:
+                    if self._builds.get(name) is pending:
+                        del self._builds[name]
+
+        if owner:
+            threading.Thread(target=_run, name=f'build{name}').start()
+
+        try:
+            return future.result(deadline.remaining() if deadline else None)
+        except FutureTimeout:
+            raise DeadlineExceeded("Ran out of time building the app list index.")
+
+    def age(self) -> float:
+        """
+        :return: seconds since the app list was last written to disk.
+        """
+
+        return time.time() - os.path.getmtime(self.path)
+
+    def is_stale(self) -> bool:
+        try:
+            return self.age() > self.ttl
+        except OSError:
+            return True
+
+    def refresh(self, origin: str, deadline: Deadline=None):
+        """
+        Downloads the app list and replaces the copy on disk. The download is
+        written as it arrives, so it is never held in memory as a whole.
+
+        :param origin: url to resource: where a list of games is located.
+        :param deadline: time budget of the download. The copy on disk is
+                         left as it was if it runs out.
+        """
+
+        if deadline is None:
+            write_atomically(self.path, self.fetch(origin))
+        else:
+            write_atomically(self.path, self.fetch(origin, deadline=deadline))
+
+    def refresh_in_background(self, origin: str):
+        """
+        Starts refreshing the app list in a separate thread, unless this or
+        another process is already doing so.
+
+        The thread is not a daemon: a short-lived process finishes the
+        download before exiting, so that the next run finds a fresh copy.
+        """
+
+        with self._lock:
+            if self._refresh_thread and self._refresh_thread.is_alive():
+                return
+            if not self._acquire_file_lock():
+                return
+            self._refresh_thread = threading.Thread(
+                target=self._background_refresh, args=(origin,),
+                name='applist-refresh')
+            self._refresh_thread.start()
+
+    def wait(self, timeout: float=None):
+        """ Blocks until a background refresh (if any) finishes. """
+
+        if self._refresh_thread:
+            self._refresh_thread.join(timeout)
+
+    def _ensure_copy(self, origin: str, deadline: Deadline=None):
+        if not os.path.isfile(self.path):
+            self.refresh(origin, deadline)
+        elif self.is_stale():
+            self.refresh_in_background(origin)
+
+    def _background_refresh(self, origin: str):
+        try:
+            self.refresh(origin)
+        except (requests.RequestException, OSError):
+            # Stale copy is still usable. Next run will try again.
+            pass
+        finally:
+            self._release_file_lock()
+
+    def _acquire_file_lock(self) -> bool:
+        lock_path = self.path + '.lock'
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            if time.time() - os.path.getmtime(lock_path) > self.lock_timeout:
+                os.remove(lock_path)
+        except OSError:
+            pass
+
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return False
+        return True
+
+    def _release_file_lock(self):
+        try:
+            os.remove(self.path + '.lock')
+        except OSError:
+            pass
+
+    def _read(self) -> str:
+        with open(self.path, encoding='utf-8') as f:
+            return f.read()
+
+
+def iter_apps(chunks: Iterable[bytes]) -> Iterator[dict]:
+    """
+    Yields app dicts (i.e. {"appid": int, "name": str}) from a stream of app
+    list bytes one at a time, without decoding the whole list.
+
+    :param chunks: app list, as returned by Steam's GetAppList API.
+    """
+
+    return _iter_objects(chunks)
+
+
+def find_app_by_id(chunks: Iterable[bytes], app_id: int) -> Optional[dict]:
+    """
+    Finds app dict with a given id. Only the dict itself is decoded, and the
+    stream is abandoned (which closes it) as soon as the dict is found.
+
+    :param chunks: app list, as returned by Steam's GetAppList API.
+    :param app_id: id of the to-be-found app.
+    :return: app dict, or None if there is no such app.
+    """
+
+    pattern = re.compile(r'"appid"\s*:\s*%d(?![\d.])' % app_id)
+    objects = _iter_objects(chunks, anchor=pattern)
+    try:
+        for app in objects:
+            if app.get("appid") == app_id:
+                return app
+    finally:
+        objects.close()
+
+    return None
+
+
+def find_apps_by_title(chunks: Iterable[bytes], title: str) -> List[dict]:
+    """
+    Collects app dicts whose name matches a given title (case-insensitive).
+
+    Only dicts that contain the longest run of letters/digits of the title
+    are decoded. Titles without such a run have every dict decoded.
+
+    :param chunks: app list, as returned by Steam's GetAppList API.
+    :param title: title of the to-be-found apps.
+    """
+
+    runs = LITERAL_RUN.findall(title)
+    prefilter = None
+    if runs:
+        prefilter = re.compile(re.escape(max(runs, key=len)), re.IGNORECASE)
+
+    target = normalize_title(title)
+    return [app for app in _iter_objects(chunks, prefilter=prefilter)
+            if normalize_title(app.get("name", "")) == target]
+
+
+def _iter_objects(chunks: Iterable[bytes], anchor: Pattern=APP_KEY,
+                  prefilter: Pattern=None) -> Iterator[dict]:
+    """
+    Yields app objects (the ones with an "appid" key) whose key matches
+    anchor, and whose text matches prefilter (if any).
+
+    Objects of the list are flat, hence an object is complete once the key
+    of the next one has arrived (or the stream has ended), and only then it
+    is decoded. It starts at the nearest brace before its key that decodes
+    to an app object, so braces within names, and the objects that wrap the
+    list, are skipped.
+
+    Text is decoded chunk by chunk, and only a tail that might hold an
+    object cut off by the chunk boundary is kept between chunks, hence memory
+    use does not depend on the size of the stream.
+
+    :param chunks: bytes of a JSON document.
+    :param anchor: regex that matches the "appid" key of the wanted objects.
+    :param prefilter: regex that matches somewhere within the wanted
+                      objects. Others are not decoded at all.
+    """
+
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    buffer = ''
+
+    for chunk in chain(chunks, [None]):
+        final = chunk is None
+        buffer += utf8.decode(b'' if final else chunk, final=final)
+        position = 0
+        pending = None
+
+        while True:
+            search_from = position
+            if prefilter:
+                # Skip straight to the object around the next hit.
+                hit = prefilter.search(buffer, position)
+                if not hit:
+                    break
+                key = buffer.rfind('"appid"', position, hit.start())
+                search_from = key if key != -1 else position
+
+            match = anchor.search(buffer, search_from)
+            if not match:
+                break
+            following = APP_KEY.search(buffer, match.end())
+            if not following and not final:
+                # Object continues in the next chunk.
+                pending = match.start()
+                break
+
+            # The object lies between the key of the previous one and the
+            # key of the next one.
+            previous = buffer.rfind('"appid"', position, match.start())
+            lower = previous + len('"appid"') if previous != -1 else position
+            limit = following.start() if following else len(buffer)
+            found = None
+            if not prefilter or prefilter.search(buffer, lower, limit):
+                found = _decode_app(decoder, buffer,
+                                    max(lower, match.start() - MAX_OBJECT_SIZE),
+                                    match.start())
+            if found is None:
+                position = match.end()
+                continue
+
+            app, position = found
+            yield app
+
+        buffer = buffer[_tail_start(buffer, position, pending):]
+
+
+def _decode_app(decoder: json.JSONDecoder, buffer: str, lower: int,
+                key: int) -> Optional[tuple]:
+    """
+    Decodes the app object whose "appid" key starts at key.
+
+    :return: (app dict, where it ends), or None if it is malformed.
+    """
+
+    start = key
+    while True:
+        start = buffer.rfind('{', lower, start)
+        if start == -1:
+            return None
+        try:
+            found, end = decoder.raw_decode(buffer, start)
+        except ValueError:
+            # A brace within a name.
+            continue
+        if end <= key:
+            # An object within a name, e.g. "{}".
+            continue
+        if isinstance(found, dict) and "appid" in found:
+            return found, end
+        # An object that wraps the list: the app object itself is malformed.
+        return None
+
+
+def _tail_start(buffer: str, position: int, pending: int=None) -> int:
+    """
+    :param position: where the handled part of the buffer ends.
+    :param pending: where the key of an object that is not complete yet
+                    starts, if there is one. Otherwise, the last key in the
+                    buffer may still turn out to be such a key.
+    :return: where the part of the buffer that has to be kept starts: at the
+             key before the one of an incomplete object, as the object
+             starts after it.
+    """
+
+    key = pending if pending is not None else buffer.rfind('"appid"', position)
+    if key == -1:
+        return position
+    previous = buffer.rfind('"appid"', position, key)
+
+    return previous if previous != -1 else position
@@ -0,0 +1,250 @@
+import json
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, TextIO, Tuple
+
+import requests
+
+from steamCLI.catalog import Catalog
+from steamCLI.deadline import Deadline, DeadlineExceeded
+from steamCLI.steamapp import SteamApp
+
+
+def parse_entries(lines: Iterable[str]) -> Iterator[Tuple[str, int]]:
+    """
+    Turns lines of a batch file into (title, app id) pairs, one of which is
+    None. Lines that consist of digits only are app ids. Blank lines and
+    lines that start with '#' are skipped.
+
+    :param lines: titles or app ids, one per line.
+    """
+
+    for line in lines:
+        entry = line.strip()
+        if not entry or entry.startswith('#'):
+            continue
+        if entry.isdigit():
+            yield None, int(entry)
+        else:
+            yield entry, None
+
+
+def find_entry(app: SteamApp, app_list: str, title: str=None,
+               app_id: int=None, region: str=None, fuzzy: bool=False,
+               deadline: Deadline=None) -> bool:
+    """
+    Finds the app of a batch entry (see process_entry() for parameters).
+
+    :return: whether the app was found.
+    """
+
+    app.find_app(origin=app_list, region=region, title=title, app_id=app_id,
+                 deadline=deadline)
+    if not app.appID and title and fuzzy:
+        similar = app.suggest_titles(app_list, title, limit=1,
+                                     deadline=deadline)
+        if similar:
+            app.find_app(origin=app_list, region=region, title=similar[0],
+                         deadline=deadline)
+
+    return bool(app.appID)
+
+
+def process_entry(app: SteamApp, app_list: str, title: str=None,
+                  app_id: int=None, region: str=None, scores: bool=False,
+                  historical_low: bool=False, fuzzy: bool=False,
+                  deadline: Deadline=None) -> dict:
+    """
+    Runs a single batch entry through the same stages as a single lookup.
+    Scores and historical low are optional: once the deadline runs out, they
+    are left out and listed under 'partial'.
+
+    :param app: fresh SteamApp that should hold the information.
+    :param app_list: Steam's endpoint that has JSON of all the Steam apps.
+    :param title: title of the app (if there is no id).
+    :param app_id: id of the app (if there is no title).
+    :param region: region for which the information should be retrieved.
+    :param scores: whether review scores should be retrieved.
+    :param historical_low: whether historical low should be retrieved.
+    :param fuzzy: whether the closest title should be used when there is
+                  no exact match.
+    :param deadline: time budget of the entry. DeadlineExceeded is raised
+                     if it runs out before the app is found.
+    :return: JSON-serializable record with everything that was found.
+    """
+
+    record = {'query': title if title else app_id}
+
+    if not find_entry(app, app_list, title=title, app_id=app_id,
+                      region=region, fuzzy=fuzzy, deadline=deadline):
+        record['found'] = False
+        return record
+
+    partial = []
+    if scores:
+        try:
+            if deadline is not None:
+                deadline.check()
+            app.retrieve_review_scores(deadline=deadline)
+        except DeadlineExceeded:
+            partial.append('reviews')
+            scores = False
+        else:
+            # The page may have been cut short before the scores arrived.
+            if deadline is not None and deadline.expired():
+                partial.append('reviews')
+    historical_error = None
+    if historical_low:
+        try:
+            if deadline is not None:
+                deadline.check()
+            app.extract_historical_low(region, deadline=deadline)
+        except KeyError:
+            historical_error = "API key was not found"
+        except DeadlineExceeded:
+            partial.append('historical low')
+            historical_low = False
+
+    record['found'] = True
+    record.update(app_record(app, scores=scores,
+                             historical_low=historical_low and not historical_error))
+    if historical_error:
+        record['historical_error'] = historical_error
+    if partial:
+        record['partial'] = partial
+
+    return record
+
+
+def app_record(app: SteamApp, scores: bool=False,
+               historical_low: bool=False) -> dict:
+    """
+    :param app: SteamApp that has been found.
+    :param scores: whether review scores should be included.
+    :param historical_low: whether historical low should be included.
+    :return: JSON-serializable information about the app.
+    """
+
+    record = {
+        'appid': app.appID,
+        'title': app.title,
+        'currency': app.currency,
+        'initial_price': app.initial_price,
+        'final_price': app.final_price,
+        'discount': app.discount,
+    }
+    if scores:
+        record.update({
+            'overall_count': app.overall_count,
+            'overall_percent': app.overall_percent,
+            'recent_count': app.recent_count,
+            'recent_percent': app.recent_percent,
+        })
+    if historical_low:
+        record.update(_historical_low_record(app))
+
+    return record
+
+
+def _historical_low_record(app: SteamApp) -> dict:
+    return {
+        'historical_low': app.historical_low,
+        'historical_cut': app.historical_cut,
+        'historical_shop': app.historical_shop,
+    }
+
+
+def add_historical_lows(records: List[dict], catalog: Catalog,
+                        region: str=None):
+    """
+    Adds historical lows to the records of found apps, using a single ITAD
+    request per plains_batch titles instead of one request per app.
+
+    :param records: records returned by process_entry().
+    :param catalog: Catalog through which the lows should be retrieved.
+    :param region: region for which the lows should be retrieved.
+    """
+
+    found = [record for record in records if record.get('title')]
+    if not found:
+        return
+
+    apps = []
+    for record in found:
+        app = SteamApp(catalog.config, session=catalog.session)
+        app.appID, app.title = record.get('appid'), record['title']
+        apps.append(app)
+    try:
+        catalog.assign_historical_lows(apps, region=region)
+    except KeyError:
+        for record in found:
+            record['historical_error'] = "API key was not found"
+        return
+    except (requests.RequestException, ValueError) as e:
+        for record in found:
+            record['historical_error'] = str(e)
+        return
+
+    for record, app in zip(found, apps):
+        record.update(_historical_low_record(app))
+
+
+def run_batch(entries: Iterable[Tuple[str, int]], process: Callable[..., dict],
+              workers: int, output: TextIO=sys.stdout,
+              finish: Callable[[List[dict]], None]=None,
+              group_size: int=1) -> int:
+    """
+    Processes entries concurrently (but no more than workers at a time) and
+    writes a JSON line per entry as soon as it is done. Entries are read
+    lazily, hence input of any length can be streamed in.
+
+    :param entries: (title, app id) pairs.
+    :param process: callable that takes title and app_id keyword arguments
+                    and returns a record.
+    :param workers: how many entries are processed at the same time.
+    :param output: where the JSON lines should be written.
+    :param finish: callable that completes many records at once (e.g.,
+                   add_historical_lows). Records are held back until
+                   group_size of them are done.
+    :param group_size: how many records are passed to finish at a time.
+    :return: how many entries failed.
+    """
+
+    def _run(title, app_id):
+        try:
+            return process(title=title, app_id=app_id)
+        except Exception as e:
+            # A single odd entry (or payload) must not end the whole run.
+            return {'query': title if title else app_id, 'error': str(e)}
+
+    pending = []
+
+    def _write(records):
+        if finish:
+            finish(records)
+        for record in records:
+            output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        output.flush()
+
+    failed = 0
+    entries = iter(entries)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = {executor.submit(_run, *entry)
+                     for entry in islice(entries, workers)}
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                record = future.result()
+                failed += 'error' in record
+                pending.append(record)
+                # Keep the window full: one finished, another one starts.
+                for entry in islice(entries, 1):
+                    in_flight.add(executor.submit(_run, *entry))
+            if len(pending) >= group_size:
+                _write(pending)
+                pending = []
+    if pending:
+        _write(pending)
+
+    return failed
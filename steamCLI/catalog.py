@@ -0,0 +1,216 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import requests
+
+from steamCLI.deadline import Deadline
+from steamCLI.plains import PlainMap
+from steamCLI.session import Session, raise_for_status
+from steamCLI.steamapp import SteamApp
+from steamCLI.utils import sanitize_titles
+
+
+class Catalog:
+    """
+    Retrieves information about many apps at once.
+
+    Steam's appdetails endpoint accepts many comma separated ids only when
+    the response is filtered down to price_overview. Hence, prices of
+    thousands of apps take a handful of requests instead of thousands. The
+    same goes for ITAD's historical lows, which accept many plains at once.
+    """
+
+    def __init__(self, config=None, session: requests.Session=None,
+                 plains: PlainMap=None):
+        """
+        :param config: Config object with the application settings.
+        :param session: session through which all requests are made.
+        :param plains: mapping of app ids to ITAD plains. When absent,
+                       plains are guessed from titles.
+        """
+
+        if not config:
+            raise FileNotFoundError("Configuration file was not found.")
+
+        self.config = config
+        self.session = session if session is not None else Session()
+        self.plains = plains
+
+    def fetch_prices(self, appids: Iterable[int], region: str=None,
+                     deadline: Deadline=None) -> Dict[int, dict]:
+        """
+        Retrieves price information of the given apps.
+
+        :param appids: ids of the apps for which prices should be retrieved.
+        :param region: region for which the prices should be retrieved.
+        :param deadline: time budget of the requests.
+        :return: app id -> price_overview (None for free apps). Apps that
+                 Steam has no information about are left out.
+        """
+
+        base_url = self.config.get_value('SteamAPIs', 'appprices')
+        batch_size = self.config.get_int('SteamAPIs', 'price_batch')
+        if not region:
+            region = self.config.get_value('SteamRegions', 'default')
+
+        prices = {}
+        for batch in _batches(appids, batch_size):
+            ids = ','.join(str(appid) for appid in batch)
+            data = self._fetch_json(f'{base_url}{ids}&cc={region}',
+                                    deadline=deadline)
+            prices.update(self._extract_prices(data, batch))
+
+        return prices
+
+    def fetch_regional_prices(self, appids: Iterable[int], regions: List[str],
+                              deadline: Deadline=None) -> Dict[str, Dict[int, dict]]:
+        """
+        Retrieves price information of the given apps in many regions. All
+        regions are queried at the same time.
+
+        :param appids: ids of the apps for which prices should be retrieved.
+        :param regions: regions for which the prices should be retrieved.
+        :param deadline: time budget of the requests.
+        :return: region -> app id -> price_overview, as in fetch_prices().
+        """
+
+        if not regions:
+            return {}
+
+        appids = list(appids)
+        with ThreadPoolExecutor(max_workers=len(regions)) as executor:
+            prices = executor.map(
+                lambda region: self.fetch_prices(appids, region, deadline=deadline),
+                regions)
+
+            return dict(zip(regions, prices))
+
+    def plain_for(self, appid: int, title: str) -> str:
+        """
+        :return: ITAD plain of an app: a known one if there is a mapping,
+                 otherwise a guess based on its title.
+        """
+
+        return self.plains_for([(appid, title)])[0]
+
+    def plains_for(self, apps: Iterable[Tuple[int, str]]) -> List[str]:
+        """
+        Same as plain_for(), but for many apps at once: titles of the apps
+        without a known plain are sanitized in bulk.
+
+        :param apps: (app id, title) pairs.
+        :return: ITAD plain of each app, in the same order.
+        """
+
+        apps = list(apps)
+        known = [self.plains.lookup(appid) if self.plains and appid else None
+                 for appid, _ in apps]
+        guesses = sanitize_titles(title for (_, title), plain in zip(apps, known)
+                                  if not plain)
+
+        return [plain if plain else next(guesses) for plain in known]
+
+    def fetch_historical_lows(self, plains: Iterable[str],
+                              region: str=None) -> Dict[str, dict]:
+        """
+        Retrieves historical lows of the given games from ITAD.
+
+        :param plains: ITAD plains of the games (see plain_for()).
+        :param region: region for which the lows should be retrieved.
+        :return: plain -> ITAD data about its lowest price. Plains that ITAD
+                 knows nothing about are left out.
+        """
+
+        if not region:
+            region = self.config.get_value('SteamRegions', 'default')
+        env_var = self.config.get_value('IsThereAnyDealAPI', 'env_var')
+        api_key = SteamApp._retrieve_api_key(env_var)
+        app_url = self.config.get_value('IsThereAnyDealAPI', 'app_url')
+        batch_size = self.config.get_int('IsThereAnyDealAPI', 'plains_batch')
+
+        lows = {}
+        for batch in _batches(dict.fromkeys(plains), batch_size):
+            url = (app_url.replace('[region]', region)
+                          .replace('[key]', api_key)
+                          .replace('[title]', ','.join(batch)))
+            data = self._fetch_json(url).get('data') or {}
+            lows.update((plain, data[plain]) for plain in batch if plain in data)
+
+        return lows
+
+    def assign_historical_lows(self, apps: Iterable[SteamApp],
+                               region: str=None):
+        """
+        Updates historical low information of the given apps (the same
+        fields that SteamApp.extract_historical_low() fills in).
+
+        :param apps: SteamApps that have their titles set.
+        :param region: region for which the lows should be retrieved.
+        """
+
+        apps = [app for app in apps if app.title]
+        plains = self.plains_for((app.appID, app.title) for app in apps)
+        lows = self.fetch_historical_lows(plains, region=region)
+        for app, plain in zip(apps, plains):
+            if plain in lows:
+                app.assign_historical_low(lows[plain])
+
+    def _fetch_json(self, url: str, deadline: Deadline=None) -> dict:
+        if deadline is None:
+            response = self.session.get(url)
+        else:
+            response = self.session.get(url, deadline=deadline)
+        raise_for_status(response)
+
+        return response.json()
+
+    @staticmethod
+    def _extract_prices(data: dict, appids: List[int]) -> Dict[int, dict]:
+        """
+        Demultiplexes a batched appdetails response.
+
+        :param data: response, e.g. {"10": {"success": true, "data":
+                     {"price_overview": {...}}}, "20": {"success": true,
+                     "data": []}}. Free apps have an empty list as data.
+        :param appids: ids that were asked for.
+        :return: app id -> price_overview (or None).
+        """
+
+        prices = {}
+        for appid in appids:
+            details = data.get(str(appid))
+            if not details or not details.get('success'):
+                continue
+            app_data = details.get('data')
+            prices[appid] = (app_data.get('price_overview')
+                             if isinstance(app_data, dict) else None)
+
+        return prices
+
+    def assign_prices(self, apps: Iterable[SteamApp], region: str=None):
+        """
+        Updates price information of the given apps (the same fields that
+        SteamApp.find_app() fills in).
+
+        :param apps: SteamApps that have their ids set.
+        :param region: region for which the prices should be retrieved.
+        """
+
+        apps = [app for app in apps if app.appID]
+        # The same app might be in the list more than once.
+        appids = list(dict.fromkeys(app.appID for app in apps))
+        prices = self.fetch_prices(appids, region=region)
+        for app in apps:
+            if app.appID in prices:
+                app.assign_price_info(prices[app.appID])
+
+
+def _batches(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
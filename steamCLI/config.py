@@ -1,30 +1,53 @@
 import configparser
 import os
+import threading
+import time
+from types import MappingProxyType
+from typing import List, Mapping
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Settings in this file take precedence over the ones shipped with the app.
+USER_CONFIG = os.path.join('~', '.config', 'steamCLI', 'config.ini')
 
 
 class Config:
     """
     Responsible for actions on .ini files in which settings are stored.
 
-    If only get_value() is ever used, class might be an overkill.
+    Files are parsed once into an immutable snapshot, which is replaced only
+    when one of the files changes on disk. Values are looked up in layers:
+        1) environment variables, e.g. STEAMCLI_CACHE_APPLIST_TTL for
+           the applist_ttl key in the [Cache] section
+        2) user config file (~/.config/steamCLI/config.ini)
+        3) .ini file given to the constructor
     """
 
-    def __init__(self, package_folder: str=ROOT, *args: str):
+    env_prefix = 'STEAMCLI_'
+    # How often (in seconds) files are checked for changes.
+    check_interval = 1.0
+
+    def __init__(self, package_folder: str=ROOT, *args: str,
+                 user_path: str=USER_CONFIG):
         """
         :param package_folder: project root folder.
         :param *args: folders + file name needed to navigate to the .ini file.
+        :param user_path: .ini file with user overrides. It does not have to
+                          exist. None disables it.
         """
 
         package = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', package_folder))
-        self.config = configparser.ConfigParser()
         self.path = os.path.join(package, *args)
+        self.user_path = os.path.expanduser(user_path) if user_path else None
 
         # If there was no config file, config class would be useless.
         if not os.path.isfile(self.path):
             raise FileNotFoundError("File does not exist.")
 
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._mtimes = None
+        self._checked = None
+
     def get_value(self, section: str, key: str) -> str:
         """
         Returns value given a section and a key.
@@ -33,6 +56,80 @@ class Config:
         :param key: key which should be used to get the corresponding value.
         """
 
-        self.config.read(self.path)
+        env_var = f'{self.env_prefix}{section}_{key}'.upper()
+        if env_var in os.environ:
+            return os.environ[env_var]
+
+        return self.snapshot()[section][key.lower()]
+
+    def get_int(self, section: str, key: str) -> int:
+        return int(self.get_value(section, key))
+
+    def get_float(self, section: str, key: str) -> float:
+        return float(self.get_value(section, key))
+
+    def get_bool(self, section: str, key: str) -> bool:
+        return self.to_bool(self.get_value(section, key))
+
+    @staticmethod
+    def to_bool(value: str) -> bool:
+        """
+        Reads a boolean the way .ini files spell it (yes/no, on/off, ...),
+        e.g. for a single item of get_list().
+        """
+
+        value = value.strip().lower()
+        if value not in configparser.ConfigParser.BOOLEAN_STATES:
+            raise ValueError(f"Not a boolean: {value}")
+
+        return configparser.ConfigParser.BOOLEAN_STATES[value]
+
+    def get_list(self, section: str, key: str, separator: str=',') -> List[str]:
+        """
+        Returns a value split into a list, e.g. 'au, br,ca' -> [au, br, ca].
+        """
+
+        value = self.get_value(section, key)
+
+        return [item.strip() for item in value.split(separator) if item.strip()]
+
+    def snapshot(self) -> Mapping[str, Mapping[str, str]]:
+        """
+        Returns read-only view of all sections and their values (without
+        environment overrides). Files are re-read only if they have changed.
+        """
+
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._checked < self.check_interval:
+            return self._snapshot
+
+        with self._lock:
+            mtimes = self._modification_times()
+            # Time of the check is set first, as readers outside of the lock
+            # rely on it whenever there is a snapshot.
+            self._checked = now
+            if self._snapshot is None or mtimes != self._mtimes:
+                self._snapshot = self._parse()
+                self._mtimes = mtimes
+
+        return self._snapshot
+
+    def _modification_times(self) -> tuple:
+        mtimes = []
+        for path in (self.path, self.user_path):
+            try:
+                mtimes.append(os.path.getmtime(path) if path else None)
+            except OSError:
+                mtimes.append(None)
+
+        return tuple(mtimes)
+
+    def _parse(self) -> Mapping[str, Mapping[str, str]]:
+        parser = configparser.ConfigParser()
+        # Files that do not exist are skipped. Later files take precedence.
+        parser.read([path for path in (self.path, self.user_path) if path])
 
-        return self.config[section][key]
+        return MappingProxyType({
+            section: MappingProxyType(dict(parser[section]))
+            for section in parser.sections()
+        })
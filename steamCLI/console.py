@@ -1,21 +1,60 @@
 import argparse
+import sys
 from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Optional, Tuple
 
+from steamCLI.applist import AppListCache
+from steamCLI.batch import (add_historical_lows, parse_entries, process_entry,
+                            run_batch)
+from steamCLI.catalog import Catalog
 from steamCLI.colors import error
 from steamCLI.config import Config
+from steamCLI.deadline import Deadline, DeadlineExceeded
+from steamCLI.plains import PlainMap
 from steamCLI.results import Results
+from steamCLI.session import Session
+from steamCLI.store import AppDetailsStore
 from steamCLI.steamapp import SteamApp
+from steamCLI.watch import Watcher, parse_interval, resolve_apps
 
 
 def main():
     try:
         config = Config('steamCLI', 'resources.ini')
         app_list = config.get_value(section='SteamAPIs', key='applist')
+        if sys.argv[1:2] == ['watch']:
+            _run_watch(config, app_list, sys.argv[2:])
+            return
+        if sys.argv[1:2] == ['serve']:
+            _run_server(config, app_list, sys.argv[2:])
+            return
+
         parser = _create_parser(config)
         args = parser.parse_args()
+        _check_args(parser, args)
+        deadline = Deadline(args.deadline)
+
+        session, applist, store, plains = _shared_resources(config)
+        if args.refresh_applist:
+            applist.refresh(app_list)
 
-        app = SteamApp(config=config)
-        _retrieve_main_app_info(args=args, app=app, app_list=app_list)
+        if args.batch:
+            _run_batch(args=args, config=config, applist=applist,
+                       session=session, store=store, plains=plains,
+                       app_list=app_list)
+            return
+
+        app = SteamApp(config=config, applist=applist, session=session,
+                       store=store, plains=plains)
+        suggestions = config.get_int('Search', 'suggestions')
+        try:
+            _retrieve_main_app_info(args=args, app=app, app_list=app_list,
+                                    suggestions=suggestions, deadline=deadline)
+        except DeadlineExceeded:
+            print("Ran out of time before the application was found.")
+            return
 
         results = Results(app=app, max_chars=79)
         results.format_steam_info()
@@ -23,17 +62,15 @@ def main():
         if args.description:
             results.format_description()
 
+        if app.appID and args.regions:
+            _add_region_prices(args=args, app=app, results=results,
+                               catalog=Catalog(config, session=session),
+                               deadline=deadline)
+
         # If app has an ID, we have managed to find it in Steam
         if app.appID:
-            if args.scores:
-                _add_scores_to_app(app=app, results=results)
-            if args.historical_low:
-                try:
-                    _add_historical_low(args=args, app=app, results=results)
-                except KeyError:
-                    error("Environment variable with API key was not found. Results are shown "
-                          "WITHOUT the historical low price data. To fix this, please set an "
-                          "environment key: \n\n>>> export steamCLI=[your_key]")
+            _add_extra_info(args=args, app=app, results=results,
+                            deadline=deadline)
             results.print_results()
         else:
             print("Application was not found. Is the supplied information correct?")
@@ -48,7 +85,7 @@ def _create_parser(config: Config) -> ArgumentParser:
 
     app_description = config.get_value('HelpText', 'app_help')
     default_region = config.get_value('SteamRegions', 'default')
-    regions = config.get_value('SteamRegions', 'regions').split(',')
+    regions = config.get_list('SteamRegions', 'regions')
 
     parser = ArgumentParser(description=app_description)
 
@@ -58,6 +95,8 @@ def _create_parser(config: Config) -> ArgumentParser:
     group.add_argument("-id", "--appid", type=int, action="store",
                        help=config.get_value('HelpText', 'id_help', ),
                        metavar="val")
+    group.add_argument("--batch", type=argparse.FileType('r'), metavar="FILE",
+                       help=config.get_value('HelpText', 'batch_help'))
 
     parser.add_argument("-d", "--description", action="store_true",
                         help=config.get_value('HelpText', 'desc_help'))
@@ -67,8 +106,75 @@ def _create_parser(config: Config) -> ArgumentParser:
                         type=str.lower, default=default_region, choices=regions,
                         help=config.get_value('HelpText', 'region_help') +
                         ' Available values: ' + ", ".join(regions))
+    parser.add_argument("--regions", metavar="all|list",
+                        type=lambda value: _parse_regions(value, regions),
+                        help=config.get_value('HelpText', 'regions_help'))
+    parser.add_argument("-l", "--historical_low", action="store_true",
+                        help=config.get_value('HelpText', 'historical_help'))
+    parser.add_argument("--refresh-applist", action="store_true",
+                        help=config.get_value('HelpText', 'refresh_help'))
+    parser.add_argument("--fuzzy", action="store_true",
+                        help=config.get_value('HelpText', 'fuzzy_help'))
+    parser.add_argument("--deadline", type=float, metavar="SECONDS",
+                        help=config.get_value('HelpText', 'deadline_help'))
+
+    return parser
+
+
+def _check_args(parser: ArgumentParser, args: argparse.Namespace):
+    """
+    Rejects options that do not go together. Batch records have neither a
+    description nor regional prices.
+    """
+
+    if args.batch and (args.description or args.regions):
+        parser.error("-d/--description and --regions cannot be used with --batch")
+
+
+def _create_watch_parser(config: Config) -> ArgumentParser:
+    """
+    Initializes parser of the watch mode with values from a config file.
+    """
+
+    default_region = config.get_value('SteamRegions', 'default')
+    regions = config.get_list('SteamRegions', 'regions')
+    default_interval = config.get_value('Watch', 'interval')
+
+    parser = ArgumentParser(prog='steamCLI watch',
+                            description=config.get_value('HelpText', 'watch_help'))
+    parser.add_argument("--list", type=argparse.FileType('r'), metavar="FILE",
+                        required=True,
+                        help=config.get_value('HelpText', 'list_help'))
+    parser.add_argument("--interval", type=parse_interval, metavar="val",
+                        default=parse_interval(default_interval),
+                        help=config.get_value('HelpText', 'interval_help'))
+    parser.add_argument("-s", "--scores", action="store_true",
+                        help=config.get_value('HelpText', 'reviews_help'))
+    parser.add_argument("-r", "--region", action="store", metavar="val",
+                        type=str.lower, default=default_region, choices=regions,
+                        help=config.get_value('HelpText', 'region_help') +
+                        ' Available values: ' + ", ".join(regions))
     parser.add_argument("-l", "--historical_low", action="store_true",
                         help=config.get_value('HelpText', 'historical_help'))
+    parser.add_argument("--fuzzy", action="store_true",
+                        help=config.get_value('HelpText', 'fuzzy_help'))
+
+    return parser
+
+
+def _create_serve_parser(config: Config) -> ArgumentParser:
+    """
+    Initializes parser of the server mode with values from a config file.
+    """
+
+    parser = ArgumentParser(prog='steamCLI serve',
+                            description=config.get_value('HelpText', 'serve_help'))
+    parser.add_argument("--host", metavar="val",
+                        default=config.get_value('Server', 'host'),
+                        help=config.get_value('HelpText', 'host_help'))
+    parser.add_argument("--port", type=int, metavar="N",
+                        default=config.get_int('Server', 'port'),
+                        help=config.get_value('HelpText', 'port_help'))
 
     return parser
 
@@ -84,43 +190,310 @@ def _retrieve_title() -> str:
     return app_title
 
 
-def _retrieve_main_app_info(args: argparse.Namespace, app: SteamApp, app_list):
+def _parse_regions(value: str, regions: List[str]) -> List[str]:
+    """
+    Turns --regions value into a list of regions.
+
+    :param value: 'all' or comma separated regions, e.g. 'uk,us'.
+    :param regions: regions that are available.
+    """
+
+    if value.lower() == 'all':
+        return list(regions)
+
+    chosen = [region.strip().lower() for region in value.split(',')
+              if region.strip()]
+    unknown = [region for region in chosen if region not in regions]
+    if unknown or not chosen:
+        raise argparse.ArgumentTypeError(
+            f"invalid regions: {', '.join(unknown) or value!r} "
+            f"(choose from {', '.join(regions)})")
+
+    return list(dict.fromkeys(chosen))
+
+
+def _add_region_prices(args: argparse.Namespace, app: SteamApp,
+                       results: Results, catalog: Catalog,
+                       deadline: Deadline=None):
+    """
+    Adds a table of the app's prices in every requested region. The app is
+    already known, hence only prices are fetched. The table is left out if
+    the deadline runs out first.
+    """
+
+    if deadline is not None and deadline.expired():
+        results.mark_partial('regional prices')
+        return
+
+    print("Comparing regional prices...")
+    try:
+        prices = catalog.fetch_regional_prices([app.appID], args.regions,
+                                               deadline=deadline)
+    except DeadlineExceeded:
+        results.mark_partial('regional prices')
+        return
+    results.format_region_prices({region: prices[region].get(app.appID)
+                                  for region in args.regions})
+
+
+def _shared_resources(config: Config) -> Tuple[Session, AppListCache,
+                                               AppDetailsStore, PlainMap]:
+    """
+    Creates what all lookups of a run share: one session (so that
+    connections are reused), the app list cache, the appdetails store and
+    the plain map. The app list and the plains are downloaded through the
+    session too.
+    """
+
+    session = Session.from_config(config)
+    applist = AppListCache.from_config(config, fetch=session.stream_resource)
+    store = AppDetailsStore.from_config(config)
+    plains = PlainMap.from_config(config, session=session)
+
+    return session, applist, store, plains
+
+
+def _run_batch(args: argparse.Namespace, config: Config,
+               applist: AppListCache, session, store, plains, app_list: str):
+    """
+    Looks up every title/id in the batch file and prints a JSON line per
+    app. The app list and its indexes are loaded once, before any of the
+    lookups start. Each lookup gets a --deadline of its own.
+    """
+
+    applist.title_index(app_list)
+    applist.appid_index(app_list)
+
+    def _process(title, app_id):
+        app = SteamApp(config=config, applist=applist, session=session,
+                       store=store, plains=plains)
+        return process_entry(app, app_list, title=title, app_id=app_id,
+                             region=args.region, scores=args.scores,
+                             fuzzy=args.fuzzy, deadline=Deadline(args.deadline))
+
+    # Historical lows of many apps are retrieved with a single request.
+    finish, group_size = None, 1
+    if args.historical_low:
+        catalog = Catalog(config, session=session, plains=plains)
+        finish = partial(add_historical_lows, catalog=catalog,
+                         region=args.region)
+        group_size = config.get_int('IsThereAnyDealAPI', 'plains_batch')
+
+    with args.batch:
+        failed = run_batch(parse_entries(args.batch), _process,
+                           workers=config.get_int('Batch', 'workers'),
+                           finish=finish, group_size=group_size)
+    if failed:
+        error(f"{failed} entries could not be retrieved.")
+
+
+def _run_watch(config: Config, app_list: str, argv: List[str]):
+    """
+    Resolves the apps of a watchlist once, and then polls them until
+    interrupted. Session, app list indexes and apps stay in memory between
+    cycles.
+    """
+
+    args = _create_watch_parser(config).parse_args(argv)
+
+    session, applist, store, plains = _shared_resources(config)
+    applist.title_index(app_list)
+    applist.appid_index(app_list)
+    workers = config.get_int('Batch', 'workers')
+
+    def _make_app():
+        return SteamApp(config=config, applist=applist, session=session,
+                        store=store, plains=plains)
+
+    with args.list:
+        apps, missing = resolve_apps(parse_entries(args.list), _make_app,
+                                     app_list, region=args.region,
+                                     fuzzy=args.fuzzy, workers=workers)
+    if missing:
+        error("Not found: " + ", ".join(str(query) for query in missing))
+    if not apps:
+        return
+
+    scores_interval = (parse_interval(config.get_value('Watch', 'scores_interval'))
+                       if args.scores else None)
+    historical_interval = (parse_interval(config.get_value('Watch', 'historical_interval'))
+                           if args.historical_low else None)
+    watcher = Watcher(apps, Catalog(config, session=session, plains=plains),
+                      region=args.region, interval=args.interval,
+                      scores_interval=scores_interval,
+                      historical_interval=historical_interval, workers=workers)
+    watcher.run()
+
+
+def _run_server(config: Config, app_list: str, argv: List[str]):
+    """
+    Answers lookups over HTTP until interrupted. The app list indexes are
+    loaded before the first request, and together with the session and the
+    caches they are shared by all requests.
+    """
+
+    # Imported here, so that the server's dependencies are only loaded by
+    # the mode that uses it.
+    from steamCLI.server import LookupServer, ResponseCache
+
+    args = _create_serve_parser(config).parse_args(argv)
+
+    session, applist, store, plains = _shared_resources(config)
+    applist.title_index(app_list)
+    applist.appid_index(app_list)
+
+    def _lookup(title, app_id, region, scores, historical_low, fuzzy, deadline):
+        app = SteamApp(config=config, applist=applist, session=session,
+                       store=store, plains=plains)
+        return process_entry(app, app_list, title=title, app_id=app_id,
+                             region=region, scores=scores,
+                             historical_low=historical_low, fuzzy=fuzzy,
+                             deadline=deadline)
+
+    cache = ResponseCache(size=config.get_int('Server', 'cache_size'),
+                          ttl=config.get_float('Server', 'cache_ttl'))
+    server = LookupServer((args.host, args.port), _lookup,
+                          regions=config.get_list('SteamRegions', 'regions'),
+                          default_region=config.get_value('SteamRegions', 'default'),
+                          deadline=config.get_float('Server', 'deadline'),
+                          cache=cache)
+    with server:
+        host, port = server.server_address[:2]
+        print(f"Serving lookups on http://{host}:{port}/lookup")
+        server.serve_forever()
+
+
+def _retrieve_main_app_info(args: argparse.Namespace, app: SteamApp, app_list,
+                            suggestions: int=5, deadline: Deadline=None):
     """ 
     Find and update SteamApp object with info about application
      
     :param args: argument object that has user entered args.
     :param app: SteamApp that holds information about a particular app.
     :param app_list: Steam's endpoint that has JSON of all the Steam apps.
+    :param suggestions: how many similar titles should be offered when the
+                        title is not found.
+    :param deadline: time budget of the lookup.
     """
 
     # Title and id are required, but mutually exclusive
     if args.title:
         app_title = _retrieve_title()
-        app.find_app(origin=app_list, region=args.region, title=app_title)
+        app.find_app(origin=app_list, region=args.region, title=app_title,
+                     deadline=deadline)
+        if not app.appID:
+            similar = app.suggest_titles(app_list, app_title, suggestions,
+                                         deadline=deadline)
+            chosen = _choose_title(similar, automatic=args.fuzzy)
+            if chosen:
+                app.find_app(origin=app_list, region=args.region, title=chosen,
+                             deadline=deadline)
     else:
         print("Gathering price information...")
-        app.find_app(origin=app_list, region=args.region, app_id=args.appid)
+        app.find_app(origin=app_list, region=args.region, app_id=args.appid,
+                     deadline=deadline)
 
 
-def _add_scores_to_app(app: SteamApp, results: Results):
+def _choose_title(titles: List[str], automatic: bool=False) -> Optional[str]:
+    """
+    Lets the user pick one of similar titles, or picks the best one when
+    asked to do so automatically.
+
+    :param titles: similar titles, best match first.
+    :param automatic: whether the best match should be picked without asking.
+    :return: chosen title, or None if there is nothing to choose from.
+    """
+
+    if not titles:
+        return None
+
+    if automatic:
+        print(f"Exact title was not found. Showing \"{titles[0]}\" instead.")
+        return titles[0]
+
+    print("Exact title was not found. Did you mean:")
+    for number, title in enumerate(titles, start=1):
+        print(f"  {number}) {title}")
+
+    choice = input("Enter a number (or nothing to quit): ").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(titles):
+        return titles[int(choice) - 1]
+
+    return None
+
+
+def _add_extra_info(args: argparse.Namespace, app: SteamApp, results: Results,
+                    deadline: Deadline=None):
+    """
+    Adds review scores and/or historical low to a given SteamApp, if they
+    were asked for. Neither needs the other, hence both are retrieved at
+    the same time. They are formatted into separate parts of Results, so
+    the printed order does not depend on which one finishes first.
+
+    Both are optional: once the deadline runs out, they are skipped or cut
+    short, and Results are marked as partial.
+    """
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        scores = low = None
+        if args.scores:
+            scores = executor.submit(_add_scores_to_app, app=app,
+                                     results=results, deadline=deadline)
+        if args.historical_low:
+            low = executor.submit(_add_historical_low, args=args, app=app,
+                                  results=results, deadline=deadline)
+
+    if scores:
+        scores.result()
+    if low:
+        try:
+            low.result()
+        except KeyError:
+            error("Environment variable with API key was not found. Results are shown "
+                  "WITHOUT the historical low price data. To fix this, please set an "
+                  "environment key: \n\n>>> export steamCLI=[your_key]")
+
+
+def _add_scores_to_app(app: SteamApp, results: Results,
+                       deadline: Deadline=None):
     """
     Add review scores to a given SteamApp and format associated Results object 
     accordingly.
     """
 
+    if deadline is not None and deadline.expired():
+        results.mark_partial('reviews')
+        return
+
     print("Scraping reviews...")
-    app.scrape_app_page()
+    try:
+        app.retrieve_review_scores(deadline=deadline)
+    except DeadlineExceeded:
+        results.mark_partial('reviews')
+        return
+    # The page may have been cut short before the scores arrived.
+    if deadline is not None and deadline.expired():
+        results.mark_partial('reviews')
     results.format_steam_website_info()
 
 
-def _add_historical_low(args: argparse.Namespace, app: SteamApp, results: Results):
+def _add_historical_low(args: argparse.Namespace, app: SteamApp, results: Results,
+                        deadline: Deadline=None):
     """
     Add historical low information to a given SteamApp and format associated 
     Results object accordingly.
     """
 
+    if deadline is not None and deadline.expired():
+        results.mark_partial('historical low')
+        return
+
     print("Leafing through history books...")
-    app.extract_historical_low(args.region)
+    try:
+        app.extract_historical_low(args.region, deadline=deadline)
+    except DeadlineExceeded:
+        results.mark_partial('historical low')
+        return
     results.format_historical_low()
 
 if __name__ == '__main__':
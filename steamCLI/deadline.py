@@ -0,0 +1,79 @@
+import time
+from typing import Optional, Tuple, Union
+
+import requests
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class DeadlineExceeded(requests.Timeout):
+    """ Time budget of the invocation ran out. """
+
+
+class Deadline:
+    """
+    Time budget shared by every stage of a single invocation. Network calls
+    never wait longer than what is left of it, and optional stages are
+    skipped once it runs out.
+    """
+
+    def __init__(self, seconds: Optional[float]=None):
+        """
+        :param seconds: time budget, counted from now. None means no limit.
+        """
+
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds if seconds is not None else None
+
+    def remaining(self) -> Optional[float]:
+        """ :return: seconds left (never negative), or None if unlimited. """
+
+        if self.expires is None:
+            return None
+
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    def check(self):
+        """ Raises DeadlineExceeded if there is no time left. """
+
+        if self.expired():
+            raise DeadlineExceeded("Ran out of time.")
+
+    def raise_if_expired(self, error: Exception):
+        """
+        Raises DeadlineExceeded (from error) if there is no time left. A
+        timeout that was clamped to the deadline surfaces as a plain requests
+        Timeout or ConnectionError, hence callers pass those through here, so
+        that running out of time is told apart from a broken connection.
+
+        :param error: exception that interrupted a network call.
+        """
+
+        if isinstance(error, DeadlineExceeded):
+            raise error
+        if self.expired():
+            raise DeadlineExceeded("Ran out of time.") from error
+
+    def clamp(self, timeout: Timeout) -> Timeout:
+        """
+        Shortens a requests timeout, so that it does not outlast the
+        deadline.
+
+        :param timeout: seconds, or a (connect, read) pair.
+        :return: timeout of the same shape.
+        """
+
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if part is None else min(part, remaining)
+                         for part in timeout)
+
+        return min(timeout, remaining)
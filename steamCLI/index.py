@@ -0,0 +1,260 @@
+import json
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from steamCLI.utils import write_atomically
+
+
+def normalize_title(title: str) -> str:
+    """
+    Brings title to the form in which it is stored in the index. Lookups
+    are case-insensitive, just like they were when the app list was scanned.
+    """
+
+    return title.lower()
+
+
+def decode_apps(json_text: str) -> List[Tuple[int, str]]:
+    """
+    Decodes the app list into (appid, name) pairs.
+
+    :param json_text: app list, as returned by Steam's GetAppList API.
+    """
+
+    apps = []
+
+    def _collect_dictionary(dictionary: dict) -> dict:
+        try:
+            apps.append((dictionary["appid"], dictionary["name"]))
+        except KeyError:
+            pass
+        return dictionary
+
+    json.loads(json_text, object_hook=_collect_dictionary)
+
+    return apps
+
+
+class TitleIndex:
+    """
+    Maps normalized app titles to ids of the apps that carry them.
+
+    Steam's app list has ~150k entries. Scanning all of them on each lookup
+    is wasteful, hence the index is built once per downloaded list and stored
+    next to it. Several apps might share a title (e.g., Borderlands), so each
+    title points to a list of ids.
+    """
+
+    # Bump whenever the file format or normalization changes, so that stale
+    # indexes are rebuilt instead of being misread.
+    version = 1
+
+    def __init__(self, titles: Dict[str, List[int]]=None,
+                 source_mtime: float=None):
+        """
+        :param titles: normalized title -> list of app ids (or a single id).
+        :param source_mtime: modification time of the app list file the
+                             index was built from.
+        """
+
+        self.titles = titles if titles is not None else {}
+        self.source_mtime = source_mtime
+
+    @classmethod
+    def build(cls, json_text: str, source_mtime: float=None) -> 'TitleIndex':
+        """
+        Builds an index from the textual JSON representation of the app list.
+
+        :param json_text: app list, as returned by Steam's GetAppList API.
+        :param source_mtime: modification time of the app list file.
+        """
+
+        titles = {}
+        for appid, name in decode_apps(json_text):
+            titles.setdefault(normalize_title(name), []).append(appid)
+
+        return cls(titles, source_mtime=source_mtime)
+
+    @classmethod
+    def load(cls, path: str, source_mtime: float=None):
+        """
+        Loads an index from disk.
+
+        :param path: file in which the index is stored.
+        :param source_mtime: modification time of the current app list. If
+                             the index was built from a different one, it
+                             is considered outdated.
+        :return: TitleIndex, or None if there is no usable index.
+        """
+
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get('version') != cls.version:
+            return None
+        if source_mtime is not None and data.get('source_mtime') != source_mtime:
+            return None
+
+        titles = dict(zip(data['titles'], data['appids']))
+
+        return cls(titles, source_mtime=data['source_mtime'])
+
+    def save(self, path: str):
+        """
+        :param path: file in which the index should be stored.
+        """
+
+        # Parallel arrays with bare ids for unique titles are roughly twice
+        # as fast to decode as a mapping of titles to lists.
+        appids = [ids[0] if len(ids) == 1 else ids
+                  for ids in self.titles.values()]
+        data = {
+            'version': self.version,
+            'source_mtime': self.source_mtime,
+            'titles': list(self.titles),
+            'appids': appids,
+        }
+        text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        write_atomically(path, [text.encode('utf-8')])
+
+    def lookup(self, title: str) -> List[int]:
+        """
+        :param title: title of the to-be-found app.
+        :return: ids of the apps that have the given title.
+        """
+
+        appids = self.titles.get(normalize_title(title), [])
+
+        return appids if isinstance(appids, list) else [appids]
+
+
+class AppIdIndex:
+    """
+    Maps app ids to app names through a compact binary file that is read via
+    mmap.
+
+    File layout (native byte order):
+        header:  magic, version, count, padding, source_mtime
+        appids:  count sorted unsigned 32-bit ids
+        offsets: count + 1 unsigned 32-bit offsets into the names blob
+        names:   UTF-8 encoded names, back to back
+
+    Lookups are binary searches over the mapped file, so nothing needs to be
+    decoded when the index is opened. Processes that open the same file share
+    a single copy of it through the OS page cache.
+    """
+
+    magic = b'SCAI'
+    version = 1
+    header = struct.Struct('=4sIIId')
+
+    def __init__(self, buffer, source_mtime: float=None):
+        """
+        :param buffer: bytes-like object with the whole index file.
+        :param source_mtime: modification time of the app list file the
+                             index was built from.
+        """
+
+        self.source_mtime = source_mtime
+        self._buffer = buffer
+        view = memoryview(buffer)
+        count = self.header.unpack_from(buffer)[2]
+        appids_end = self.header.size + count * 4
+        offsets_end = appids_end + (count + 1) * 4
+        self._appids = view[self.header.size:appids_end].cast('I')
+        self._offsets = view[appids_end:offsets_end].cast('I')
+        self._names = view[offsets_end:]
+
+    def __len__(self) -> int:
+        return len(self._appids)
+
+    @classmethod
+    def build(cls, json_text: str, source_mtime: float=None) -> bytes:
+        """
+        Serializes the app list into the index file format.
+
+        :param json_text: app list, as returned by Steam's GetAppList API.
+        :param source_mtime: modification time of the app list file.
+        :return: contents of the index file.
+        """
+
+        names = {}
+        for appid, name in decode_apps(json_text):
+            # App list has the odd duplicate. The first entry wins.
+            names.setdefault(appid, name)
+
+        appids = array('I', sorted(names))
+        offsets = array('I', [0])
+        blob = bytearray()
+        for appid in appids:
+            blob += names[appid].encode('utf-8')
+            offsets.append(len(blob))
+
+        mtime = source_mtime if source_mtime is not None else 0.0
+        header = cls.header.pack(cls.magic, cls.version, len(appids), 0, mtime)
+
+        return header + appids.tobytes() + offsets.tobytes() + bytes(blob)
+
+    @classmethod
+    def open(cls, path: str, source_mtime: float=None):
+        """
+        Maps an index file into memory.
+
+        :param path: file in which the index is stored.
+        :param source_mtime: modification time of the current app list. If
+                             the index was built from a different one, it
+                             is considered outdated.
+        :return: AppIdIndex, or None if there is no usable index.
+        """
+
+        try:
+            with open(path, 'rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            magic, version, count, _, mtime = cls.header.unpack_from(buffer)
+        except struct.error:
+            buffer.close()
+            return None
+
+        expected_size = cls.header.size + (2 * count + 1) * 4
+        if (magic != cls.magic or version != cls.version or
+                len(buffer) < expected_size or
+                (source_mtime is not None and mtime != source_mtime)):
+            buffer.close()
+            return None
+
+        return cls(buffer, source_mtime=mtime)
+
+    def lookup(self, appid: int) -> Optional[str]:
+        """
+        :param appid: id of the to-be-found app.
+        :return: name of the app, or None if there is no such app.
+        """
+
+        position = bisect_left(self._appids, appid)
+        if position == len(self._appids) or self._appids[position] != appid:
+            return None
+
+        start = self._offsets[position]
+        end = self._offsets[position + 1]
+
+        return str(self._names[start:end], 'utf-8')
+
+    def close(self):
+        """
+        Unmaps the index file. Views into it have to be released first.
+        """
+
+        for view in (self._appids, self._offsets, self._names):
+            view.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+
+from steamCLI.session import raise_for_status
+from steamCLI.utils import write_atomically
+
+
+class PlainMap:
+    """
+    Maps Steam app ids to ITAD plains (ITAD's identifiers of games).
+
+    Plains can be guessed from titles (see utils.sanitize_title), but the
+    guess is wrong for plenty of them (e.g., titles in other alphabets),
+    and a wrong guess costs a request that finds nothing. ITAD publishes
+    the whole mapping, hence it is downloaded in one go and kept on disk.
+    A copy older than the TTL is still used while a fresh one is
+    downloaded in the background, even when the TTL runs out while the
+    mapping is in use. Without a copy, titles are guessed until the first
+    download (in the background as well) finishes.
+    """
+
+    version = 1
+    # Seconds between checks whether the copy went stale.
+    check_interval = 60
+
+    def __init__(self, path: str, ttl: int, url: Optional[str],
+                 session: requests.Session):
+        """
+        :param path: file in which the mapping is stored.
+        :param ttl: seconds for which a downloaded mapping is fresh.
+        :param url: ITAD endpoint that returns the whole mapping. None
+                    disables downloads (e.g., when there is no API key).
+        :param session: session through which the mapping is downloaded.
+        """
+
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.url = url
+        self.session = session
+
+        self._lock = threading.Lock()
+        self._plains = None
+        self._refresh_thread = None
+        self._checked = None
+
+    @classmethod
+    def from_config(cls, config, session: requests.Session,
+                    filename: str='plains.json'):
+        """
+        Creates a mapping with settings taken from the configuration file.
+        Without ITAD API key, only a previously downloaded copy is used.
+        """
+
+        directory = config.get_value('Cache', 'directory')
+        ttl = config.get_int('Cache', 'plain_map_ttl')
+        env_var = config.get_value('IsThereAnyDealAPI', 'env_var')
+        api_key = os.environ.get(env_var)
+        url = None
+        if api_key:
+            url = config.get_value('IsThereAnyDealAPI', 'plain_map')
+            url = url.replace('[key]', api_key)
+
+        return cls(os.path.join(os.path.expanduser(directory), filename), ttl,
+                   url, session)
+
+    def lookup(self, appid: int) -> Optional[str]:
+        """
+        :param appid: id of the app on Steam.
+        :return: ITAD plain of the app, or None if it is not known.
+        """
+
+        return self._mapping().get(appid)
+
+    def refresh(self):
+        """
+        Downloads the whole mapping and replaces the copy on disk.
+        """
+
+        response = self.session.get(self.url)
+        raise_for_status(response)
+        data = response.json().get('data') or {}
+
+        # Mapping has packages (sub/...) and bundles as well. Apps only.
+        plains = {int(key[4:]): plain for key, plain in data.items()
+                  if key.startswith('app/') and key[4:].isdigit()}
+        text = json.dumps({'version': self.version,
+                           'plains': {str(appid): plain
+                                      for appid, plain in plains.items()}},
+                          separators=(',', ':'))
+        write_atomically(self.path, [text.encode('utf-8')])
+        self._plains = plains
+
+    def is_stale(self) -> bool:
+        try:
+            return time.time() - os.path.getmtime(self.path) > self.ttl
+        except OSError:
+            return True
+
+    def wait(self, timeout: float=None):
+        """ Blocks until a background refresh (if any) finishes. """
+
+        if self._refresh_thread:
+            self._refresh_thread.join(timeout)
+
+    def _mapping(self) -> Dict[int, str]:
+        with self._lock:
+            if self._plains is None:
+                # Lookups fall back to guessing until the mapping arrives.
+                plains = self._load()
+                self._plains = plains if plains is not None else {}
+            # The refresh replaces the mapping rather than changing it, hence
+            # this one stays consistent.
+            plains = self._plains
+
+            # Long running modes (watch, serve) outlive the TTL, hence the
+            # copy is checked again, but not on every lookup.
+            now = time.monotonic()
+            if self._checked is None or now - self._checked >= self.check_interval:
+                self._checked = now
+                # Even the first download runs in the background: the
+                # mapping is big, and nobody should wait for it while
+                # holding the lock.
+                refreshing = self._refresh_thread and self._refresh_thread.is_alive()
+                if self.url and not refreshing and self.is_stale():
+                    self._refresh_thread = threading.Thread(
+                        target=self._try_refresh, name='plain-map-refresh')
+                    self._refresh_thread.start()
+
+            return plains
+
+    def _try_refresh(self):
+        try:
+            self.refresh()
+        except (requests.RequestException, ValueError, OSError):
+            # The next check (or run) will try again.
+            pass
+
+    def _load(self) -> Optional[Dict[int, str]]:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get('version') != self.version:
+            return None
+
+        return {int(appid): plain for appid, plain in data['plains'].items()}
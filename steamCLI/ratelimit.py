@@ -0,0 +1,300 @@
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from steamCLI.deadline import Deadline, DeadlineExceeded
+
+# Responses that mean "slow down" rather than "this resource is broken".
+THROTTLED = {429, 503}
+
+
+class TokenBucket:
+    """
+    Lets through at most rate requests per second on average, with bursts of
+    up to burst requests. A host that asked to be left alone (Retry-After)
+    can pause the bucket.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        :param rate: how many tokens are added per second.
+        :param burst: how many tokens the bucket holds at most.
+        """
+
+        self.rate = rate
+        self.burst = burst
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def acquire(self, deadline: Deadline=None):
+        """
+        Blocks until a token is available and takes it.
+
+        :param deadline: time budget of the caller. DeadlineExceeded is
+                         raised (without waiting) if the token would not
+                         arrive in time.
+        """
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._paused_until:
+                    self._tokens = min(self.burst, self._tokens +
+                                       (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    delay = (1 - self._tokens) / self.rate
+                else:
+                    delay = self._paused_until - now
+            remaining = deadline.remaining() if deadline is not None else None
+            if remaining is not None and delay >= remaining:
+                raise DeadlineExceeded("Ran out of time waiting for the host.")
+            time.sleep(delay)
+
+    def pause(self, seconds: float):
+        """
+        Lets nothing through for the given number of seconds. The bucket is
+        emptied as well, so that requests resume one at a time.
+        """
+
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._paused_until:
+                self._paused_until = until
+                self._updated = until
+                self._tokens = 0.0
+
+
+class AIMDLimiter:
+    """
+    Limits how many requests are in flight at the same time. The limit
+    grows by one per limit of successful requests (additive increase) and
+    is halved when a request is throttled or slower than latency_target
+    (multiplicative decrease), hence it settles just below what a host can
+    take.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int,
+                 latency_target: float, backoff: float=0.5):
+        """
+        :param initial: how many requests may be in flight at first.
+        :param minimum: the limit never drops below it.
+        :param maximum: the limit never grows above it.
+        :param latency_target: seconds after which a response counts as a
+                               sign of congestion.
+        :param backoff: by how much the limit is multiplied on congestion.
+        """
+
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.limit = float(max(minimum, min(initial, maximum)))
+
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._decreased = 0.0
+
+    def acquire(self, deadline: Deadline=None) -> float:
+        """
+        Blocks until another request may start.
+
+        :param deadline: time budget of the caller. DeadlineExceeded is
+                         raised once it runs out.
+        :return: when the request started (to be passed to release()).
+        """
+
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                remaining = deadline.remaining() if deadline is not None else None
+                if remaining == 0:
+                    raise DeadlineExceeded("Ran out of time waiting for the host.")
+                self._condition.wait(remaining)
+            self._in_flight += 1
+
+            return time.monotonic()
+
+    def release(self, started: float, congested: bool, measured: bool=True):
+        """
+        :param started: value returned by acquire().
+        :param congested: whether the request was throttled or failed.
+        :param measured: whether the request tells anything about the host.
+                         Requests that the caller gave up on leave the limit
+                         as it is.
+        """
+
+        now = time.monotonic()
+        congested = congested or now - started > self.latency_target
+        with self._condition:
+            self._in_flight -= 1
+            if measured and not congested:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            elif measured and started >= self._decreased:
+                # Requests that were already in flight when the limit went
+                # down do not lower it again.
+                self.limit = max(self.minimum, self.limit * self.backoff)
+                self._decreased = now
+            self._condition.notify_all()
+
+
+class RateLimiter:
+    """
+    Paces requests per host: each host gets a token bucket and an AIMD
+    concurrency limit of its own, created on first use.
+    """
+
+    def __init__(self, rate: float, burst: int, initial_concurrency: int,
+                 max_concurrency: int, latency_target: float,
+                 max_retry_after: float=60):
+        """
+        :param rate: requests per second per host.
+        :param burst: how many requests per host may be sent back to back.
+        :param initial_concurrency: requests per host in flight at first.
+        :param max_concurrency: requests per host in flight at most.
+        :param latency_target: seconds after which a response counts as a
+                               sign of congestion.
+        :param max_retry_after: longest pause that a host may ask for.
+        """
+
+        self.rate = rate
+        self.burst = burst
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.latency_target = latency_target
+        self.max_retry_after = max_retry_after
+
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, tuple] = {}
+        # Host -> how many requests are waiting for a slot.
+        self._waiting: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Creates a limiter with settings taken from the configuration file.
+        """
+
+        return cls(rate=config.get_float('RateLimit', 'rate'),
+                   burst=config.get_int('RateLimit', 'burst'),
+                   initial_concurrency=config.get_int('RateLimit', 'initial_concurrency'),
+                   max_concurrency=config.get_int('RateLimit', 'max_concurrency'),
+                   latency_target=config.get_float('RateLimit', 'latency_target'),
+                   max_retry_after=config.get_float('RateLimit', 'max_retry_after'))
+
+    def host(self, url: str) -> tuple:
+        """
+        :return: (TokenBucket, AIMDLimiter) of the host the url points to.
+        """
+
+        host = _host(url)
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = (
+                    TokenBucket(self.rate, self.burst),
+                    AIMDLimiter(self.initial_concurrency, 1,
+                                self.max_concurrency, self.latency_target))
+            return self._hosts[host]
+
+    @contextmanager
+    def slot(self, url: str, deadline: Deadline=None) -> Iterator['Slot']:
+        """
+        Waits until a request to the url may be sent. The request should be
+        made inside the block, and its response passed to Slot.observe().
+
+        :param deadline: time budget of the request. DeadlineExceeded is
+                         raised if the wait would outlast it.
+        """
+
+        bucket, limiter = self.host(url)
+        host = _host(url)
+        with self._lock:
+            self._waiting[host] = self._waiting.get(host, 0) + 1
+        try:
+            bucket.acquire(deadline)
+            slot = Slot(self, bucket)
+            started = limiter.acquire(deadline)
+        finally:
+            with self._lock:
+                self._waiting[host] -= 1
+        try:
+            yield slot
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if ((deadline is not None and deadline.expired()) or
+                    (slot.shortened and isinstance(e, requests.Timeout))):
+                # The caller ran out of time, which says nothing about the
+                # host.
+                slot.abandoned = True
+            else:
+                slot.congested = True
+            raise
+        finally:
+            limiter.release(started, slot.congested,
+                            measured=not slot.abandoned)
+
+    def queuing(self, url: str) -> bool:
+        """ Tells whether requests to the url's host are waiting for a slot. """
+
+        with self._lock:
+            return self._waiting.get(_host(url), 0) > 0
+
+
+class Slot:
+    """ A single paced request. See RateLimiter.slot(). """
+
+    def __init__(self, limiter: RateLimiter, bucket: TokenBucket):
+        self.limiter = limiter
+        self.bucket = bucket
+        self.congested = False
+        # Set when the deadline made the timeout shorter than configured.
+        self.shortened = False
+        self.abandoned = False
+
+    def observe(self, response: requests.Response):
+        """
+        Adapts the pace of the host to the response: throttling lowers the
+        concurrency limit, and Retry-After pauses the host.
+        """
+
+        if response.status_code not in THROTTLED:
+            return
+
+        self.congested = True
+        delay = retry_after(response.headers.get('Retry-After'))
+        if delay is not None:
+            self.bucket.pause(min(delay, self.limiter.max_retry_after))
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    :param value: Retry-After header, either seconds or an HTTP date.
+    :return: seconds to wait, or None if the header is missing or invalid.
+    """
+
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment is None:
+        return None
+
+    return max(0.0, moment.timestamp() - time.time())
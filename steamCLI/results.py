@@ -1,4 +1,5 @@
 from steamCLI.steamapp import SteamApp
+from steamCLI.utils import calculate_discount
 
 
 class Results:
@@ -14,6 +15,19 @@ class Results:
         self.site_stats = None
         self.steam = None
         self.itad = None
+        self.regions = None
+        # Sections that were skipped or cut short, e.g. by a deadline.
+        self.partial = []
+
+    def mark_partial(self, section: str):
+        """
+        Notes that a section is missing or incomplete.
+
+        :param section: name of the section, e.g. 'reviews'.
+        """
+
+        if section not in self.partial:
+            self.partial.append(section)
 
     def format_steam_info(self):
         """
@@ -77,6 +91,25 @@ class Results:
         self.itad.append(f'Historical low: {lowest}{currency} (-{cut}%)')
         self.itad.append(f'Shop: {shop}')
 
+    def format_region_prices(self, prices: dict):
+        """
+        Formats a table of app prices in many regions.
+
+        :param prices: region -> price_overview. Free apps have None, and
+                       regions in which the app is not sold are left out.
+        """
+
+        self.regions = list()
+        for region, price in prices.items():
+            if price:
+                current = f'{price["final"] / 100:.2f} {price["currency"]}'
+                initial = f'{price["initial"] / 100:.2f}'
+                discount = calculate_discount(price['initial'], price['final'])
+                row = f'{region.upper():<4}{current:>16}{discount:>5}% from {initial:>9}'
+            else:
+                row = f'{region.upper():<4}{"N/A":>16}{"":>21}'
+            self.regions.append(row)
+
     def format_description(self) -> str:
         """
         Formats given application's description.
@@ -99,8 +132,13 @@ class Results:
             print('\n', self._center_text(self.site_stats))
         if self.itad:
             print('\n', self._center_text(self.itad))
+        if self.regions:
+            print('\n', self._center_text(self.regions))
         if self.description:
             print('\n', self.description.center(self.max_chars))
+        if self.partial:
+            print('\n', f'Partial results: {", ".join(self.partial)} '
+                        f'did not finish in time.'.center(self.max_chars))
 
         print('\n', ''.center(self.max_chars, '*') + '\n')
 
@@ -0,0 +1,199 @@
+import heapq
+import json
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, Iterable, List, Set
+
+from steamCLI.index import normalize_title
+from steamCLI.utils import write_atomically
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Splits text into overlapping three character chunks. Text is padded, so
+    that beginnings of words count for a bit more.
+    """
+
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    """
+    Finds titles that are close to (or start with) a given query.
+
+    Each title is split into trigrams, and each trigram points to positions
+    of the titles that contain it. Near matches share most of their trigrams
+    with the query, hence they come up on top when postings of the query's
+    trigrams are counted.
+    """
+
+    version = 1
+
+    # Postings of common trigrams (e.g., ' th') are long, but tell little.
+    # Once postings of the rarer ones add up to this many entries, the rest
+    # are skipped.
+    max_postings = 1000
+
+    def __init__(self, titles: List[str], postings: Dict[str, array],
+                 source_mtime: float=None):
+        """
+        :param titles: sorted normalized titles.
+        :param postings: trigram -> positions of titles that contain it.
+        :param source_mtime: modification time of the app list file the
+                             index was built from.
+        """
+
+        self.titles = titles
+        self.postings = postings
+        self.source_mtime = source_mtime
+
+    @classmethod
+    def build(cls, titles: Iterable[str],
+              source_mtime: float=None) -> 'FuzzyIndex':
+        """
+        :param titles: normalized titles that should be searchable.
+        :param source_mtime: modification time of the app list file.
+        """
+
+        titles = sorted(set(titles))
+        postings = {}
+        for position, title in enumerate(titles):
+            for gram in trigrams(title):
+                postings.setdefault(gram, array('I')).append(position)
+
+        return cls(titles, postings, source_mtime=source_mtime)
+
+    @classmethod
+    def load(cls, path: str, source_mtime: float=None):
+        """
+        Loads an index from disk. The file consists of a JSON header line
+        followed by all postings as one binary array.
+
+        :param path: file in which the index is stored.
+        :param source_mtime: modification time of the current app list. If
+                             the index was built from a different one, it
+                             is considered outdated.
+        :return: FuzzyIndex, or None if there is no usable index.
+        """
+
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                data = array('I')
+                data.frombytes(f.read())
+        except (OSError, ValueError):
+            return None
+
+        if header.get('version') != cls.version:
+            return None
+        if source_mtime is not None and header.get('source_mtime') != source_mtime:
+            return None
+        if sum(header['lengths']) != len(data):
+            return None
+
+        postings = {}
+        start = 0
+        for gram, length in zip(header['grams'], header['lengths']):
+            postings[gram] = data[start:start + length]
+            start += length
+
+        return cls(header['titles'], postings,
+                   source_mtime=header['source_mtime'])
+
+    def save(self, path: str):
+        """
+        :param path: file in which the index should be stored.
+        """
+
+        grams = list(self.postings)
+        header = {
+            'version': self.version,
+            'source_mtime': self.source_mtime,
+            'titles': self.titles,
+            'grams': grams,
+            'lengths': [len(self.postings[gram]) for gram in grams],
+        }
+        data = array('I')
+        for gram in grams:
+            data.extend(self.postings[gram])
+
+        text = json.dumps(header, ensure_ascii=True, separators=(',', ':'))
+        write_atomically(path, [text.encode('ascii'), b'\n', data.tobytes()])
+
+    def prefix(self, query: str, limit: int=5) -> List[str]:
+        """
+        Finds titles that start with the query. Shorter titles come first,
+        as they are closer to what has been typed.
+
+        :param query: beginning of a title.
+        :param limit: how many titles should be returned at most.
+        """
+
+        query = normalize_title(query)
+        if not query:
+            return []
+
+        matches = []
+        position = bisect_left(self.titles, query)
+        while (position < len(self.titles) and len(matches) < limit * 10 and
+               self.titles[position].startswith(query)):
+            matches.append(self.titles[position])
+            position += 1
+
+        return sorted(matches, key=len)[:limit]
+
+    def search(self, query: str, limit: int=5) -> List[str]:
+        """
+        Finds titles that are most similar to the query, best match first.
+        Similarity is the Jaccard index of title and query trigrams.
+
+        :param query: title that might have typos or missing words.
+        :param limit: how many titles should be returned at most.
+        """
+
+        query = normalize_title(query)
+        grams = trigrams(query)
+        postings = sorted((self.postings[gram] for gram in grams
+                           if gram in self.postings), key=len)
+
+        counts = Counter()
+        counted = 0
+        for positions in postings:
+            if counted >= self.max_postings:
+                break
+            counts.update(positions)
+            counted += len(positions)
+
+        candidates = heapq.nlargest(limit * 4, counts.items(),
+                                    key=itemgetter(1))
+        scored = []
+        for position, _ in candidates:
+            title = self.titles[position]
+            title_grams = trigrams(title)
+            shared = len(grams & title_grams)
+            score = shared / len(grams | title_grams)
+            scored.append((score, title))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+
+        return [title for _, title in scored[:limit]]
+
+    def suggest(self, query: str, limit: int=5) -> List[str]:
+        """
+        Combines prefix and fuzzy matches. Prefix matches come first, since
+        a missing subtitle is the most common reason for a miss.
+
+        :param query: title that was not found.
+        :param limit: how many titles should be returned at most.
+        """
+
+        suggestions = self.prefix(query, limit)
+        for title in self.search(query, limit):
+            if len(suggestions) >= limit:
+                break
+            if title not in suggestions:
+                suggestions.append(title)
+
+        return suggestions
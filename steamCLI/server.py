@@ -0,0 +1,209 @@
+import json
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from steamCLI.deadline import Deadline, DeadlineExceeded
+
+# Flag values that switch a stage off. Anything else (even '') switches it on.
+FALSE = {'0', 'false', 'no', 'off'}
+
+
+class ResponseCache:
+    """
+    Keeps the most recently served lookups in memory, each for ttl seconds,
+    so that popular apps are answered without touching the network.
+    """
+
+    def __init__(self, size: int, ttl: float):
+        """
+        :param size: how many lookups are kept at most. 0 disables the cache.
+        :param ttl: seconds for which a lookup is served from memory.
+        """
+
+        self.size = size
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._records = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[dict]:
+        """ :return: record stored under the key, or None if it expired. """
+
+        with self._lock:
+            item = self._records.get(key)
+            if item is None:
+                return None
+            stored, record = item
+            if time.monotonic() - stored > self.ttl:
+                del self._records[key]
+                return None
+            self._records.move_to_end(key)
+
+            return record
+
+    def put(self, key: tuple, record: dict):
+        if self.size <= 0:
+            return
+
+        with self._lock:
+            self._records[key] = (time.monotonic(), record)
+            self._records.move_to_end(key)
+            while len(self._records) > self.size:
+                self._records.popitem(last=False)
+
+
+def parse_query(query: Dict[str, List[str]], regions: List[str],
+                default_region: str) -> dict:
+    """
+    Turns the query string of a lookup into keyword arguments of
+    process_entry().
+
+    :param query: parsed query string, as returned by parse_qs().
+    :param regions: regions that are available.
+    :param default_region: region used when the query has none.
+    :return: title, app_id, region, scores, historical_low, fuzzy and
+             deadline (seconds, or None).
+    """
+
+    def _value(name):
+        values = query.get(name)
+        return values[-1].strip() if values else None
+
+    def _flag(name):
+        value = _value(name)
+        return value is not None and value.lower() not in FALSE
+
+    title, app_id = _value('title'), _value('appid')
+    if bool(title) == bool(app_id):
+        raise ValueError("Either title or appid is required (but not both).")
+    if app_id and not app_id.isdigit():
+        raise ValueError(f"invalid appid: {app_id!r}")
+
+    region = (_value('region') or default_region).lower()
+    if region not in regions:
+        raise ValueError(f"invalid region: {region!r} "
+                         f"(choose from {', '.join(regions)})")
+
+    deadline = None
+    if _value('deadline'):
+        try:
+            deadline = float(_value('deadline'))
+        except ValueError:
+            deadline = 0
+        if not deadline > 0:
+            raise ValueError(f"invalid deadline: {_value('deadline')!r}")
+
+    return {
+        'title': title or None,
+        'app_id': int(app_id) if app_id else None,
+        'region': region,
+        'scores': _flag('scores'),
+        'historical_low': _flag('historical_low'),
+        'fuzzy': _flag('fuzzy'),
+        'deadline': deadline,
+    }
+
+
+class LookupServer(socketserver.ThreadingMixIn, HTTPServer):
+    """
+    Answers lookups as JSON over HTTP: GET /lookup?title=...|appid=...
+    with optional region, scores, historical_low, fuzzy and deadline.
+
+    Every request is handled in a thread of its own, while the app list
+    indexes, the session (and its connection pool) and the caches are
+    shared by all of them and stay in memory between requests.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], lookup: Callable[..., dict],
+                 regions: List[str], default_region: str,
+                 deadline: float=None, cache: ResponseCache=None):
+        """
+        :param address: (host, port) to listen on. Port 0 picks a free one.
+        :param lookup: callable that takes the keyword arguments returned
+                       by parse_query() (deadline as a Deadline) and returns
+                       a record, as process_entry() does.
+        :param regions: regions that are available.
+        :param default_region: region used when the query has none.
+        :param deadline: seconds a single lookup may take at most. None
+                         means no limit.
+        :param cache: where recent lookups are kept. None disables caching.
+        """
+
+        super().__init__(address, LookupHandler)
+        self.lookup = lookup
+        self.regions = regions
+        self.default_region = default_region
+        self.deadline = deadline
+        self.cache = cache
+
+    def handle_lookup(self, query: Dict[str, List[str]]) -> Tuple[int, dict]:
+        """
+        :param query: parsed query string of the request.
+        :return: HTTP status and JSON-serializable record.
+        """
+
+        try:
+            params = parse_query(query, self.regions, self.default_region)
+        except ValueError as e:
+            return 400, {'error': str(e)}
+
+        seconds = params.pop('deadline')
+        if self.deadline is not None:
+            seconds = min(seconds, self.deadline) if seconds else self.deadline
+        key = tuple(sorted(params.items()))
+        if self.cache:
+            record = self.cache.get(key)
+            if record is not None:
+                return 200, record
+
+        name = params['title'] if params['title'] else params['app_id']
+        try:
+            record = self.lookup(deadline=Deadline(seconds), **params)
+        except DeadlineExceeded:
+            return 504, {'query': name, 'error': "Ran out of time before the "
+                                                 "application was found."}
+        except (requests.RequestException, ValueError) as e:
+            return 502, {'query': name, 'error': str(e)}
+
+        if not record.get('found'):
+            return 404, record
+        # Incomplete records are not kept, so that the next request can fill
+        # in what is missing.
+        if self.cache and 'partial' not in record and 'historical_error' not in record:
+            self.cache.put(key, record)
+
+        return 200, record
+
+
+class LookupHandler(BaseHTTPRequestHandler):
+    """ Routes requests of LookupServer. """
+
+    # Keep-alive, so that clients do not reconnect for every lookup.
+    protocol_version = 'HTTP/1.1'
+    server_version = 'steamCLI'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip('/') != '/lookup':
+            self._send(404, {'error': f"Unknown path: {url.path}"})
+            return
+
+        query = parse_qs(url.query, keep_blank_values=True)
+        self._send(*self.server.handle_lookup(query))
+
+    def _send(self, status: int, record: dict):
+        body = json.dumps(record, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
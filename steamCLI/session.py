@@ -0,0 +1,426 @@
+import random
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from steamCLI.applist import CHUNK_SIZE
+from steamCLI.config import Config
+from steamCLI.deadline import Deadline
+from steamCLI.ratelimit import RateLimiter, retry_after
+
+# Only these are retried or hedged: sending them twice changes nothing.
+IDEMPOTENT = {'GET', 'HEAD', 'OPTIONS'}
+# Statuses that are worth another attempt.
+RETRIED = {429, 500, 502, 503, 504}
+
+
+class Endpoint(namedtuple('Endpoint', ['name', 'prefix', 'timeout', 'hedge'])):
+    """
+    Settings of the requests whose URL (without scheme) starts with prefix.
+    """
+
+    def matches(self, url: str) -> bool:
+        parts = urlsplit(url)
+        return (parts.netloc + parts.path).lower().startswith(self.prefix)
+
+
+class LatencyTracker:
+    """ Keeps the latest latencies of an endpoint. """
+
+    def __init__(self, window: int=200, min_samples: int=20):
+        """
+        :param window: how many latest latencies are kept.
+        :param min_samples: quantiles are not estimated from fewer samples.
+        """
+
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        :return: latency that q of the kept requests did not exceed, or
+                 None if there are not enough samples yet.
+        """
+
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < self.min_samples:
+            return None
+
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class TooManyRequests(requests.HTTPError):
+    """ Host throttled the request (429). """
+
+
+class ServerError(requests.HTTPError):
+    """ Host failed to answer the request (5xx). """
+
+
+def raise_for_status(response: requests.Response,
+                     message: str="Resource not found."):
+    """
+    Raises HTTPError if the response is an error. Throttling and server
+    failures get errors of their own, so that they are not reported as
+    missing resources.
+
+    :param response: response that should be checked.
+    :param message: message of the error for any other status.
+    """
+
+    try:
+        response.raise_for_status()
+    except requests.HTTPError as e:
+        status = e.response.status_code if e.response is not None else None
+        if status == 429:
+            raise TooManyRequests("Too many requests, try again later.",
+                                  response=e.response)
+        if status is not None and status >= 500:
+            raise ServerError(f"Server error ({status}), try again later.",
+                              response=e.response)
+        raise requests.HTTPError(message, response=e.response)
+
+
+class Session(requests.Session):
+    """
+    HTTP session that keeps connections alive between requests.
+
+    Steam's store and API live on a couple of hosts, hence each request
+    after the first one to a host skips the TCP/TLS handshake. Connections
+    are pooled per host, and the pools are capped, so that concurrent
+    callers (e.g., duplicate-title probes) wait for a free connection
+    instead of opening more and more of them.
+
+    With a RateLimiter, every request waits for its host's pace first.
+
+    Idempotent requests that fail with a connection error, a timeout or a
+    status from RETRIED are retried after a jittered, exponentially growing
+    delay. Requests to hedged endpoints are sent a second time if the first
+    one takes longer than hedge_quantile of the endpoint's recent requests,
+    and whichever answers first is used. A single slow or dropped request
+    then costs a little more traffic instead of a stalled lookup. Time spent
+    waiting for the host's pace does not count, and nothing is hedged while
+    requests to the host are queuing: a throttled host gets no extra load.
+    """
+
+    def __init__(self, timeout: Union[float, Tuple[float, float]]=(3.05, 30),
+                 pool_connections: int=4, pool_maxsize: int=10,
+                 limiter: RateLimiter=None, endpoints: Iterable[Endpoint]=(),
+                 retries: int=0, backoff: float=0.5, max_backoff: float=8,
+                 hedge_quantile: float=0.95, hedge_min_samples: int=20):
+        """
+        :param timeout: seconds to wait for a server, either as a single
+                        value or as a (connect, read) pair. Used whenever a
+                        request does not specify its own and its endpoint
+                        has none either.
+        :param pool_connections: how many hosts have their pools kept.
+        :param pool_maxsize: how many connections are kept (and open at
+                             most) per host.
+        :param limiter: paces requests per host. None sends them right away.
+        :param endpoints: per-endpoint timeouts and hedging.
+        :param retries: how many times a failed idempotent request is sent
+                        again.
+        :param backoff: delay (in seconds) before the first retry. Doubles
+                        with each retry, and is jittered.
+        :param max_backoff: longest delay before a retry.
+        :param hedge_quantile: share of an endpoint's requests that should
+                               answer before a hedge is sent.
+        :param hedge_min_samples: how many requests an endpoint needs before
+                                  its requests are hedged.
+        """
+
+        super().__init__()
+        self.timeout = timeout
+        self.limiter = limiter
+        self.endpoints = list(endpoints)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge_quantile = hedge_quantile
+
+        self._latencies = {endpoint.name: LatencyTracker(min_samples=hedge_min_samples)
+                           for endpoint in self.endpoints}
+        # Hedges in flight never outnumber the connections of a host.
+        self._pool_maxsize = pool_maxsize
+        self._hedge_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._hedge_lock = threading.Lock()
+
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize, pool_block=True)
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Creates a session with settings taken from the configuration file.
+        """
+
+        timeout = (config.get_float('HTTP', 'connect_timeout'),
+                   config.get_float('HTTP', 'read_timeout'))
+        pool_connections = config.get_int('HTTP', 'pool_connections')
+        pool_maxsize = config.get_int('HTTP', 'pool_maxsize')
+
+        endpoints = []
+        for name in config.snapshot().get('Endpoints', {}):
+            prefix, connect, read, hedge = config.get_list('Endpoints', name)
+            endpoints.append(Endpoint(name, prefix.lower(),
+                                      (float(connect), float(read)),
+                                      Config.to_bool(hedge)))
+
+        return cls(timeout=timeout, pool_connections=pool_connections,
+                   pool_maxsize=pool_maxsize,
+                   limiter=RateLimiter.from_config(config),
+                   endpoints=endpoints,
+                   retries=config.get_int('Retries', 'retries'),
+                   backoff=config.get_float('Retries', 'backoff'),
+                   max_backoff=config.get_float('Retries', 'max_backoff'),
+                   hedge_quantile=config.get_float('Retries', 'hedge_quantile'),
+                   hedge_min_samples=config.get_int('Retries', 'hedge_min_samples'))
+
+    def endpoint(self, url: str) -> Optional[Endpoint]:
+        """ :return: the first endpoint the url belongs to, if any. """
+
+        return next((endpoint for endpoint in self.endpoints
+                     if endpoint.matches(url)), None)
+
+    def request(self, method: str, url: str, deadline: Deadline=None,
+                **kwargs) -> requests.Response:
+        """
+        Sends a request (see requests.Session.request).
+
+        :param deadline: time budget of the request, including retries. No
+                         attempt waits longer than what is left of it, and
+                         DeadlineExceeded is raised once it runs out.
+        """
+
+        endpoint = self.endpoint(url)
+        timeout = kwargs.pop('timeout', None) or (
+            endpoint.timeout if endpoint else self.timeout)
+        idempotent = method.upper() in IDEMPOTENT
+        hedged = idempotent and endpoint is not None and endpoint.hedge
+        attempts = 1 + (self.retries if idempotent else 0)
+
+        for attempt in range(attempts):
+            kwargs['timeout'] = timeout
+            last = attempt == attempts - 1
+            try:
+                if hedged:
+                    response = self._send_hedged(endpoint, method, url, kwargs,
+                                                 deadline)
+                else:
+                    response = self._send(endpoint, method, url, kwargs,
+                                          deadline)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if deadline is not None:
+                    deadline.raise_if_expired(e)
+                delay = self._retry_delay(attempt)
+                if last or not _fits(delay, deadline):
+                    raise
+                time.sleep(delay)
+                continue
+
+            if last or response.status_code not in RETRIED:
+                return response
+            delay = self._retry_delay(
+                attempt, retry_after(response.headers.get('Retry-After')))
+            if not _fits(delay, deadline):
+                return response
+            response.close()
+            time.sleep(delay)
+
+    def _send(self, endpoint: Optional[Endpoint], method: str, url: str,
+              kwargs: dict, deadline: Deadline=None,
+              sent: Callable[[], None]=None) -> requests.Response:
+        """
+        :param sent: called once the request has waited for its host's pace
+                     and goes out.
+        """
+
+        if self.limiter is None:
+            return self._send_now(endpoint, method, url,
+                                  _clamp(kwargs, deadline), sent)
+
+        # Streamed responses free their slot once the headers arrive;
+        # the pool size still caps how many bodies are read at a time.
+        with self.limiter.slot(url, deadline) as slot:
+            # Part of the budget may have gone to waiting, hence the timeout
+            # is shortened only now.
+            clamped = _clamp(kwargs, deadline)
+            slot.shortened = clamped['timeout'] != kwargs['timeout']
+            response = self._send_now(endpoint, method, url, clamped, sent)
+            slot.observe(response)
+
+        return response
+
+    def _send_now(self, endpoint: Optional[Endpoint], method: str, url: str,
+                  kwargs: dict, sent: Callable[[], None]=None) -> requests.Response:
+        if sent is not None:
+            sent()
+        # Latency is measured from here, so that waiting for the host's pace
+        # does not make the endpoint look slow.
+        started = time.monotonic()
+        response = super().request(method, url, **kwargs)
+
+        if endpoint is not None and response.status_code not in RETRIED:
+            self._latencies[endpoint.name].record(time.monotonic() - started)
+
+        return response
+
+    def _send_hedged(self, endpoint: Endpoint, method: str, url: str,
+                     kwargs: dict, deadline: Deadline=None) -> requests.Response:
+        delay = self._latencies[endpoint.name].quantile(self.hedge_quantile)
+        if delay is None:
+            return self._send(endpoint, method, url, kwargs, deadline)
+
+        # The first attempt gets a thread of its own (rather than one of a
+        # few shared ones), as the caller has to watch the clock meanwhile.
+        sent = threading.Event()
+        first = _start(self._send, endpoint, method, url, kwargs, deadline,
+                       sent.set)
+        first.add_done_callback(lambda _: sent.set())
+        sent.wait()
+        try:
+            return first.result(timeout=delay)
+        except FutureTimeout:
+            pass
+
+        queuing = self.limiter is not None and self.limiter.queuing(url)
+        hedge_slots = self._hedge_slots_of(url)
+        if queuing or not hedge_slots.acquire(blocking=False):
+            return first.result()
+        hedge = _start(self._send, endpoint, method, url, kwargs, deadline)
+        hedge.add_done_callback(lambda _: hedge_slots.release())
+
+        pending = {first, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            succeeded = [future for future in done if future.exception() is None]
+            if succeeded:
+                # Every other response is closed once it arrives.
+                for other in (done | pending) - {succeeded[0]}:
+                    other.add_done_callback(_close_response)
+                return succeeded[0].result()
+
+        # Both failed.
+        return first.result()
+
+    def _hedge_slots_of(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._hedge_lock:
+            if host not in self._hedge_slots:
+                self._hedge_slots[host] = threading.BoundedSemaphore(self._pool_maxsize)
+            return self._hedge_slots[host]
+
+    def _retry_delay(self, attempt: int, requested: float=None) -> float:
+        """
+        :return: how long to wait before a retry: a random delay of up to
+                 backoff * 2^attempt ("full jitter", so that concurrent
+                 callers do not retry in step), or as long as the server
+                 asked, but never longer than max_backoff.
+        """
+
+        delay = random.uniform(0, self.backoff * 2 ** attempt)
+        if requested is not None:
+            delay = max(delay, requested)
+
+        return min(delay, self.max_backoff)
+
+    def stream_resource(self, url: str, chunk_size: int=CHUNK_SIZE,
+                        deadline: Deadline=None) -> Iterator[bytes]:
+        """
+        Streams the response body from a given link in chunks of bytes.
+        Response is closed (and its connection returned to the pool) as
+        soon as the stream is exhausted or abandoned.
+
+        :param url: link to a resource.
+        :param chunk_size: how many bytes should be read at a time.
+        :param deadline: time budget of the whole transfer.
+        """
+
+        return stream_resource(self, url, chunk_size, deadline)
+
+
+def stream_resource(session: requests.Session, url: str,
+                    chunk_size: int=CHUNK_SIZE,
+                    deadline: Deadline=None) -> Iterator[bytes]:
+    """
+    Streams the response body through any session (see
+    Session.stream_resource). Plain requests sessions do not take the
+    deadline, hence it is only checked between their chunks.
+    """
+
+    if deadline is None or not isinstance(session, Session):
+        response = session.get(url, stream=True)
+    else:
+        response = session.get(url, stream=True, deadline=deadline)
+    try:
+        raise_for_status(response)
+    except requests.HTTPError:
+        response.close()
+        raise
+
+    with response:
+        try:
+            for chunk in response.iter_content(chunk_size):
+                if deadline is not None:
+                    deadline.check()
+                yield chunk
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if deadline is not None:
+                deadline.raise_if_expired(e)
+            raise
+
+
+def _fits(delay: float, deadline: Optional[Deadline]) -> bool:
+    """ Tells whether a retry after delay would start before the deadline. """
+
+    remaining = deadline.remaining() if deadline is not None else None
+
+    return remaining is None or delay < remaining
+
+
+def _clamp(kwargs: dict, deadline: Optional[Deadline]) -> dict:
+    """ :return: request kwargs whose timeout does not outlast the deadline. """
+
+    if deadline is None:
+        return kwargs
+
+    return dict(kwargs, timeout=deadline.clamp(kwargs['timeout']))
+
+
+def _start(target: Callable, *args) -> Future:
+    """ Runs target in a thread of its own. :return: Future of its result. """
+
+    future = Future()
+
+    def _run():
+        future.set_running_or_notify_cancel()
+        try:
+            result = target(*args)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    threading.Thread(target=_run, name='hedged-request').start()
+
+    return future
+
+
+def _close_response(future: Future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
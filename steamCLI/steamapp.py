@@ -1,24 +1,68 @@
-import json
-from typing import List, Union
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from html import unescape
+from itertools import islice
+from typing import Callable, Iterable, List, Optional, Pattern, Tuple, Union
 
+import codecs
 import os
+import re
 import requests
 from bs4 import BeautifulSoup
 
+from steamCLI.applist import AppListCache, find_app_by_id, find_apps_by_title
+from steamCLI.deadline import Deadline
+from steamCLI.index import normalize_title
+from steamCLI.plains import PlainMap
+from steamCLI.session import Session, raise_for_status, stream_resource
+from steamCLI.store import AppDetailsStore, Entry
 from steamCLI.utils import sanitize_title, calculate_discount
 
 
+@lru_cache(maxsize=8)
+def _review_pattern(element: str, classes: str) -> Pattern:
+    """
+    Matches elements with exactly the given classes that hold nothing but
+    text, e.g. <span class="a b">text</span>. Captures the text.
+    """
+
+    element, classes = re.escape(element), re.escape(classes)
+    return re.compile(r'<%s\s+class\s*=\s*(?:"%s"|\'%s\')\s*>([^<]*)</%s\s*>'
+                      % (element, classes, classes, element), re.IGNORECASE)
+
+
 class SteamApp:
-    def __init__(self, config=None):
+    # Store pages are read this many bytes at a time, and no more than
+    # max_page_bytes of them are read at all.
+    page_chunk_size = 16 * 1024
+    max_page_bytes = 2 * 1024 * 1024
+
+    def __init__(self, config=None, applist: AppListCache=None,
+                 session: requests.Session=None, store: AppDetailsStore=None,
+                 plains: PlainMap=None):
         """
         Values shown for clarity. In an ideal case, we aim to assign
         values to all of them.
+
+        :param config: Config object with the application settings.
+        :param applist: on-disk cache of Steam's app list. When absent, the
+                        list is downloaded on every lookup.
+        :param session: session through which all requests are made. Apps
+                        that share it share its pooled connections.
+        :param store: on-disk store of appdetails responses. When absent,
+                      app details are fetched on every lookup.
+        :param plains: mapping of app ids to ITAD plains. When absent,
+                       plains are guessed from titles.
         """
 
         if not config:
             raise FileNotFoundError("Configuration file was not found.")
 
         self.config = config
+        self.applist = applist
+        self.session = session if session is not None else Session()
+        self.store = store
+        self.plains = plains
 
         # Key information
         self.title, self.appID = [None] * 2
@@ -35,7 +79,7 @@ class SteamApp:
         self.historical_shop = None
 
     def find_app(self, origin: str, title: str=None, app_id: int=None,
-                 region: str=None):
+                 region: str=None, deadline: Deadline=None):
         """
         Finds an app corresponding to a given title/id. Assigns the object
         information corresponding to the apps.
@@ -50,74 +94,146 @@ class SteamApp:
         :param title: title of an app that needs to be checked.
         :param app_id: id of an app that needs to be checked.
         :param region: region for which the information should be retrieved.
+        :param deadline: time budget of the lookup. DeadlineExceeded is
+                         raised once it runs out.
         """
 
-        text = self._fetch_resource(origin)
-        app_data = self._extract_app_dictionary(text, title=title, app_id=app_id,
-                                                region=region)
+        if self.applist:
+            app_data = self._lookup_app_dictionary(origin, title=title,
+                                                   app_id=app_id, region=region,
+                                                   deadline=deadline)
+        else:
+            if not isinstance(self.session, Session):
+                # Plain requests sessions have no stream_resource() of
+                # their own.
+                chunks = stream_resource(self.session, origin, deadline=deadline)
+            elif deadline is None:
+                chunks = self.session.stream_resource(origin)
+            else:
+                chunks = self.session.stream_resource(origin, deadline=deadline)
+            app_data = self._extract_app_dictionary(chunks, title=title,
+                                                    app_id=app_id, region=region,
+                                                    deadline=deadline)
         self._assign_steam_info(app_data)
 
-    @staticmethod
-    def _fetch_resource(origin: str, text: bool=True) -> Union[str, dict]:
+    def _fetch_resource(self, origin: str, text: bool=True,
+                        deadline: Deadline=None) -> Union[str, dict]:
         """
         Gets the textual JSON representation from a given link.
 
         :param origin: link to a resource.
         :param text: determines what should be returned: json or text.
+        :param deadline: time budget of the request.
         """
 
-        try:
-            response = requests.get(origin)
-            response.raise_for_status()
-        except requests.HTTPError:
-            raise requests.HTTPError("Resource not found.")
+        response = self._get(origin, deadline)
+        raise_for_status(response)
+        if text:
+            return response.text
         else:
-            if text:
-                return response.text
-            else:
-                return response.json()
+            return response.json()
+
+    def _get(self, url: str, deadline: Deadline=None,
+             **kwargs) -> requests.Response:
+        """
+        GETs a url through the session. The deadline is passed on only when
+        there is one, as plain requests sessions do not take it.
+        """
+
+        if deadline is not None:
+            kwargs['deadline'] = deadline
 
-    def _extract_app_dictionary(self, json_text: str, title: str=None,
-                                app_id: int=None, region: str=None) -> dict:
+        return self.session.get(url, **kwargs)
+
+    def _extract_app_dictionary(self, chunks: Iterable[bytes], title: str=None,
+                                app_id: int=None, region: str=None,
+                                deadline: Deadline=None) -> dict:
         """
-        Extracts dict in which app resides from JSON response by loading textual
-        representation of JSON and applying private inner function to it over
-        and over again.
+        Extracts dict in which app resides from a stream of the app list.
+
+        The list is never decoded as a whole. When searching by id, reading
+        stops as soon as the app is found. When searching by title, only the
+        dicts that might match are decoded.
 
-        :param json_text: textual representation of JSON object.
+        :param chunks: app list bytes, as returned by Steam's GetAppList API.
         :param title: title of the to-be-found app
         :param app_id: id of the to-be-found app
         :param region: region for which the data should be fetched
+        :param deadline: time budget of the lookup.
         :return: dictionary that has the relevant information about an app.
         """
 
         app_dicts = []
+        if title:
+            app_dicts = find_apps_by_title(chunks, title)
+        elif app_id is not None:
+            app_dict = find_app_by_id(chunks, app_id)
+            if app_dict:
+                app_dicts.append(app_dict)
 
-        def _decode_dictionary(dictionary: dict) -> dict:
-            """
-            Search for key with "name" value that == target application name.
-            If found, it means the dictionary is the one we are interested in.
+        json_data = self._pick_complete_json(app_dicts, region=region,
+                                             deadline=deadline)
 
-            :param dictionary: app dictionary (i.e. {"appid": int, "name": str})
-            """
+        return json_data
 
-            try:
-                if title:
-                    if dictionary["name"].lower() == title.lower():
-                        app_dicts.append(dictionary)
-                else:
-                    if dictionary["appid"] == app_id:
-                        app_dicts.append(dictionary)
-            except KeyError:
-                pass
-            return dictionary
+    def _lookup_app_dictionary(self, origin: str, title: str=None,
+                               app_id: int=None, region: str=None,
+                               deadline: Deadline=None) -> dict:
+        """
+        Finds app dict by probing indexes of the cached app list, which
+        avoids decoding the list itself.
 
-        json.loads(json_text, object_hook=_decode_dictionary)
-        json_data = self._pick_complete_json(app_dicts, region=region)
+        :param origin: url to resource: where a list of games is located.
+        :param title: title of the to-be-found app
+        :param app_id: id of the to-be-found app
+        :param region: region for which the data should be fetched
+        :param deadline: time budget of the lookup.
+        :return: dictionary that has the relevant information about an app.
+        """
 
-        return json_data
+        app_dicts = []
+        if title:
+            index = self.applist.title_index(origin, deadline)
+            app_dicts = [{"appid": appid, "name": title}
+                         for appid in index.lookup(title)]
+        elif app_id is not None:
+            name = self.applist.appid_index(origin, deadline).lookup(app_id)
+            if name is not None:
+                app_dicts.append({"appid": app_id, "name": name})
+
+        return self._pick_complete_json(app_dicts, region=region,
+                                        deadline=deadline)
+
+    def suggest_titles(self, origin: str, title: str, limit: int=5,
+                       deadline: Deadline=None) -> List[str]:
+        """
+        Finds titles of apps that are close to a title which was not found,
+        e.g. because of a typo or a missing subtitle.
 
-    def _pick_complete_json(self, dicts: List[dict], region: str=None) -> dict:
+        :param origin: url to resource: where a list of games is located.
+        :param title: title that was not found.
+        :param limit: how many suggestions should be returned at most.
+        :param deadline: time budget of the search. The first search builds
+                         the fuzzy index, which takes a couple of seconds.
+        :return: app names, best match first.
+        """
+
+        if not self.applist:
+            return []
+
+        titles = self.applist.title_index(origin, deadline)
+        names = self.applist.appid_index(origin, deadline)
+        suggestions = []
+        fuzzy = self.applist.fuzzy_index(origin, deadline)
+        for normalized in fuzzy.suggest(title, limit):
+            appids = titles.lookup(normalized)
+            name = names.lookup(appids[0]) if appids else None
+            suggestions.append(name if name else normalized)
+
+        return suggestions
+
+    def _pick_complete_json(self, dicts: List[dict], region: str=None,
+                            deadline: Deadline=None) -> dict:
         """
         Goes through dictionaries to an app that can be consumed successfully.
 
@@ -130,28 +246,166 @@ class SteamApp:
         responds to queries. All others return {"[appid]":{"success":false}},
         which is not useful. Unfortunately, it is impossible to know which
         one will return a useful response (at least without resorting to 3rd
-        party APIs). Hence, in the worst case, each and every one of dicts will
-        have to be checked, potentially slowing the application significantly.
+        party APIs). Hence, candidates are probed concurrently (but no more
+        than probe_workers at a time), and the first successful response
+        wins. Candidates that have not been probed by then are dropped.
+        With a store, duds are remembered and skipped for a while, and the
+        winner is remembered for the title, so that it is asked first.
 
         *http://store.steampowered.com/api/appdetails?appids=id
 
         :param dicts: app dicts to be checked. Typical input:
                       {"appid": int, "name": str}
         :param region: region for which the information should be retrieved.
+        :param deadline: time budget of the probes.
         :return: JSON of successful query (i.e., dictionary with app info)
         """
 
-        if dicts:
-            base_url = self.config.get_value('SteamAPIs', 'appinfo')
-            if not region:
-                region = self.config.get_value('SteamRegions', 'default')
-            for d in dicts:
-                appid = d['appid']
-                resource = f'{base_url}{appid}&cc={region}'
-                response = requests.get(resource)
-                data = response.json()
-                if data[str(appid)]['success']:
-                    return data[str(appid)]['data']
+        if not dicts:
+            return None
+
+        base_url = self.config.get_value('SteamAPIs', 'appinfo')
+        if not region:
+            region = self.config.get_value('SteamRegions', 'default')
+
+        if len(dicts) == 1:
+            return self._probe_app(base_url, dicts[0]['appid'], region,
+                                   deadline)
+        if self.store is None:
+            return self._probe_concurrently(base_url, dicts, region,
+                                            deadline)[1]
+
+        # Skip candidates that are known to be duds, and try the one that
+        # answered the last time first.
+        title = normalize_title(dicts[0]['name'])
+        failed = self.store.failures([d['appid'] for d in dicts], region)
+        dicts = [d for d in dicts if d['appid'] not in failed]
+        resolved = self.store.resolution(title, region)
+        if any(d['appid'] == resolved for d in dicts):
+            data = self._probe_app(base_url, resolved, region, deadline)
+            if data is not None:
+                return data
+            dicts = [d for d in dicts if d['appid'] != resolved]
+
+        appid, data = self._probe_concurrently(base_url, dicts, region,
+                                               deadline)
+        if data is not None:
+            self.store.resolve(title, region, appid)
+
+        return data
+
+    def _probe_concurrently(self, base_url: str, dicts: List[dict], region: str,
+                            deadline: Deadline=None) -> Tuple[Optional[int], Optional[dict]]:
+        """
+        Probes candidates (but no more than probe_workers at a time) until
+        one of them responds successfully.
+
+        :return: id and information of the app that responded, or (None,
+                 None) if all of them are duds.
+        """
+
+        if not dicts:
+            return None, None
+
+        workers = min(len(dicts), self.config.get_int('SteamAPIs', 'probe_workers'))
+        candidates = iter(dicts)
+        executor = ThreadPoolExecutor(max_workers=workers)
+        in_flight = {executor.submit(self._probe_app, base_url, d['appid'], region,
+                                     deadline): d['appid']
+                     for d in islice(candidates, workers)}
+        try:
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    appid = in_flight.pop(future)
+                    data = future.result()
+                    if data is not None:
+                        return appid, data
+                    # Keep the window full: one finished, another one starts.
+                    for d in islice(candidates, 1):
+                        future = executor.submit(self._probe_app, base_url,
+                                                 d['appid'], region, deadline)
+                        in_flight[future] = d['appid']
+        finally:
+            for future in in_flight:
+                future.cancel()
+            # Probes that are already running are left to finish on their own.
+            executor.shutdown(wait=False)
+
+        return None, None
+
+    def _probe_app(self, base_url: str, appid: int, region: str,
+                   deadline: Deadline=None) -> dict:
+        """
+        Retrieves information about a single app. Stored data is used when
+        there is any. If it is stale, it is refreshed in the background.
+
+        :param base_url: appdetails endpoint that only lacks an id.
+        :param appid: id of the app that should be queried.
+        :param region: region for which the information should be retrieved.
+        :param deadline: time budget of the request.
+        :return: app information, or None if the app is a dud.
+        """
+
+        if self.store is not None:
+            entry = self.store.get(appid, region)
+            if entry:
+                if entry.stale:
+                    self.store.revalidate(
+                        appid, region,
+                        lambda: self._refresh_stored_app(base_url, appid,
+                                                         region, entry))
+                return entry.data
+
+        data = self._fetch_app_details(base_url, appid, region, deadline)
+        if self.store is not None:
+            if data is not None:
+                self.store.put(appid, region, data)
+            else:
+                self.store.add_failure(appid, region)
+
+        return data
+
+    def _fetch_app_details(self, base_url: str, appid: int, region: str,
+                           deadline: Deadline=None) -> dict:
+        """
+        Queries Steam API for information about a single app.
+
+        :param base_url: appdetails endpoint that only lacks an id.
+        :param appid: id of the app that should be queried.
+        :param region: region for which the information should be retrieved.
+        :param deadline: time budget of the request.
+        :return: app information, or None if the app is a dud.
+        """
+
+        resource = f'{base_url}{appid}&cc={region}'
+        response = self._get(resource, deadline)
+        raise_for_status(response)
+        data = response.json()
+        if data[str(appid)]['success']:
+            return data[str(appid)]['data']
+
+        return None
+
+    def _refresh_stored_app(self, base_url: str, appid: int, region: str,
+                            entry: Entry):
+        """
+        Replaces stale parts of stored app data. If only the price is stale,
+        the much smaller price-only response is enough.
+        """
+
+        if entry.static_stale:
+            data = self._fetch_app_details(base_url, appid, region)
+            if data is not None:
+                self.store.put(appid, region, data)
+            return
+
+        prices_url = self.config.get_value('SteamAPIs', 'appprices')
+        data = self._fetch_app_details(prices_url, appid, region)
+        if data is not None:
+            price_overview = (data.get('price_overview')
+                              if isinstance(data, dict) else None)
+            self.store.put_price(appid, region, price_overview)
 
     def _assign_steam_info(self, app_data: dict=None):
         """
@@ -170,25 +424,97 @@ class SteamApp:
         self.description = self._get_value(app_data, 'short_description')
         self.metacritic = self._get_nested_value(app_data, 'metacritic',
                                                  'score')
-        self.currency = self._get_nested_value(app_data, 'price_overview',
-                                               'currency')
-        self.initial_price = self._get_nested_value(app_data, 'price_overview',
-                                                    'initial')
-        self.final_price = self._get_nested_value(app_data, 'price_overview',
-                                                  'final')
+        self.assign_price_info(self._get_value(app_data, 'price_overview'))
+
+    def assign_price_info(self, price_overview: dict=None):
+        """
+        Assigns pricing information to the object. Free apps (and apps that
+        are not sold) do not have any, hence None is fine.
+
+        :param price_overview: 'price_overview' part of steam api app data.
+        """
+
+        price_overview = price_overview if price_overview else {}
+        self.currency = self._get_value(price_overview, 'currency')
+        self.initial_price = self._get_value(price_overview, 'initial')
+        self.final_price = self._get_value(price_overview, 'final')
         self.discount = calculate_discount(self.initial_price, self.final_price)
 
-    def scrape_app_page(self):
+    def retrieve_review_scores(self, deadline: Deadline=None):
+        """
+        Assigns review counts and how many of them were positive, taking
+        them from the source named by reviews_source in the config: either
+        the app page ('page') or Steam's JSON review summary ('summary').
+
+        :param deadline: time budget of the retrieval.
+        """
+
+        if self.config.get_value('SteamAPIs', 'reviews_source') == 'summary':
+            self.fetch_review_summary(deadline=deadline)
+        else:
+            self.scrape_app_page(deadline=deadline)
+
+    def fetch_review_summary(self, deadline: Deadline=None):
+        """
+        Retrieves review scores from Steam's JSON review summary: a few
+        hundred bytes per app instead of the whole app page. Recent scores
+        come from the same query limited to the last recent_days days.
+
+        :param deadline: time budget of the retrieval.
+        """
+
+        if not self.appID:
+            return
+
+        url = self.config.get_value('SteamAPIs', 'appreviews')
+        url = url.replace('[id]', str(self.appID))
+        days = self.config.get_value('SteamAPIs', 'recent_days')
+        recent_url = f'{url}&filter=all&day_range={days}'
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            overall, recent = executor.map(self._fetch_review_summary,
+                                           [url, recent_url],
+                                           [deadline, deadline])
+
+        if overall:
+            self.overall_count, self.overall_percent = overall
+        if overall and recent:
+            self.recent_count, self.recent_percent = recent
+
+    def _fetch_review_summary(self, url: str, deadline: Deadline=None
+                              ) -> Optional[Tuple[str, str]]:
+        """
+        :param url: appreviews query of an app.
+        :param deadline: time budget of the request.
+        :return: score tuple (count, percentage) formatted the way they are
+                 shown on the app page, e.g. ('16,855', '85%'), or None if
+                 there are no reviews.
+        """
+
+        data = self._fetch_resource(url, text=False, deadline=deadline)
+        summary = self._get_value(data, 'query_summary') or {}
+        total = self._get_value(summary, 'total_reviews')
+        positive = self._get_value(summary, 'total_positive')
+        if not total or positive is None:
+            return None
+
+        return f'{total:,}', f'{positive * 100 // total}%'
+
+    def scrape_app_page(self, deadline: Deadline=None):
         """
         Scrapes app page for information on reviews and how many of them were
         positive.
+
+        :param deadline: time budget of the download. Once it runs out, only
+                         the part of the page that has arrived is scraped.
         """
 
         if not self.appID:
             return
 
         url = self._construct_app_url()
-        html = self._download_app_html(url)
+        html = self._download_app_html(url, enough=self._has_review_text,
+                                       deadline=deadline)
         reviews = self._extract_review_text(html)
         scores = self._extract_app_scores(reviews)
 
@@ -216,12 +542,18 @@ class SteamApp:
 
         return url
 
-    def _download_app_html(self, url: str) -> str:
+    def _download_app_html(self, url: str, enough: Callable[[str], bool]=None,
+                           deadline: Deadline=None) -> str:
         """
-        Scrapes review scores from the app's Steam page.
+        Downloads the app's Steam page. The page is streamed, and reading
+        stops as soon as everything that is needed has arrived, once
+        max_page_bytes have been read, or once the deadline runs out.
 
         :param url: url which will be used to retrieve app html.
-        :return: html (string) of the whole page.
+        :param enough: callable that tells whether the html read so far
+                       holds everything that is needed.
+        :param deadline: time budget of the download.
+        :return: html (string) of the page, or of its beginning.
         """
 
         if not url:
@@ -231,26 +563,62 @@ class SteamApp:
         age_value = self.config.get_value('SteamWebsite', 'age_value')
         age_cookie = {age_key: age_value}
 
+        response = self._get(url, deadline, cookies=age_cookie, stream=True)
         try:
-            response = requests.get(url, cookies=age_cookie)
-            response.raise_for_status()
+            raise_for_status(response, "App page not found.")
         except requests.HTTPError:
-            raise requests.HTTPError("App page not found.")
-        else:
-            return response.text
+            response.close()
+            raise
+
+        # Leaving the block early closes the connection, hence the rest of
+        # the page is never transferred.
+        with response:
+            decoder = codecs.getincrementaldecoder(
+                response.encoding or 'utf-8')(errors='replace')
+            html = ''
+            read = 0
+            try:
+                for chunk in response.iter_content(self.page_chunk_size):
+                    html += decoder.decode(chunk)
+                    read += len(chunk)
+                    if read >= self.max_page_bytes or (enough and enough(html)):
+                        break
+                    if deadline is not None and deadline.expired():
+                        break
+                else:
+                    html += decoder.decode(b'', final=True)
+            except (requests.ConnectionError, requests.Timeout):
+                # A read timeout clamped to the deadline: the part of the
+                # page that has arrived is all there is time for.
+                if deadline is None or not deadline.expired():
+                    raise
+
+        return html
+
+    def _has_review_text(self, html: str) -> bool:
+        """
+        Tells whether both overall and recent review lines are in the html.
+        """
+
+        element = self.config.get_value('SteamWebsite', 'reviews_element')
+        classes = self.config.get_value('SteamWebsite', 'reviews_class')
+        if html.count(classes) < 2:
+            return False
+
+        return len(_review_pattern(element, classes).findall(html)) >= 2
 
     def _extract_review_text(self, html: str) -> List[str]:
         """
         Extracts recent/overall review text (lines) from html.
 
         First, we get the elements and their classes, so we know what to
-        search for. Then, we comb that document to find all elements that
-        match our criteria. This results in a list of ResultSet objects.
-        Each of these objects has children, over which we can iterate (e.g.,
-        by calling next(iterable) or simple for loops). Since reviews have a
-        lot of whitespace applied to them, we need to remove it. Once we do
-        it, we can return a list of review lines, so that it can be processed
-        further or used as is.
+        search for. Store pages are hundreds of KB, while reviews live in a
+        couple of plain elements, hence these are picked out of the text
+        directly. Only when that is not possible (e.g., the element has
+        children, or its class appears elsewhere), the whole page is parsed.
+        Since reviews have a lot of whitespace applied to them, we need to
+        remove it. Once we do it, we can return a list of review lines, so
+        that it can be processed further or used as is.
 
         :param html: html of the page to be parsed.
         :return: list of review lines.
@@ -263,10 +631,32 @@ class SteamApp:
 
         element = self.config.get_value('SteamWebsite', 'reviews_element')
         classes = self.config.get_value('SteamWebsite', 'reviews_class')
+        # Results might be empty. This is fine = app does not have any reviews.
+        if classes not in html:
+            return reviews
+
+        matches = _review_pattern(element, classes).findall(html)
+        if len(matches) == html.count(classes):
+            reviews = [unescape(text).strip() for text in matches]
+            reviews.reverse()  # This way recent is last.
+            return reviews
+
+        return self._parse_review_text(html, element, classes)
+
+    @staticmethod
+    def _parse_review_text(html: str, element: str, classes: str) -> List[str]:
+        """
+        Extracts review lines by parsing the whole page. Slow, but handles
+        whatever markup the page has.
+
+        Each of the found elements has children, over which we can iterate
+        (e.g., by calling next(iterable) or simple for loops).
+        """
+
+        reviews = list()
         app_page = BeautifulSoup(html, "html.parser")
         results = app_page.findAll(element, {'class': classes})
 
-        # Results might be empty. This is fine = app does not have any reviews.
         while results:
             result = results.pop()  # This way recent is last.
             review = ''.join(child.strip() for child in result.children)
@@ -301,20 +691,40 @@ class SteamApp:
 
         return scores
 
-    def extract_historical_low(self, region: str):
+    def extract_historical_low(self, region: str, deadline: Deadline=None):
         """ 
         Extracts historical low price by calling Is There Any Deal API.
 
         :param region: which region should the price be found for.
+        :param deadline: time budget of the request.
         """
 
         if not self.title:
             return
 
-        sanitized_title = sanitize_title(self.title)
-        url = self._construct_itad_url(sanitized_title, region)
-        itad_json = self._fetch_resource(url, text=False)
-        itad_data = itad_json['data'][sanitized_title]
+        plain = self.itad_plain()
+        url = self._construct_itad_url(plain, region)
+        itad_json = self._fetch_resource(url, text=False, deadline=deadline)
+        self.assign_historical_low(itad_json['data'][plain])
+
+    def itad_plain(self) -> str:
+        """
+        :return: ITAD identifier of the app: a known one if there is a
+                 mapping, otherwise a guess based on the title.
+        """
+
+        plain = self.plains.lookup(self.appID) if self.plains and self.appID else None
+
+        return plain if plain else sanitize_title(self.title)
+
+    def assign_historical_low(self, itad_data: dict):
+        """
+        Assigns historical low information to the object.
+
+        :param itad_data: part of ITAD's game/lowest response that belongs
+                          to the app's title.
+        """
+
         self.historical_cut = self._get_value(itad_data, 'cut')
         self.historical_low = self._get_value(itad_data, 'price')
         self.historical_shop = self._get_nested_value(itad_data, 'shop', 'name')
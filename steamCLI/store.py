@@ -0,0 +1,260 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from typing import Callable, Iterable, Optional, Set
+
+import requests
+
+# Parts of appdetails data that change often. Everything else (name,
+# release date, description, metacritic score, ...) is considered static.
+PRICE_KEY = 'price_overview'
+
+
+class Entry(namedtuple('Entry', ['data', 'price_stale', 'static_stale'])):
+    @property
+    def stale(self) -> bool:
+        return self.price_stale or self.static_stale
+
+
+class AppDetailsStore:
+    """
+    Keeps appdetails responses on disk, keyed by (appid, region).
+
+    Prices change far more often than the rest of the data, hence each part
+    has a TTL of its own. Stale entries are still served, while a fresh
+    copy is fetched in the background, so that repeated lookups of the same
+    app never wait for the network.
+
+    Apps that answer with {"success": false} are remembered as well (for
+    failure_ttl), together with the app each duplicate title resolved to.
+    """
+
+    schema = '''
+        CREATE TABLE IF NOT EXISTS appdetails (
+            appid INTEGER NOT NULL,
+            cc TEXT NOT NULL,
+            static TEXT NOT NULL,
+            static_fetched REAL NOT NULL,
+            price TEXT,
+            price_fetched REAL NOT NULL,
+            PRIMARY KEY (appid, cc)
+        );
+        CREATE TABLE IF NOT EXISTS failures (
+            appid INTEGER NOT NULL,
+            cc TEXT NOT NULL,
+            failed REAL NOT NULL,
+            PRIMARY KEY (appid, cc)
+        );
+        CREATE TABLE IF NOT EXISTS resolutions (
+            title TEXT NOT NULL,
+            cc TEXT NOT NULL,
+            appid INTEGER NOT NULL,
+            resolved REAL NOT NULL,
+            PRIMARY KEY (title, cc)
+        );
+    '''
+
+    def __init__(self, path: str, price_ttl: int, static_ttl: int,
+                 failure_ttl: int=None):
+        """
+        :param path: SQLite database file. Created if it does not exist.
+        :param price_ttl: seconds for which price information is fresh.
+        :param static_ttl: seconds for which the rest of the data is fresh.
+        :param failure_ttl: seconds for which failed apps are skipped and
+                            resolved titles are trusted. Defaults to
+                            static_ttl.
+        """
+
+        self.path = os.path.expanduser(path)
+        self.price_ttl = price_ttl
+        self.static_ttl = static_ttl
+        self.failure_ttl = failure_ttl if failure_ttl is not None else static_ttl
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        # Background refreshes use the same connection, hence it is guarded
+        # by a lock instead of being tied to the thread that created it.
+        self._db = sqlite3.connect(self.path, timeout=5,
+                                   check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.executescript(self.schema)
+
+        self._refreshing = set()
+        self._threads = []
+
+    @classmethod
+    def from_config(cls, config, filename: str='appdetails.sqlite'):
+        """
+        Creates a store with settings taken from the configuration file.
+        """
+
+        directory = os.path.expanduser(config.get_value('Cache', 'directory'))
+        price_ttl = config.get_int('Cache', 'price_ttl')
+        static_ttl = config.get_int('Cache', 'static_ttl')
+        failure_ttl = config.get_int('Cache', 'failure_ttl')
+
+        return cls(os.path.join(directory, filename), price_ttl, static_ttl,
+                   failure_ttl=failure_ttl)
+
+    def get(self, appid: int, region: str) -> Optional[Entry]:
+        """
+        :param appid: id of the app.
+        :param region: region the data was retrieved for.
+        :return: Entry with the app data and whether its parts are stale, or
+                 None if the app has not been stored.
+        """
+
+        with self._lock:
+            row = self._db.execute(
+                'SELECT static, static_fetched, price, price_fetched '
+                'FROM appdetails WHERE appid = ? AND cc = ?',
+                (appid, region)).fetchone()
+        if not row:
+            return None
+
+        static, static_fetched, price, price_fetched = row
+        data = json.loads(static)
+        price = json.loads(price) if price else None
+        if price is not None:
+            data[PRICE_KEY] = price
+
+        now = time.time()
+        return Entry(data, price_stale=now - price_fetched > self.price_ttl,
+                     static_stale=now - static_fetched > self.static_ttl)
+
+    def put(self, appid: int, region: str, data: dict):
+        """
+        Stores app data as returned by the appdetails endpoint.
+
+        :param appid: id of the app.
+        :param region: region the data was retrieved for.
+        :param data: 'data' part of the appdetails response.
+        """
+
+        static = {key: value for key, value in data.items()
+                  if key != PRICE_KEY}
+        price = data.get(PRICE_KEY)
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO appdetails VALUES (?, ?, ?, ?, ?, ?)',
+                (appid, region, json.dumps(static), now,
+                 json.dumps(price) if price is not None else None, now))
+
+    def put_price(self, appid: int, region: str, price_overview: dict=None):
+        """
+        Replaces price information of an already stored app.
+
+        :param appid: id of the app.
+        :param region: region the price was retrieved for.
+        :param price_overview: price information. None for free apps.
+        """
+
+        price = (json.dumps(price_overview)
+                 if price_overview is not None else None)
+        with self._lock, self._db:
+            self._db.execute(
+                'UPDATE appdetails SET price = ?, price_fetched = ? '
+                'WHERE appid = ? AND cc = ?',
+                (price, time.time(), appid, region))
+
+    def add_failure(self, appid: int, region: str):
+        """
+        Remembers that an app has no information for a region.
+        """
+
+        with self._lock, self._db:
+            self._db.execute('INSERT OR REPLACE INTO failures VALUES (?, ?, ?)',
+                             (appid, region, time.time()))
+
+    def failures(self, appids: Iterable[int], region: str) -> Set[int]:
+        """
+        :param appids: ids of the apps that should be checked.
+        :param region: region the apps are looked up for.
+        :return: ids of the apps that failed recently.
+        """
+
+        appids = list(appids)
+        placeholders = ','.join('?' * len(appids))
+        with self._lock:
+            rows = self._db.execute(
+                f'SELECT appid FROM failures WHERE cc = ? AND failed > ? '
+                f'AND appid IN ({placeholders})',
+                [region, time.time() - self.failure_ttl] + appids).fetchall()
+
+        return {appid for appid, in rows}
+
+    def resolve(self, title: str, region: str, appid: int):
+        """
+        Remembers which of the apps that share a title responded.
+
+        :param title: normalized title.
+        :param region: region the app was looked up for.
+        :param appid: id of the app that responded.
+        """
+
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO resolutions VALUES (?, ?, ?, ?)',
+                (title, region, appid, time.time()))
+
+    def resolution(self, title: str, region: str) -> Optional[int]:
+        """
+        :param title: normalized title.
+        :param region: region the app is looked up for.
+        :return: id of the app the title resolved to recently, if any.
+        """
+
+        with self._lock:
+            row = self._db.execute(
+                'SELECT appid FROM resolutions WHERE title = ? AND cc = ? '
+                'AND resolved > ?',
+                (title, region, time.time() - self.failure_ttl)).fetchone()
+
+        return row[0] if row else None
+
+    def revalidate(self, appid: int, region: str, refresh: Callable[[], None]):
+        """
+        Runs a refresh of a stale entry in a separate thread, unless the
+        entry is already being refreshed.
+
+        The thread is not a daemon: a short-lived process finishes the
+        refresh before exiting, so that the next run finds fresh data.
+
+        :param appid: id of the app.
+        :param region: region of the entry.
+        :param refresh: callable that fetches fresh data and stores it.
+        """
+
+        key = (appid, region)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            # Long-running processes (watch, serve) refresh a lot.
+            self._threads = [thread for thread in self._threads
+                             if thread.is_alive()]
+            thread = threading.Thread(target=self._background_refresh,
+                                      args=(key, refresh),
+                                      name=f'appdetails-refresh-{appid}')
+            self._threads.append(thread)
+            thread.start()
+
+    def wait(self, timeout: float=None):
+        """ Blocks until background refreshes (if any) finish. """
+
+        for thread in list(self._threads):
+            thread.join(timeout)
+
+    def _background_refresh(self, key: tuple, refresh: Callable[[], None]):
+        try:
+            refresh()
+        except (requests.RequestException, ValueError, KeyError):
+            # Stale entry is still usable. Next lookup will try again.
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
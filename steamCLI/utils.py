@@ -1,3 +1,7 @@
+import os
+import threading
+from typing import Iterable, Iterator
+
 TRANSFORMATIONS = {
     "1": 'i',
     "2": 'ii',
@@ -12,6 +16,12 @@ TRANSFORMATIONS = {
 
 ALLOWED = set('abcdefghijklmnopqrstuvwxy0123456789')
 
+# Tables for sanitize_titles(). Anything outside of ALLOWED is deleted in one
+# bytes.translate() call (non-ASCII characters are dropped when encoding),
+# digits are then romanized in one str.translate() call.
+_DISALLOWED_BYTES = bytes(byte for byte in range(128) if chr(byte) not in ALLOWED)
+_ROMANIZE = str.maketrans(TRANSFORMATIONS)
+
 
 def sanitize_title(title: str) -> str:
     """
@@ -42,6 +52,28 @@ def sanitize_title(title: str) -> str:
     return romanized
 
 
+def sanitize_titles(titles: Iterable[str]) -> Iterator[str]:
+    """
+    Sanitizes many titles at once. Yields exactly what sanitize_title()
+    returns for each of them, but in a single pass over precompiled tables,
+    which matters when the whole app list is sanitized.
+
+    :param titles: apps' titles which need to be sanitized.
+    """
+
+    for title in titles:
+        lowercase_title = title.lower()
+        # Whitespace is deleted anyway, so words only need to be split when
+        # there is an article to remove.
+        if 'the' in lowercase_title:
+            lowercase_title = ''.join(word for word in lowercase_title.split()
+                                      if word != 'the')
+        ascii_title = lowercase_title.encode('ascii', 'ignore')
+        sanitized = ascii_title.translate(None, _DISALLOWED_BYTES).decode('ascii')
+
+        yield sanitized.translate(_ROMANIZE)
+
+
 def remove_articles(text: str) -> str:
     """
     Removes articles from a given text. Not particularly fast, but since
@@ -87,3 +119,28 @@ def calculate_discount(initial: int, current: int) -> int:
     percent = (difference / initial) * 100
 
     return int(round(percent, 0))
+
+
+def write_atomically(path: str, chunks: Iterable[bytes]):
+    """
+    Writes data to a temporary file first and then moves it in place, so that
+    concurrent readers never see a half-written file.
+
+    :param path: file which should be (over)written.
+    :param chunks: contents of the file.
+    """
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(temporary, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
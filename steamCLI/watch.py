@@ -0,0 +1,193 @@
+import argparse
+import json
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, TextIO, Tuple
+
+import requests
+
+from steamCLI.batch import app_record, find_entry
+from steamCLI.catalog import Catalog
+from steamCLI.steamapp import SteamApp
+
+UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_interval(value: str) -> float:
+    """
+    Turns an interval such as '90', '30s', '15m', '6h' or '1d' into seconds.
+    """
+
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*', value.lower())
+    if not match or float(match.group(1)) <= 0:
+        raise argparse.ArgumentTypeError(
+            f"invalid interval: {value!r} (e.g. 90, 30s, 15m, 6h, 1d)")
+
+    return float(match.group(1)) * UNITS[match.group(2)]
+
+
+def resolve_apps(entries: Iterable[Tuple[str, int]], make_app: Callable[[], SteamApp],
+                 app_list: str, region: str=None, fuzzy: bool=False,
+                 workers: int=8) -> Tuple[List[SteamApp], list]:
+    """
+    Finds the apps of a watchlist, workers at a time.
+
+    :param entries: (title, app id) pairs, as yielded by parse_entries().
+    :param make_app: callable that creates a fresh SteamApp.
+    :param app_list: Steam's endpoint that has JSON of all the Steam apps.
+    :param region: region for which the apps should be looked up.
+    :param fuzzy: whether the closest title should be used when there is
+                  no exact match.
+    :param workers: how many apps are looked up at the same time.
+    :return: apps that were found, and queries that were not.
+    """
+
+    def _find(entry):
+        title, app_id = entry
+        app = make_app()
+        try:
+            found = find_entry(app, app_list, title=title, app_id=app_id,
+                               region=region, fuzzy=fuzzy)
+        except (requests.RequestException, ValueError):
+            found = False
+        return app if found else (title if title else app_id)
+
+    apps, missing = [], []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(_find, entries):
+            if isinstance(result, SteamApp):
+                apps.append(result)
+            else:
+                missing.append(result)
+
+    return apps, missing
+
+
+class Watcher:
+    """
+    Keeps the apps of a watchlist in memory and polls them in cycles.
+
+    Prices are polled every cycle with batched appdetails requests. Review
+    scores and historical lows change far less often, hence they are
+    refreshed on slower cadences of their own. Only apps whose price or
+    discount changed since the previous cycle are written out (every app
+    is written in the first cycle).
+    """
+
+    def __init__(self, apps: List[SteamApp], catalog: Catalog, region: str=None,
+                 interval: float=900, scores_interval: float=None,
+                 historical_interval: float=None, output: TextIO=sys.stdout,
+                 workers: int=8):
+        """
+        :param apps: resolved apps that should be watched.
+        :param catalog: Catalog through which prices and lows are retrieved.
+        :param region: region for which the information should be retrieved.
+        :param interval: seconds between price polls.
+        :param scores_interval: seconds between review score refreshes. None
+                                leaves scores out.
+        :param historical_interval: seconds between historical low
+                                    refreshes. None leaves lows out.
+        :param output: where JSON lines of changed apps are written.
+        :param workers: how many review scrapes run at the same time.
+        """
+
+        self.apps = apps
+        self.catalog = catalog
+        self.region = region
+        self.interval = interval
+        self.scores_interval = scores_interval
+        self.historical_interval = historical_interval
+        self.output = output
+        self.workers = workers
+
+        self.cycle = 0
+        # App id -> (final price, discount) seen in the previous cycle.
+        self._seen = {}
+        self._scores_polled = None
+        self._lows_polled = None
+
+    def poll(self) -> List[SteamApp]:
+        """
+        Runs a single cycle.
+
+        :return: apps whose price or discount changed.
+        """
+
+        self.cycle += 1
+        now = time.monotonic()
+        try:
+            self.catalog.assign_prices(self.apps, region=self.region)
+        except (requests.RequestException, ValueError) as e:
+            self._write({'cycle': self.cycle, 'error': str(e)})
+            return []
+
+        if _due(self._scores_polled, self.scores_interval, now):
+            self._scores_polled = now
+            self._refresh_scores()
+        if _due(self._lows_polled, self.historical_interval, now):
+            self._lows_polled = now
+            self._refresh_lows()
+
+        changed = []
+        for app in self.apps:
+            current = (app.final_price, app.discount)
+            previous = self._seen.get(app.appID)
+            self._seen[app.appID] = current
+            if previous == current:
+                continue
+            changed.append(app)
+            record = {'cycle': self.cycle}
+            record.update(app_record(app, scores=self.scores_interval is not None,
+                                     historical_low=self.historical_interval is not None))
+            if previous is not None:
+                record['previous_final_price'], record['previous_discount'] = previous
+            self._write(record)
+        self.output.flush()
+
+        return changed
+
+    def run(self, cycles: int=None):
+        """
+        Polls every interval seconds (counted from the start of a cycle).
+
+        :param cycles: how many cycles to run. None runs until interrupted.
+        """
+
+        while cycles is None or self.cycle < cycles:
+            started = time.monotonic()
+            self.poll()
+            if cycles is not None and self.cycle >= cycles:
+                break
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def _refresh_scores(self):
+        def _scores(app):
+            try:
+                app.retrieve_review_scores()
+            except (requests.RequestException, ValueError):
+                # Scores from the previous refresh are kept.
+                pass
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(_scores, self.apps))
+
+    def _refresh_lows(self):
+        try:
+            self.catalog.assign_historical_lows(self.apps, region=self.region)
+        except KeyError:
+            self._write({'cycle': self.cycle, 'error': "API key was not found"})
+            self.historical_interval = None
+        except (requests.RequestException, ValueError) as e:
+            self._write({'cycle': self.cycle, 'error': str(e)})
+
+    def _write(self, record: dict):
+        self.output.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def _due(last: Optional[float], interval: Optional[float], now: float) -> bool:
+    if interval is None:
+        return False
+
+    return last is None or now - last >= interval
@@ -0,0 +1,297 @@
+# To run single test module:
+# >>> python -m unittest test.test_some_module
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from requests import HTTPError
+
+from steamCLI.applist import (AppListCache, find_app_by_id, find_apps_by_title,
+                              iter_apps)
+from steamCLI.deadline import Deadline, DeadlineExceeded
+from steamCLI.index import TitleIndex
+
+RESOURCE = '{"applist": {"apps": [{"appid": 8, "name": "winui2"}]}}'
+URL = 'http://api.example.com/applist/'
+
+
+class AppListCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.fetch = mock.Mock(side_effect=lambda url: [RESOURCE.encode()])
+        self.cache = AppListCache(self.directory, ttl=60, fetch=self.fetch)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _load(self):
+        self.cache._ensure_copy(URL)
+        return self.cache._read()
+
+    def _make_stale(self):
+        old = time.time() - 120
+        os.utime(self.cache.path, (old, old))
+
+    def test_should_create_cache_from_config(self):
+        config = mock.Mock()
+        config.get_value.return_value = self.directory
+        config.get_int.return_value = 30
+
+        cache = AppListCache.from_config(config, fetch=self.fetch)
+
+        self.assertEqual(self.directory, cache.directory)
+        self.assertEqual(30, cache.ttl)
+
+    def test_should_download_list_when_there_is_no_copy(self):
+        text = self._load()
+
+        self.assertEqual(RESOURCE, text)
+        self.fetch.assert_called_once_with(URL)
+        self.assertTrue(os.path.isfile(self.cache.path))
+
+    def test_should_not_download_fresh_list_again(self):
+        self._load()
+
+        text = self._load()
+
+        self.assertEqual(RESOURCE, text)
+        self.fetch.assert_called_once_with(URL)
+
+    def test_should_download_list_when_refresh_is_forced(self):
+        self._load()
+
+        self.cache.refresh(URL)
+
+        self.assertEqual(2, self.fetch.call_count)
+
+    def test_should_serve_stale_list_and_refresh_in_background(self):
+        self._load()
+        self._make_stale()
+        release = threading.Event()
+
+        def fetch(url):
+            release.wait(5)
+            return [b'{"applist": {"apps": []}}']
+        self.fetch.side_effect = fetch
+
+        text = self._load()
+        release.set()
+        self.cache.wait()
+
+        self.assertEqual(RESOURCE, text)
+        self.assertEqual(2, self.fetch.call_count)
+        self.assertFalse(self.cache.is_stale())
+        self.assertEqual('{"applist": {"apps": []}}', self._load())
+
+    def test_should_keep_stale_list_when_background_refresh_fails(self):
+        self._load()
+        self._make_stale()
+        self.fetch.side_effect = HTTPError()
+
+        self._load()
+        self.cache.wait()
+
+        self.assertEqual(RESOURCE, self.cache._read())
+        self.assertTrue(self.cache.is_stale())
+        self.assertFalse(os.path.exists(self.cache.path + '.lock'))
+
+    def test_should_not_refresh_when_another_process_holds_the_lock(self):
+        self._load()
+        self._make_stale()
+        open(self.cache.path + '.lock', 'w').close()
+
+        self._load()
+        self.cache.wait()
+
+        self.fetch.assert_called_once_with(URL)
+
+    def test_should_be_stale_when_there_is_no_copy(self):
+        self.assertTrue(self.cache.is_stale())
+
+    def test_should_build_title_index_once(self):
+        first = self.cache.title_index(URL)
+        second = self.cache.title_index(URL)
+
+        self.assertIs(first, second)
+        self.assertEqual([8], first.lookup('WinUI2'))
+        self.assertTrue(os.path.isfile(self.cache.index_path))
+        self.fetch.assert_called_once_with(URL)
+
+    def test_should_load_title_index_from_disk(self):
+        self.cache.title_index(URL)
+        other = AppListCache(self.directory, ttl=60, fetch=self.fetch)
+
+        with mock.patch('steamCLI.applist.TitleIndex.build') as build:
+            index = other.title_index(URL)
+
+        build.assert_not_called()
+        self.assertEqual([8], index.lookup('winui2'))
+
+    def test_should_rebuild_title_index_when_list_changes(self):
+        self.cache.title_index(URL)
+        self.fetch.side_effect = lambda url: [b'{"applist": {"apps": [{"appid": 9, "name": "winui2"}]}}']
+        self.cache.refresh(URL)
+        newer = time.time() + 10
+        os.utime(self.cache.path, (newer, newer))
+
+        index = self.cache.title_index(URL)
+
+        self.assertEqual([9], index.lookup('winui2'))
+
+    def test_should_share_a_rebuild_between_concurrent_callers(self):
+        self.cache.refresh(URL)
+        build = TitleIndex.build
+
+        def slow_build(*args, **kwargs):
+            time.sleep(0.1)
+            return build(*args, **kwargs)
+
+        indexes = []
+        with mock.patch('steamCLI.applist.TitleIndex.build',
+                        side_effect=slow_build) as m_build:
+            threads = [threading.Thread(target=lambda: indexes.append(
+                self.cache.title_index(URL))) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        m_build.assert_called_once()
+        self.assertEqual(8, len(indexes))
+        self.assertTrue(all(index is indexes[0] for index in indexes))
+
+    def test_should_not_wait_for_build_longer_than_deadline(self):
+        self.cache.refresh(URL)
+        build = TitleIndex.build
+        release = threading.Event()
+
+        def slow_build(*args, **kwargs):
+            release.wait(5)
+            return build(*args, **kwargs)
+
+        with mock.patch('steamCLI.applist.TitleIndex.build', side_effect=slow_build):
+            with self.assertRaises(DeadlineExceeded):
+                self.cache.title_index(URL, Deadline(0.05))
+            release.set()
+            # The build goes on, and later callers get its result.
+            index = self.cache.title_index(URL)
+
+        self.assertEqual([8], index.lookup('winui2'))
+
+    def test_should_download_missing_list_within_deadline(self):
+        self.fetch.side_effect = lambda url, deadline: [RESOURCE.encode()]
+        deadline = Deadline(5)
+
+        self.cache.appid_index(URL, deadline)
+
+        self.fetch.assert_called_once_with(URL, deadline=deadline)
+
+    def test_should_build_appid_index_once(self):
+        first = self.cache.appid_index(URL)
+        second = self.cache.appid_index(URL)
+
+        self.assertIs(first, second)
+        self.assertEqual('winui2', first.lookup(8))
+        self.assertTrue(os.path.isfile(self.cache.appid_index_path))
+
+    def test_should_share_appid_index_file(self):
+        self.cache.appid_index(URL)
+        other = AppListCache(self.directory, ttl=60, fetch=self.fetch)
+
+        with mock.patch('steamCLI.applist.AppIdIndex.build') as build:
+            index = other.appid_index(URL)
+
+        build.assert_not_called()
+        self.assertEqual('winui2', index.lookup(8))
+
+    def test_should_build_fuzzy_index_from_titles(self):
+        first = self.cache.fuzzy_index(URL)
+        second = self.cache.fuzzy_index(URL)
+
+        self.assertIs(first, second)
+        self.assertEqual(['winui2'], first.search('winiu2'))
+        self.assertTrue(os.path.isfile(self.cache.fuzzy_index_path))
+
+
+class StreamingParserTests(unittest.TestCase):
+    def setUp(self):
+        self.apps = [{"appid": 10, "name": "Counter-Strike"},
+                     {"appid": 8950, "name": "Borderlands"},
+                     {"appid": 8980, "name": "BORDERLANDS"},
+                     {"appid": 105, "name": "Caf\u00e9 {\"appid\": 1}"},
+                     {"appid": 1005, "name": "Астролорды"}]
+        self.text = json.dumps({"applist": {"apps": self.apps}})
+
+    def _chunks(self, size):
+        data = self.text.encode()
+        return [data[i:i + size] for i in range(0, len(data), size)]
+
+    def test_should_yield_every_app_regardless_of_chunk_size(self):
+        for size in (1, 7, 64, len(self.text)):
+            self.assertEqual(self.apps, list(iter_apps(self._chunks(size))))
+
+    def test_should_yield_apps_from_old_list_format(self):
+        old_format = b'{"applist": {"apps": {"app": [{"appid": 8,"name": "winui2"}]}}}'
+
+        self.assertEqual([{"appid": 8, "name": "winui2"}], list(iter_apps([old_format])))
+
+    def test_should_find_app_by_id(self):
+        for size in (1, 5, 1024):
+            self.assertEqual(self.apps[2], find_app_by_id(self._chunks(size), 8980))
+
+    def test_should_not_confuse_id_with_its_prefix(self):
+        self.assertEqual(self.apps[4], find_app_by_id(self._chunks(3), 1005))
+        self.assertEqual(self.apps[0], find_app_by_id(self._chunks(3), 10))
+
+    def test_should_not_find_missing_id(self):
+        self.assertIsNone(find_app_by_id(self._chunks(16), 1))
+
+    def test_should_stop_reading_once_id_is_found(self):
+        consumed = []
+
+        def chunks():
+            for chunk in self._chunks(16):
+                consumed.append(chunk)
+                yield chunk
+
+        find_app_by_id(chunks(), 10)
+
+        self.assertLess(len(consumed), len(self._chunks(16)))
+
+    def test_should_find_all_apps_with_title_case_insensitive(self):
+        for size in (1, 9, 1024):
+            actual = find_apps_by_title(self._chunks(size), 'borderlands')
+            self.assertEqual(self.apps[1:3], actual)
+
+    def test_should_find_title_with_escaped_characters(self):
+        actual = find_apps_by_title(self._chunks(8), 'café {"appid": 1}')
+
+        self.assertEqual([self.apps[3]], actual)
+
+    def test_should_not_match_title_against_enclosing_keys(self):
+        self.assertEqual([], find_apps_by_title(self._chunks(8), 'applist'))
+        self.assertEqual([], find_apps_by_title(self._chunks(8), 'a'))
+
+    def test_should_find_apps_after_names_with_braces(self):
+        apps = [{"appid": i, "name": "{" * (i % 3) + f"Game {i}"} for i in range(5000)]
+        chunks = [json.dumps({"applist": {"apps": apps}}).encode()]
+
+        self.assertEqual(apps, list(iter_apps(chunks)))
+        self.assertEqual(apps[4321], find_app_by_id(chunks, 4321))
+        self.assertEqual([apps[4999]], find_apps_by_title(chunks, '{Game 4999'))
+
+    def test_should_find_title_without_ascii_characters(self):
+        actual = find_apps_by_title(self._chunks(8), 'астролорды')
+
+        self.assertEqual([self.apps[4]], actual)
+
+    def test_should_skip_malformed_entries(self):
+        text = b'{"apps": [{"appid": 1, "name": "a"}, {"appid": oops}, {"appid": 2, "name": "b"}]}'
+
+        self.assertEqual([1, 2], [app["appid"] for app in iter_apps([text])])
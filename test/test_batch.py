@@ -0,0 +1,242 @@
+# To run single test module:
+# >>> python -m unittest test.test_some_module
+
+import io
+import json
+import threading
+import unittest
+from unittest import mock
+
+from requests import HTTPError
+
+from steamCLI.batch import (add_historical_lows, parse_entries, process_entry,
+                            run_batch)
+from steamCLI.catalog import Catalog
+from steamCLI.deadline import Deadline, DeadlineExceeded
+from steamCLI.steamapp import SteamApp
+
+URL = 'http://api.example.com/applist/'
+
+
+class ParseEntriesTests(unittest.TestCase):
+    def test_should_tell_titles_from_ids(self):
+        lines = ['Borderlands\n', '49520\n', '  Counter-Strike 2 \n']
+
+        self.assertEqual([('Borderlands', None), (None, 49520), ('Counter-Strike 2', None)],
+                         list(parse_entries(lines)))
+
+    def test_should_skip_blank_lines_and_comments(self):
+        self.assertEqual([(None, 10)], list(parse_entries(['\n', '# prices\n', '10\n'])))
+
+
+class ProcessEntryTests(unittest.TestCase):
+    def setUp(self):
+        self.app = SteamApp(config=mock.Mock())
+        for method in ('find_app', 'suggest_titles', 'retrieve_review_scores',
+                       'extract_historical_low'):
+            setattr(self.app, method, mock.Mock())
+
+    def _find(self, found=None):
+        found = found if found else {}
+
+        def find_app(origin, region, title=None, app_id=None, deadline=None):
+            for key, value in found.get(title or app_id, {}).items():
+                setattr(self.app, key, value)
+        return find_app
+
+    def test_should_report_missing_app(self):
+        self.app.find_app.side_effect = self._find()
+
+        record = process_entry(self.app, URL, title='Nope')
+
+        self.assertEqual({'query': 'Nope', 'found': False}, record)
+
+    def test_should_report_prices(self):
+        self.app.find_app.side_effect = self._find({'Borderlands': {
+            'appID': 8980, 'title': 'Borderlands', 'currency': 'GBP',
+            'initial_price': 999, 'final_price': 499, 'discount': 50}})
+
+        record = process_entry(self.app, URL, title='Borderlands', region='uk')
+
+        self.assertEqual(8980, record['appid'])
+        self.assertEqual(499, record['final_price'])
+        self.app.retrieve_review_scores.assert_not_called()
+        self.app.extract_historical_low.assert_not_called()
+
+    def test_should_run_requested_stages(self):
+        self.app.find_app.side_effect = self._find({10: {'appID': 10, 'title': 'CS'}})
+        self.app.extract_historical_low.side_effect = KeyError()
+
+        record = process_entry(self.app, URL, app_id=10, region='uk', scores=True,
+                               historical_low=True)
+
+        self.app.retrieve_review_scores.assert_called_once()
+        self.app.extract_historical_low.assert_called_once_with('uk', deadline=None)
+        self.assertIn('overall_count', record)
+        self.assertIn('historical_error', record)
+
+    def test_should_leave_out_stages_that_ran_out_of_time(self):
+        self.app.find_app.side_effect = self._find({10: {'appID': 10, 'title': 'CS'}})
+        self.app.retrieve_review_scores.side_effect = DeadlineExceeded()
+
+        record = process_entry(self.app, URL, app_id=10, region='uk', scores=True,
+                               historical_low=True, deadline=Deadline(60))
+
+        self.assertNotIn('overall_count', record)
+        self.assertIn('historical_low', record)
+        self.assertEqual(['reviews'], record['partial'])
+
+    def test_should_use_closest_title_when_fuzzy(self):
+        self.app.find_app.side_effect = self._find({'Borderlands 2': {'appID': 49520}})
+        self.app.suggest_titles.return_value = ['Borderlands 2']
+
+        record = process_entry(self.app, URL, title='Borderland 2', fuzzy=True)
+
+        self.assertEqual(49520, record['appid'])
+        self.app.suggest_titles.assert_called_once_with(URL, 'Borderland 2', limit=1,
+                                                         deadline=None)
+
+
+class RunBatchTests(unittest.TestCase):
+    def test_should_write_json_line_per_entry(self):
+        output = io.StringIO()
+        process = lambda title, app_id: {'query': title or app_id}
+
+        failed = run_batch([('a', None), (None, 2), ('c', None)], process, workers=2,
+                           output=output)
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(0, failed)
+        self.assertCountEqual(['a', 2, 'c'], [record['query'] for record in records])
+
+    def test_should_keep_going_after_network_errors(self):
+        output = io.StringIO()
+
+        def process(title, app_id):
+            if title == 'bad':
+                raise HTTPError("Resource not found.")
+            return {'query': title}
+
+        failed = run_batch([('bad', None), ('good', None)], process, workers=1,
+                           output=output)
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(1, failed)
+        self.assertEqual([{'query': 'bad', 'error': 'Resource not found.'}, {'query': 'good'}],
+                         records)
+
+    def test_should_keep_going_after_any_error(self):
+        output = io.StringIO()
+
+        def process(title, app_id):
+            if title == 'bad':
+                raise IndexError("list index out of range")
+            return {'query': title}
+
+        failed = run_batch([('bad', None), ('good', None)], process, workers=1,
+                           output=output)
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(1, failed)
+        self.assertEqual({'query': 'bad', 'error': 'list index out of range'}, records[0])
+
+    def test_should_process_entries_concurrently(self):
+        """ Both entries have to be in flight at once to pass the barrier. """
+
+        barrier = threading.Barrier(2, timeout=5)
+
+        def process(title, app_id):
+            barrier.wait()
+            return {'query': title}
+
+        run_batch([('a', None), ('b', None)], process, workers=2, output=io.StringIO())
+
+    def test_should_not_run_more_than_workers_at_once(self):
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def process(title, app_id):
+            with lock:
+                running.append(title)
+                peak.append(len(running))
+            threading.Event().wait(0.01)
+            with lock:
+                running.remove(title)
+            return {'query': title}
+
+        run_batch(((str(i), None) for i in range(12)), process, workers=3,
+                  output=io.StringIO())
+
+        self.assertLessEqual(max(peak), 3)
+
+    def test_should_write_results_as_they_finish(self):
+        release = threading.Event()
+        output = io.StringIO()
+
+        def process(title, app_id):
+            if title == 'slow':
+                release.wait(5)
+            return {'query': title}
+
+        def write(text):
+            io.StringIO.write(output, text)
+            release.set()
+
+        with mock.patch.object(output, 'write', side_effect=write):
+            run_batch([('slow', None), ('fast', None)], process, workers=2, output=output)
+
+        self.assertEqual('fast', json.loads(output.getvalue().splitlines()[0])['query'])
+
+    def test_should_finish_records_in_groups(self):
+        output = io.StringIO()
+        groups = []
+
+        def finish(records):
+            groups.append(len(records))
+            for record in records:
+                record['finished'] = True
+
+        run_batch(((str(i), None) for i in range(5)), lambda title, app_id: {'query': title},
+                  workers=1, output=output, finish=finish, group_size=2)
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([2, 2, 1], groups)
+        self.assertEqual(5, len(records))
+        self.assertTrue(all(record['finished'] for record in records))
+
+
+class HistoricalLowsTests(unittest.TestCase):
+    def setUp(self):
+        self.catalog = Catalog(mock.Mock(), session=mock.Mock())
+        self.catalog.fetch_historical_lows = mock.Mock()
+        self.records = [{'query': 'a', 'found': True, 'title': 'Borderlands'},
+                        {'query': 'b', 'found': False},
+                        {'query': 'c', 'found': True, 'title': 'Portal'}]
+
+    def test_should_add_lows_of_found_apps(self):
+        self.catalog.fetch_historical_lows.return_value = {
+            'borderlands': {'price': 2.49, 'cut': 75, 'shop': {'id': 'steam', 'name': 'Steam'}}}
+
+        add_historical_lows(self.records, self.catalog, region='uk')
+
+        plains = list(self.catalog.fetch_historical_lows.call_args[0][0])
+        self.assertEqual(['borderlands', 'portal'], plains)
+        self.assertEqual(2.49, self.records[0]['historical_low'])
+        self.assertEqual('Steam', self.records[0]['historical_shop'])
+        self.assertNotIn('historical_low', self.records[1])
+        self.assertIsNone(self.records[2]['historical_low'])
+
+    def test_should_report_missing_api_key(self):
+        self.catalog.fetch_historical_lows.side_effect = KeyError()
+
+        add_historical_lows(self.records, self.catalog)
+
+        self.assertEqual("API key was not found", self.records[2]['historical_error'])
+
+    def test_should_report_failed_request(self):
+        self.catalog.fetch_historical_lows.side_effect = HTTPError("Resource not found.")
+
+        add_historical_lows(self.records, self.catalog)
+
+        self.assertEqual("Resource not found.", self.records[0]['historical_error'])
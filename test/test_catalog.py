@@ -0,0 +1,170 @@
+# To run single test module:
+# >>> python -m unittest test.test_some_module
+
+import unittest
+from unittest import mock
+
+from steamCLI.catalog import Catalog
+from steamCLI.config import Config
+from steamCLI.steamapp import SteamApp
+from steamCLI.utils import sanitize_titles
+
+PRICES = {'currency': 'GBP', 'initial': 1999, 'final': 999, 'discount_percent': 50}
+
+
+class CatalogPriceTests(unittest.TestCase):
+    def setUp(self):
+        self.config = mock.Mock(Config)
+        self.config.get_value.side_effect = lambda section, key: {
+            'appprices': 'http://api.example.com/appdetails?filters=price_overview&appids=',
+            'default': 'uk',
+        }[key]
+        self.config.get_int.return_value = 2
+        self.catalog = Catalog(self.config)
+
+    def test_should_raise_FileNotFoundError(self):
+        with self.assertRaises(FileNotFoundError):
+            Catalog(config=None)
+
+    @mock.patch.object(Catalog, '_fetch_json')
+    def test_should_pack_ids_into_batches(self, m_fetch):
+        m_fetch.return_value = {}
+
+        self.catalog.fetch_prices([1, 2, 3], region='us')
+
+        self.assertEqual(
+            [mock.call('http://api.example.com/appdetails?filters=price_overview&appids=1,2&cc=us',
+                       deadline=None),
+             mock.call('http://api.example.com/appdetails?filters=price_overview&appids=3&cc=us',
+                       deadline=None)],
+            m_fetch.call_args_list)
+
+    @mock.patch.object(Catalog, '_fetch_json')
+    def test_should_use_default_region(self, m_fetch):
+        m_fetch.return_value = {}
+
+        self.catalog.fetch_prices([1])
+
+        self.assertTrue(m_fetch.call_args[0][0].endswith('&cc=uk'))
+
+    @mock.patch.object(Catalog, '_fetch_json')
+    def test_should_demultiplex_prices(self, m_fetch):
+        m_fetch.side_effect = [
+            {"1": {"success": True, "data": {"price_overview": PRICES}},
+             "2": {"success": True, "data": []}},
+            {"3": {"success": False}},
+        ]
+
+        prices = self.catalog.fetch_prices([1, 2, 3])
+
+        self.assertEqual({1: PRICES, 2: None}, prices)
+
+    @mock.patch.object(Catalog, '_fetch_json')
+    def test_should_not_query_anything_without_ids(self, m_fetch):
+        self.assertEqual({}, self.catalog.fetch_prices([]))
+        m_fetch.assert_not_called()
+
+    @mock.patch.object(Catalog, 'fetch_prices')
+    def test_should_assign_prices_to_apps(self, m_prices):
+        apps = [SteamApp(self.config) for _ in range(3)]
+        apps[0].appID, apps[1].appID = 1, 2
+        apps[1].final_price = 5
+        m_prices.return_value = {1: PRICES, 2: None}
+
+        self.catalog.assign_prices(apps, region='us')
+
+        m_prices.assert_called_once_with([1, 2], region='us')
+        self.assertEqual('GBP', apps[0].currency)
+        self.assertEqual(1999, apps[0].initial_price)
+        self.assertEqual(999, apps[0].final_price)
+        self.assertEqual(-50, apps[0].discount)
+        self.assertIsNone(apps[1].final_price)
+        self.assertEqual(0, apps[1].discount)
+        self.assertIsNone(apps[2].final_price)
+
+    @mock.patch.object(Catalog, 'fetch_prices')
+    def test_should_fetch_prices_of_each_region(self, m_fetch):
+        m_fetch.side_effect = lambda appids, region, deadline: {appids[0]: {'currency': region}}
+
+        prices = self.catalog.fetch_regional_prices(iter([10]), ['uk', 'us'])
+
+        self.assertEqual({'uk': {10: {'currency': 'uk'}}, 'us': {10: {'currency': 'us'}}}, prices)
+
+    def test_should_not_fetch_regional_prices_without_regions(self):
+        self.assertEqual({}, self.catalog.fetch_regional_prices([10], []))
+
+
+class CatalogHistoricalLowTests(unittest.TestCase):
+    def setUp(self):
+        self.config = mock.Mock(Config)
+        self.config.get_value.side_effect = lambda section, key: {
+            'env_var': 'steamCLI_test',
+            'app_url': 'http://api.example.com/lowest/[region]/?key=[key]&plains=[title]',
+            'default': 'uk',
+        }[key]
+        self.config.get_int.return_value = 2
+        self.catalog = Catalog(self.config)
+
+    @mock.patch.dict('os.environ', {'steamCLI_test': 'secret'})
+    @mock.patch.object(Catalog, '_fetch_json')
+    def test_should_pack_plains_into_batches(self, m_fetch):
+        m_fetch.return_value = {'data': {}}
+
+        self.catalog.fetch_historical_lows(['borderlands', 'portalii', 'borderlands', 'halflife'],
+                                           region='us')
+
+        self.assertEqual(
+            [mock.call('http://api.example.com/lowest/us/?key=secret&plains=borderlands,portalii'),
+             mock.call('http://api.example.com/lowest/us/?key=secret&plains=halflife')],
+            m_fetch.call_args_list)
+
+    @mock.patch.dict('os.environ', {'steamCLI_test': 'secret'})
+    @mock.patch.object(Catalog, '_fetch_json')
+    def test_should_demultiplex_lows(self, m_fetch):
+        low = {'price': 2.49, 'cut': 75, 'shop': {'name': 'Steam'}}
+        m_fetch.return_value = {'data': {'borderlands': low, 'portalii': {}}}
+
+        lows = self.catalog.fetch_historical_lows(['borderlands', 'portalii', 'nope'])
+
+        self.assertEqual({'borderlands': low, 'portalii': {}}, lows)
+
+    @mock.patch.dict('os.environ', {}, clear=True)
+    def test_should_raise_without_api_key(self):
+        with self.assertRaises(KeyError):
+            self.catalog.fetch_historical_lows(['borderlands'])
+
+    def test_should_prefer_mapped_plain(self):
+        plains = mock.Mock()
+        plains.lookup.side_effect = lambda appid: {10: 'counterstrike'}.get(appid)
+        catalog = Catalog(self.config, plains=plains)
+
+        self.assertEqual('counterstrike', catalog.plain_for(10, 'Counter-Strike 1'))
+        self.assertEqual('portalii', catalog.plain_for(620, 'Portal 2'))
+        self.assertEqual('portalii', self.catalog.plain_for(10, 'Portal 2'))
+
+    def test_should_guess_plains_of_unmapped_apps_in_bulk(self):
+        plains = mock.Mock()
+        plains.lookup.side_effect = lambda appid: {10: 'counterstrike'}.get(appid)
+        catalog = Catalog(self.config, plains=plains)
+
+        with mock.patch('steamCLI.catalog.sanitize_titles',
+                        side_effect=sanitize_titles) as m_sanitize:
+            actual = catalog.plains_for([(620, 'Portal 2'), (10, 'Counter-Strike'),
+                                         (None, 'The Witcher 3')])
+
+        self.assertEqual(['portalii', 'counterstrike', 'witcheriii'], actual)
+        m_sanitize.assert_called_once()
+
+    @mock.patch.dict('os.environ', {'steamCLI_test': 'secret'})
+    @mock.patch.object(Catalog, '_fetch_json')
+    def test_should_assign_lows_to_apps(self, m_fetch):
+        m_fetch.return_value = {'data': {'borderlands': {'price': 2.49, 'cut': 75,
+                                                         'shop': {'name': 'Steam'}}}}
+        apps = [SteamApp(self.config) for _ in range(3)]
+        apps[0].title = apps[1].title = 'Borderlands'
+
+        self.catalog.assign_historical_lows(apps)
+
+        self.assertEqual([2.49, 2.49, None], [app.historical_low for app in apps])
+        self.assertEqual('Steam', apps[1].historical_shop)
+        m_fetch.assert_called_once()
@@ -2,6 +2,9 @@
 # >>> python -m unittest test.test_some_module
 
 import os
+import shutil
+import tempfile
+import time
 import unittest
 from unittest import mock
 
@@ -55,3 +58,83 @@ class ConfigTests(unittest.TestCase):
             config.get_value('SteamAPIs', 'applist'),
             'http://api.steampowered.com/ISteamApps/GetAppList/v0002/'
         )
+
+
+class ConfigLayersTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'resources.ini')
+        self.user_path = os.path.join(self.directory, 'user.ini')
+        self._write(self.path, '[Cache]\napplist_ttl = 60\nenabled = yes\n'
+                               '[SteamRegions]\nregions = au, br,ca,\n')
+        self.config = Config(self.directory, 'resources.ini', user_path=self.user_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def _write(path, text, mtime=None):
+        with open(path, 'w') as f:
+            f.write(text)
+        if mtime:
+            os.utime(path, (mtime, mtime))
+
+    def test_should_parse_file_once(self):
+        self.config.check_interval = 0
+
+        with mock.patch.object(Config, '_parse', wraps=self.config._parse) as parse:
+            for _ in range(10):
+                self.config.get_value('Cache', 'applist_ttl')
+
+        parse.assert_called_once()
+        self.assertIs(self.config.snapshot(), self.config.snapshot())
+
+    def test_should_reload_when_file_changes(self):
+        self.assertEqual('60', self.config.get_value('Cache', 'applist_ttl'))
+        self._write(self.path, '[Cache]\napplist_ttl = 30\n', mtime=time.time() + 10)
+        self.config.check_interval = 0
+
+        self.assertEqual('30', self.config.get_value('Cache', 'applist_ttl'))
+
+    def test_should_not_check_file_within_interval(self):
+        self.config.get_value('Cache', 'applist_ttl')
+        self._write(self.path, '[Cache]\napplist_ttl = 30\n', mtime=time.time() + 10)
+
+        self.assertEqual('60', self.config.get_value('Cache', 'applist_ttl'))
+
+    def test_snapshot_should_be_read_only(self):
+        with self.assertRaises(TypeError):
+            self.config.snapshot()['Cache']['applist_ttl'] = '1'
+
+    def test_should_raise_key_error_for_missing_value(self):
+        with self.assertRaises(KeyError):
+            self.config.get_value('Cache', 'missing')
+        with self.assertRaises(KeyError):
+            self.config.get_value('Missing', 'applist_ttl')
+
+    def test_user_file_should_override_package_file(self):
+        self._write(self.user_path, '[Cache]\napplist_ttl = 5\n')
+
+        self.assertEqual(5, self.config.get_int('Cache', 'applist_ttl'))
+        self.assertTrue(self.config.get_bool('Cache', 'enabled'))
+
+    def test_environment_should_override_files(self):
+        self._write(self.user_path, '[Cache]\napplist_ttl = 5\n')
+
+        with mock.patch.dict(os.environ, {'STEAMCLI_CACHE_APPLIST_TTL': '7'}):
+            self.assertEqual(7, self.config.get_int('Cache', 'applist_ttl'))
+
+    def test_should_return_typed_values(self):
+        self.assertEqual(60, self.config.get_int('Cache', 'applist_ttl'))
+        self.assertEqual(60.0, self.config.get_float('Cache', 'applist_ttl'))
+        self.assertIs(True, self.config.get_bool('Cache', 'enabled'))
+        self.assertEqual(['au', 'br', 'ca'], self.config.get_list('SteamRegions', 'regions'))
+
+    def test_should_reject_values_that_are_not_boolean(self):
+        with self.assertRaises(ValueError):
+            self.config.get_bool('Cache', 'applist_ttl')
+
+    def test_should_read_booleans_of_list_items(self):
+        self.assertEqual([True, False], [Config.to_bool(item) for item in (' Yes', 'off')])
+        with self.assertRaises(ValueError):
+            Config.to_bool('maybe')
@@ -1,11 +1,19 @@
 # To run single test module:
 # >>> python -m unittest test.test_some_module
 
+import io
+import os
+import threading
 import unittest
 from argparse import ArgumentError
 from unittest import mock
 
-from steamCLI.console import _create_parser
+from steamCLI.console import (_add_extra_info, _add_region_prices, _check_args,
+                              _choose_title, _create_parser, _create_serve_parser,
+                              _create_watch_parser,
+                              _retrieve_main_app_info, _run_batch,
+                              _shared_resources)
+from steamCLI.deadline import Deadline, DeadlineExceeded
 
 
 class ParserTests(unittest.TestCase):
@@ -21,14 +29,20 @@ class ParserTests(unittest.TestCase):
         mock_config.get_value.side_effect = [
             "cli app description",
             self.default_region,
-            'au,br,ca,cn,eu1,eu2,ru,tr,uk,us',
             "app title",
             "app id",
+            "batch",
             "app description",
             "reviews",
             "region",
-            "historical"
+            "regions",
+            "historical",
+            "refresh",
+            "fuzzy",
+            "deadline",
         ]
+        mock_config.get_list.return_value = ['au', 'br', 'ca', 'cn', 'eu1',
+                                             'eu2', 'ru', 'tr', 'uk', 'us']
 
         self.parser = _create_parser(mock_config)
 
@@ -50,6 +64,26 @@ class ParserTests(unittest.TestCase):
 
         self.assertEqual('au', args.region)
 
+    def test_should_not_compare_regions_by_default(self):
+        args = self.parser.parse_args(['-t'])
+
+        self.assertIsNone(args.regions)
+
+    def test_should_compare_all_regions(self):
+        args = self.parser.parse_args(['-t', '--regions', 'all'])
+
+        self.assertEqual(10, len(args.regions))
+
+    def test_should_compare_listed_regions(self):
+        args = self.parser.parse_args(['-t', '--regions', 'UK, us,uk'])
+
+        self.assertEqual(['uk', 'us'], args.regions)
+
+    def test_should_not_allow_regions_not_in_the_list(self):
+        with mock.patch('steamCLI.console.ArgumentParser._print_message', mock.MagicMock()):
+            with self.assertRaises((ArgumentError, SystemExit)):
+                self.parser.parse_args(['-t', '--regions', 'uk,xx'])
+
     def test_should_not_allow_region_not_in_the_list(self):
         with mock.patch('steamCLI.console.ArgumentParser._print_message', mock.MagicMock()):
             with self.assertRaises((ArgumentError, SystemExit)):
@@ -87,3 +121,276 @@ class ParserTests(unittest.TestCase):
 
         args = self.parser.parse_args(['-t'])
         self.assertFalse(args.historical_low)
+
+    def test_should_store_refresh_applist_flag(self):
+        args = self.parser.parse_args(['-t', '--refresh-applist'])
+        self.assertTrue(args.refresh_applist)
+
+        args = self.parser.parse_args(['-t'])
+        self.assertFalse(args.refresh_applist)
+
+    def test_should_store_fuzzy_flag(self):
+        args = self.parser.parse_args(['-t', '--fuzzy'])
+        self.assertTrue(args.fuzzy)
+
+        args = self.parser.parse_args(['-t'])
+        self.assertFalse(args.fuzzy)
+
+    def test_should_store_deadline(self):
+        args = self.parser.parse_args(['-t', '--deadline', '2.5'])
+        self.assertEqual(2.5, args.deadline)
+
+        args = self.parser.parse_args(['-t'])
+        self.assertIsNone(args.deadline)
+
+    def test_should_reject_options_that_batch_does_not_support(self):
+        for options in (['-d'], ['--regions', 'all']):
+            args = self.parser.parse_args(['--batch', os.devnull] + options)
+            with mock.patch('sys.stderr'), self.assertRaises(SystemExit):
+                _check_args(self.parser, args)
+            args.batch.close()
+
+        args = self.parser.parse_args(['--batch', os.devnull, '-s'])
+        _check_args(self.parser, args)
+        args.batch.close()
+
+
+class TitleSuggestionTests(unittest.TestCase):
+    def setUp(self):
+        self.args = mock.Mock(title=True, region='uk', fuzzy=False)
+        self.app = mock.Mock(appID=None)
+        self.app.suggest_titles.return_value = ['Borderlands 2', 'Borderlands']
+
+    @mock.patch('builtins.print')
+    def test_should_pick_best_title_automatically(self, _):
+        self.assertEqual('Borderlands 2', _choose_title(['Borderlands 2', 'X'], automatic=True))
+
+    def test_should_not_pick_title_from_nothing(self):
+        self.assertIsNone(_choose_title([], automatic=True))
+
+    @mock.patch('builtins.print')
+    @mock.patch('builtins.input', return_value='2')
+    def test_should_let_user_pick_title(self, *_):
+        self.assertEqual('X', _choose_title(['Borderlands 2', 'X']))
+
+    @mock.patch('builtins.print')
+    @mock.patch('builtins.input', return_value='7')
+    def test_should_not_pick_title_with_invalid_choice(self, *_):
+        self.assertIsNone(_choose_title(['Borderlands 2', 'X']))
+
+    @mock.patch('steamCLI.console._retrieve_title', return_value='borderlandz')
+    @mock.patch('builtins.print')
+    def test_should_look_up_suggested_title_when_not_found(self, *_):
+        self.args.fuzzy = True
+
+        _retrieve_main_app_info(self.args, self.app, 'url', suggestions=2)
+
+        self.app.suggest_titles.assert_called_once_with('url', 'borderlandz', 2,
+                                                         deadline=None)
+        self.assertEqual(
+            [mock.call(origin='url', region='uk', title='borderlandz', deadline=None),
+             mock.call(origin='url', region='uk', title='Borderlands 2', deadline=None)],
+            self.app.find_app.call_args_list)
+
+    @mock.patch('steamCLI.console._retrieve_title', return_value='borderlands')
+    def test_should_not_suggest_when_title_is_found(self, _):
+        self.app.appID = 8980
+
+        _retrieve_main_app_info(self.args, self.app, 'url')
+
+        self.app.suggest_titles.assert_not_called()
+        self.app.find_app.assert_called_once()
+
+
+class WatchParserTests(unittest.TestCase):
+    def setUp(self):
+        config = mock.Mock()
+        config.get_value.side_effect = lambda section, key: '15m' if key == 'interval' else 'uk'
+        config.get_list.return_value = ['uk', 'us']
+        self.parser = _create_watch_parser(config)
+
+    def test_should_use_default_interval(self):
+        args = self.parser.parse_args(['--list', os.devnull])
+        args.list.close()
+
+        self.assertEqual(900, args.interval)
+        self.assertEqual('uk', args.region)
+        self.assertFalse(args.scores)
+
+    def test_should_parse_interval(self):
+        args = self.parser.parse_args(['--list', os.devnull, '--interval', '2h', '-r', 'US'])
+        args.list.close()
+
+        self.assertEqual(7200, args.interval)
+        self.assertEqual('us', args.region)
+
+    @mock.patch('sys.stderr')
+    def test_should_require_list(self, _):
+        with self.assertRaises(SystemExit):
+            self.parser.parse_args(['--interval', '2h'])
+
+
+class ServeParserTests(unittest.TestCase):
+    def setUp(self):
+        config = mock.Mock()
+        config.get_value.return_value = '127.0.0.1'
+        config.get_int.return_value = 8080
+        self.parser = _create_serve_parser(config)
+
+    def test_should_use_configured_address(self):
+        args = self.parser.parse_args([])
+
+        self.assertEqual(('127.0.0.1', 8080), (args.host, args.port))
+
+    def test_should_parse_port(self):
+        self.assertEqual(9000, self.parser.parse_args(['--port', '9000']).port)
+
+
+class ExtraInfoTests(unittest.TestCase):
+    def setUp(self):
+        self.args = mock.Mock(scores=True, historical_low=True, region='uk')
+        self.app = mock.Mock()
+        self.results = mock.Mock()
+
+    @mock.patch('builtins.print')
+    def test_should_scrape_and_look_up_history_at_the_same_time(self, _):
+        """ Both have to be in flight at once to pass the barrier. """
+
+        barrier = threading.Barrier(2, timeout=5)
+        self.app.retrieve_review_scores.side_effect = lambda deadline: barrier.wait()
+        self.app.extract_historical_low.side_effect = lambda region, deadline: barrier.wait()
+
+        _add_extra_info(self.args, self.app, self.results)
+
+        self.results.format_steam_website_info.assert_called_once()
+        self.results.format_historical_low.assert_called_once()
+
+    @mock.patch('builtins.print')
+    def test_should_only_do_what_was_asked_for(self, _):
+        self.args.historical_low = False
+
+        _add_extra_info(self.args, self.app, self.results)
+
+        self.app.retrieve_review_scores.assert_called_once()
+        self.app.extract_historical_low.assert_not_called()
+        self.results.format_historical_low.assert_not_called()
+
+    @mock.patch('builtins.print')
+    @mock.patch('steamCLI.console.error')
+    def test_should_report_missing_api_key(self, m_error, _):
+        self.app.extract_historical_low.side_effect = KeyError()
+
+        _add_extra_info(self.args, self.app, self.results)
+
+        m_error.assert_called_once()
+        self.results.format_steam_website_info.assert_called_once()
+        self.results.format_historical_low.assert_not_called()
+
+    def test_should_skip_sections_once_deadline_runs_out(self):
+        _add_extra_info(self.args, self.app, self.results, deadline=Deadline(0))
+
+        self.app.retrieve_review_scores.assert_not_called()
+        self.app.extract_historical_low.assert_not_called()
+        sections = {call[0][0] for call in self.results.mark_partial.call_args_list}
+        self.assertEqual({'reviews', 'historical low'}, sections)
+
+    @mock.patch('builtins.print')
+    def test_should_keep_sections_that_finished_in_time(self, _):
+        self.app.extract_historical_low.side_effect = DeadlineExceeded()
+
+        _add_extra_info(self.args, self.app, self.results, deadline=Deadline(60))
+
+        self.results.format_steam_website_info.assert_called_once()
+        self.results.format_historical_low.assert_not_called()
+        self.results.mark_partial.assert_called_once_with('historical low')
+
+
+class BatchTests(unittest.TestCase):
+    @mock.patch('steamCLI.console.run_batch')
+    def test_should_load_indexes_before_lookups(self, m_run):
+        applist = mock.Mock()
+
+        def run(entries, process, workers, finish, group_size):
+            applist.title_index.assert_called_once_with('url')
+            self.assertEqual([(None, 10), ('Borderlands', None)], list(entries))
+            return 0
+
+        m_run.side_effect = run
+        args = mock.Mock(batch=io.StringIO('10\nBorderlands\n'), historical_low=False)
+        config = mock.Mock()
+        config.get_int.return_value = 4
+
+        _run_batch(args, config, applist, session=None, store=None, plains=None,
+                   app_list='url')
+
+        applist.appid_index.assert_called_once_with('url')
+        self.assertEqual(4, m_run.call_args[1]['workers'])
+        self.assertTrue(args.batch.closed)
+
+    @mock.patch('steamCLI.console.process_entry')
+    @mock.patch('steamCLI.console.run_batch')
+    def test_should_give_each_lookup_its_own_deadline(self, m_run, m_process):
+        m_run.return_value = 0
+        args = mock.Mock(batch=io.StringIO(''), historical_low=False, deadline=5)
+        config = mock.Mock()
+        config.get_int.return_value = 4
+
+        _run_batch(args, config, mock.Mock(), session=None, store=None, plains=None,
+                   app_list='url')
+        process = m_run.call_args[0][1]
+        process(title='a', app_id=None)
+        process(title='b', app_id=None)
+
+        first, second = (call[1]['deadline'] for call in m_process.call_args_list)
+        self.assertEqual(5, first.seconds)
+        self.assertIsNot(first, second)
+
+
+class SharedResourcesTests(unittest.TestCase):
+    @mock.patch('steamCLI.console.PlainMap')
+    @mock.patch('steamCLI.console.AppDetailsStore')
+    @mock.patch('steamCLI.console.AppListCache')
+    @mock.patch('steamCLI.console.Session')
+    def test_should_download_through_one_session(self, _, m_applist, m_store,
+                                                 m_plains):
+        config = mock.Mock()
+
+        session, applist, store, plains = _shared_resources(config)
+
+        m_applist.from_config.assert_called_once_with(
+            config, fetch=session.stream_resource)
+        m_plains.from_config.assert_called_once_with(config, session=session)
+        self.assertEqual((m_applist.from_config.return_value,
+                          m_store.from_config.return_value,
+                          m_plains.from_config.return_value),
+                         (applist, store, plains))
+
+
+class RegionPricesTests(unittest.TestCase):
+    @mock.patch('builtins.print')
+    def test_should_format_price_of_each_requested_region(self, _):
+        args = mock.Mock(regions=['uk', 'us', 'ru'])
+        app = mock.Mock(appID=10)
+        results = mock.Mock()
+        catalog = mock.Mock()
+        price = {'currency': 'GBP', 'initial': 999, 'final': 999}
+        catalog.fetch_regional_prices.return_value = {'uk': {10: price}, 'us': {10: None}, 'ru': {}}
+
+        _add_region_prices(args, app, results, catalog)
+
+        catalog.fetch_regional_prices.assert_called_once_with([10], ['uk', 'us', 'ru'],
+                                                              deadline=None)
+        results.format_region_prices.assert_called_once_with({'uk': price, 'us': None, 'ru': None})
+
+    @mock.patch('steamCLI.console.run_batch')
+    def test_should_group_historical_lows(self, m_run):
+        m_run.return_value = 0
+        args = mock.Mock(batch=io.StringIO(''), historical_low=True, region='us')
+        config = mock.Mock()
+        config.get_int.side_effect = lambda section, key: {'workers': 4, 'plains_batch': 50}[key]
+
+        _run_batch(args, config, mock.Mock(), session=None, store=None, plains=None,
+                   app_list='url')
+
+        self.assertEqual(50, m_run.call_args[1]['group_size'])
+        self.assertEqual('us', m_run.call_args[1]['finish'].keywords['region'])
@@ -0,0 +1,45 @@
+# To run single test module:
+# >>> python -m unittest test.test_some_module
+
+import unittest
+
+from requests import Timeout
+
+from steamCLI.deadline import Deadline, DeadlineExceeded
+
+
+class DeadlineTests(unittest.TestCase):
+    def test_should_not_expire_without_limit(self):
+        deadline = Deadline()
+
+        self.assertIsNone(deadline.remaining())
+        self.assertFalse(deadline.expired())
+        self.assertEqual((3, 30), deadline.clamp((3, 30)))
+
+    def test_should_count_down(self):
+        deadline = Deadline(60)
+
+        self.assertFalse(deadline.expired())
+        self.assertGreater(deadline.remaining(), 59)
+        self.assertLessEqual(deadline.remaining(), 60)
+
+    def test_should_expire(self):
+        deadline = Deadline(0)
+
+        self.assertTrue(deadline.expired())
+        self.assertEqual(0, deadline.remaining())
+        with self.assertRaises(DeadlineExceeded):
+            deadline.check()
+
+    def test_should_clamp_timeouts_to_remaining_time(self):
+        deadline = Deadline(2)
+
+        connect, read = deadline.clamp((1, 30))
+        self.assertEqual(1, connect)
+        self.assertLessEqual(read, 2)
+        self.assertLessEqual(deadline.clamp(30), 2)
+        self.assertEqual(1, deadline.clamp(1))
+        self.assertLessEqual(deadline.clamp(None), 2)
+
+    def test_should_be_a_timeout(self):
+        self.assertTrue(issubclass(DeadlineExceeded, Timeout))
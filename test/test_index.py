@@ -0,0 +1,126 @@
+# To run single test module:
+# >>> python -m unittest test.test_some_module
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from steamCLI.index import AppIdIndex, TitleIndex
+
+RESOURCE = ('{"applist": {"apps": [{"appid": 8950, "name": "Borderlands"},'
+            '{"appid": 8980, "name": "Borderlands"},'
+            '{"appid": 10, "name": "Counter-Strike"}]}}')
+
+
+class TitleIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'titles.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_should_map_title_to_all_ids(self):
+        index = TitleIndex.build(RESOURCE)
+
+        self.assertEqual([8950, 8980], index.lookup('Borderlands'))
+
+    def test_should_lookup_case_insensitive(self):
+        index = TitleIndex.build(RESOURCE)
+
+        self.assertEqual([10], index.lookup('COUNTER-strike'))
+
+    def test_should_return_empty_list_for_unknown_title(self):
+        index = TitleIndex.build(RESOURCE)
+
+        self.assertEqual([], index.lookup('Half-Life'))
+
+    def test_should_support_old_app_list_format(self):
+        old_format = '{"applist": {"apps": {"app": [{"appid": 8,"name": "winui2"}]}}}'
+
+        index = TitleIndex.build(old_format)
+
+        self.assertEqual([8], index.lookup('winui2'))
+
+    def test_should_load_saved_index(self):
+        TitleIndex.build(RESOURCE, source_mtime=1.5).save(self.path)
+
+        index = TitleIndex.load(self.path, source_mtime=1.5)
+
+        self.assertEqual([8950, 8980], index.lookup('borderlands'))
+        self.assertEqual(1.5, index.source_mtime)
+
+    def test_should_not_load_index_of_another_app_list(self):
+        TitleIndex.build(RESOURCE, source_mtime=1.5).save(self.path)
+
+        self.assertIsNone(TitleIndex.load(self.path, source_mtime=2.5))
+
+    def test_should_not_load_index_of_another_version(self):
+        index = TitleIndex.build(RESOURCE)
+        index.version = TitleIndex.version + 1
+        index.save(self.path)
+
+        self.assertIsNone(TitleIndex.load(self.path))
+
+    def test_should_not_load_missing_index(self):
+        self.assertIsNone(TitleIndex.load(self.path))
+
+
+class AppIdIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'appids.idx')
+        self.resource = ('{"applist": {"apps": [{"appid": 20, "name": "Half-Life"},'
+                         '{"appid": 10, "name": "Counter-Strike"},'
+                         '{"appid": 1005, "name": "Астролорды"},'
+                         '{"appid": 10, "name": "Duplicate"}]}}')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _save(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    def test_should_lookup_names_by_id(self):
+        index = AppIdIndex(AppIdIndex.build(self.resource))
+
+        self.assertEqual('Counter-Strike', index.lookup(10))
+        self.assertEqual('Half-Life', index.lookup(20))
+        self.assertEqual('Астролорды', index.lookup(1005))
+        self.assertEqual(3, len(index))
+
+    def test_should_return_none_for_missing_id(self):
+        index = AppIdIndex(AppIdIndex.build(self.resource))
+
+        for appid in (0, 15, 21, 2000):
+            self.assertIsNone(index.lookup(appid))
+
+    def test_should_handle_empty_list(self):
+        index = AppIdIndex(AppIdIndex.build('{"applist": {"apps": []}}'))
+
+        self.assertIsNone(index.lookup(10))
+
+    def test_should_open_mapped_index_file(self):
+        self._save(AppIdIndex.build(self.resource, source_mtime=1.5))
+
+        index = AppIdIndex.open(self.path, source_mtime=1.5)
+
+        self.assertEqual('Counter-Strike', index.lookup(10))
+        index.close()
+
+    def test_should_not_open_index_of_another_app_list(self):
+        self._save(AppIdIndex.build(self.resource, source_mtime=1.5))
+
+        self.assertIsNone(AppIdIndex.open(self.path, source_mtime=2.5))
+
+    def test_should_not_open_corrupt_index(self):
+        self._save(AppIdIndex.build(self.resource)[:30])
+
+        self.assertIsNone(AppIdIndex.open(self.path))
+
+    def test_should_not_open_missing_or_empty_index(self):
+        self.assertIsNone(AppIdIndex.open(self.path))
+        self._save(b'')
+        self.assertIsNone(AppIdIndex.open(self.path))
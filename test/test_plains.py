@@ -0,0 +1,134 @@
+# To run single test module:
+# >>> python -m unittest test.test_some_module
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from requests import HTTPError
+
+from steamCLI.plains import PlainMap
+
+URL = 'http://api.example.com/map/?key=secret&shop=steam'
+MAPPING = {"data": {"app/10": "counterstrike", "app/620": "portalii",
+                    "sub/5": "counterstrikebundle"}}
+
+
+class PlainMapTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'plains.json')
+        self.session = mock.Mock()
+        self.session.get.return_value.json.return_value = MAPPING
+        self.plains = PlainMap(self.path, ttl=60, url=URL, session=self.session)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _make_stale(self):
+        old = time.time() - 120
+        os.utime(self.path, (old, old))
+
+    def test_should_create_map_from_config(self):
+        config = mock.Mock()
+        config.get_value.side_effect = lambda section, key: {
+            'directory': self.directory, 'env_var': 'steamCLI_test',
+            'plain_map': 'http://api.example.com/map/?key=[key]'}[key]
+        config.get_int.return_value = 30
+
+        with mock.patch.dict('os.environ', {'steamCLI_test': 'secret'}):
+            plains = PlainMap.from_config(config, session=self.session)
+
+        self.assertEqual(self.path, plains.path)
+        self.assertEqual(30, plains.ttl)
+        self.assertEqual('http://api.example.com/map/?key=secret', plains.url)
+
+    def test_should_not_download_without_api_key(self):
+        config = mock.Mock()
+        config.get_value.return_value = self.directory
+        config.get_int.return_value = 30
+
+        with mock.patch.dict('os.environ', {}, clear=True):
+            plains = PlainMap.from_config(config, session=self.session)
+
+        self.assertIsNone(plains.lookup(10))
+        self.session.get.assert_not_called()
+
+    def test_should_download_apps_of_mapping_once(self):
+        self.assertIsNone(self.plains.lookup(10))
+        self.plains.wait()
+
+        self.assertEqual('counterstrike', self.plains.lookup(10))
+        self.assertEqual('portalii', self.plains.lookup(620))
+        self.assertIsNone(self.plains.lookup(5))
+
+        self.session.get.assert_called_once_with(URL)
+        with open(self.path) as f:
+            self.assertEqual({'10': 'counterstrike', '620': 'portalii'}, json.load(f)['plains'])
+
+    def test_should_load_mapping_from_disk(self):
+        self.plains.lookup(10)
+        self.plains.wait()
+        other = PlainMap(self.path, ttl=60, url=URL, session=self.session)
+
+        self.assertEqual('portalii', other.lookup(620))
+        self.session.get.assert_called_once()
+
+    def test_should_serve_stale_mapping_and_refresh_in_background(self):
+        self.plains.lookup(10)
+        self.plains.wait()
+        self._make_stale()
+        self.session.get.return_value.json.return_value = {"data": {"app/10": "cs"}}
+        other = PlainMap(self.path, ttl=60, url=URL, session=self.session)
+
+        plain = other.lookup(10)
+        other.wait()
+
+        self.assertEqual('counterstrike', plain)
+        self.assertEqual('cs', other.lookup(10))
+        self.assertFalse(other.is_stale())
+
+    def test_should_refresh_loaded_mapping_once_it_goes_stale(self):
+        self.plains.lookup(10)
+        self.plains.wait()
+        self._make_stale()
+        self.session.get.return_value.json.return_value = {"data": {"app/10": "cs"}}
+
+        self.assertEqual('counterstrike', self.plains.lookup(10))
+        later = time.monotonic() + PlainMap.check_interval
+        with mock.patch('steamCLI.plains.time.monotonic', return_value=later):
+            self.assertEqual('counterstrike', self.plains.lookup(10))
+            self.plains.wait()
+
+        self.assertEqual('cs', self.plains.lookup(10))
+        self.assertEqual(2, self.session.get.call_count)
+
+    def test_should_not_wait_for_first_download(self):
+        downloaded = threading.Event()
+        response = self.session.get.return_value
+
+        def get(url):
+            downloaded.wait(5)
+            return response
+        self.session.get.side_effect = get
+
+        self.assertIsNone(self.plains.lookup(10))
+        self.assertIsNone(self.plains.lookup(620))
+
+        downloaded.set()
+        self.plains.wait()
+        self.assertEqual('portalii', self.plains.lookup(620))
+        self.session.get.assert_called_once()
+
+    def test_should_have_no_plains_when_download_fails(self):
+        self.session.get.return_value.raise_for_status.side_effect = HTTPError()
+
+        self.assertIsNone(self.plains.lookup(10))
+        self.plains.wait()
+        self.assertIsNone(self.plains.lookup(10))
+        self.assertFalse(os.path.exists(self.path))
@@ -0,0 +1,174 @@
+# To run single test module:
+# >>> python -m unittest test.test_some_module
+
+import threading
+import time
+import unittest
+from email.utils import formatdate
+from unittest import mock
+
+from requests import ConnectionError, Timeout
+
+from steamCLI.deadline import Deadline, DeadlineExceeded
+from steamCLI.ratelimit import AIMDLimiter, RateLimiter, TokenBucket, retry_after
+
+
+class TokenBucketTests(unittest.TestCase):
+    def test_should_let_burst_through_and_then_pace(self):
+        bucket = TokenBucket(rate=50, burst=3)
+
+        start = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        elapsed = time.monotonic() - start
+
+        # Two tokens beyond the burst take 2 / 50 s.
+        self.assertGreaterEqual(elapsed, 0.03)
+        self.assertLess(elapsed, 1)
+
+    def test_should_wait_out_pause(self):
+        bucket = TokenBucket(rate=1000, burst=10)
+        bucket.pause(0.05)
+
+        start = time.monotonic()
+        bucket.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test_should_not_wait_out_pause_longer_than_deadline(self):
+        bucket = TokenBucket(rate=1000, burst=10)
+        bucket.pause(60)
+
+        start = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            bucket.acquire(Deadline(1))
+
+        self.assertLess(time.monotonic() - start, 0.5)
+
+
+class AIMDLimiterTests(unittest.TestCase):
+    def setUp(self):
+        self.limiter = AIMDLimiter(initial=4, minimum=1, maximum=6, latency_target=5)
+
+    def test_should_grow_limit_additively(self):
+        for _ in range(8):
+            self.limiter.release(self.limiter.acquire(), congested=False)
+
+        self.assertGreater(self.limiter.limit, 5)
+        self.assertLessEqual(self.limiter.limit, 6)
+
+    def test_should_halve_limit_once_per_congestion(self):
+        started = [self.limiter.acquire() for _ in range(3)]
+
+        for start in started:
+            self.limiter.release(start, congested=True)
+
+        self.assertEqual(2, self.limiter.limit)
+
+    def test_should_treat_slow_response_as_congestion(self):
+        started = self.limiter.acquire()
+
+        self.limiter.release(started - 10, congested=False)
+
+        self.assertEqual(2, self.limiter.limit)
+
+    def test_should_not_drop_below_minimum(self):
+        for _ in range(5):
+            self.limiter.release(self.limiter.acquire(), congested=True)
+
+        self.assertEqual(1, self.limiter.limit)
+
+    def test_should_block_requests_over_limit(self):
+        limiter = AIMDLimiter(initial=1, minimum=1, maximum=1, latency_target=5)
+        started = limiter.acquire()
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        thread.start()
+
+        self.assertFalse(acquired.wait(0.05))
+        limiter.release(started, congested=False)
+        thread.join(1)
+        self.assertTrue(acquired.is_set())
+
+    def test_should_stop_waiting_when_deadline_runs_out(self):
+        limiter = AIMDLimiter(initial=1, minimum=1, maximum=1, latency_target=5)
+        limiter.acquire()
+
+        start = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            limiter.acquire(Deadline(0.05))
+
+        self.assertLess(time.monotonic() - start, 1)
+
+
+class RateLimiterTests(unittest.TestCase):
+    def setUp(self):
+        self.limiter = RateLimiter(rate=100, burst=10, initial_concurrency=4,
+                                   max_concurrency=8, latency_target=5,
+                                   max_retry_after=30)
+
+    def test_should_keep_limits_per_host(self):
+        store = self.limiter.host('https://store.steampowered.com/app/10')
+
+        self.assertIs(store, self.limiter.host('https://STORE.steampowered.com/api/'))
+        self.assertIsNot(store, self.limiter.host('https://api.steampowered.com/'))
+
+    def test_should_pause_host_for_retry_after(self):
+        response = mock.Mock(status_code=429, headers={'Retry-After': '120'})
+
+        with mock.patch.object(TokenBucket, 'pause') as m_pause:
+            with self.limiter.slot('http://a.example.com/') as slot:
+                slot.observe(response)
+
+        m_pause.assert_called_once_with(30)
+        self.assertEqual(2, self.limiter.host('http://a.example.com/')[1].limit)
+
+    def test_should_not_slow_down_on_other_errors(self):
+        with self.limiter.slot('http://a.example.com/') as slot:
+            slot.observe(mock.Mock(status_code=404, headers={}))
+
+        self.assertGreater(self.limiter.host('http://a.example.com/')[1].limit, 4)
+
+    def test_should_slow_down_on_connection_errors(self):
+        with self.assertRaises(ConnectionError):
+            with self.limiter.slot('http://a.example.com/'):
+                raise ConnectionError()
+
+        self.assertEqual(2, self.limiter.host('http://a.example.com/')[1].limit)
+
+    def test_should_not_slow_down_on_timeouts_shortened_by_deadline(self):
+        with self.assertRaises(Timeout):
+            with self.limiter.slot('http://a.example.com/', Deadline(60)) as slot:
+                slot.shortened = True
+                raise Timeout()
+
+        self.assertEqual(4, self.limiter.host('http://a.example.com/')[1].limit)
+
+    def test_should_tell_when_requests_are_queuing(self):
+        def send():
+            with self.limiter.slot('http://a.example.com/'):
+                pass
+
+        self.limiter.host('http://a.example.com/')[0].pause(0.2)
+        thread = threading.Thread(target=send)
+        thread.start()
+        time.sleep(0.05)
+
+        self.assertTrue(self.limiter.queuing('http://a.example.com/x'))
+        self.assertFalse(self.limiter.queuing('http://b.example.com/'))
+        thread.join()
+        self.assertFalse(self.limiter.queuing('http://a.example.com/'))
+
+
+class RetryAfterTests(unittest.TestCase):
+    def test_should_parse_seconds(self):
+        self.assertEqual(3, retry_after(' 3 '))
+
+    def test_should_parse_http_date(self):
+        delay = retry_after(formatdate(time.time() + 60, usegmt=True))
+
+        self.assertAlmostEqual(60, delay, delta=2)
+
+    def test_should_ignore_invalid_header(self):
+        self.assertIsNone(retry_after(None))
+        self.assertIsNone(retry_after('soon'))
@@ -1,4 +1,5 @@
 import unittest
+from unittest import mock
 
 from steamCLI.results import Results
 from steamCLI.steamapp import SteamApp
@@ -110,3 +111,28 @@ class ResultTest(unittest.TestCase):
         self.results.format_description()
 
         self.assertEqual(expected, self.results.description)
+
+    def test_region_prices_should_be_aligned_table(self):
+        prices = {'uk': {'currency': 'GBP', 'initial': 1999, 'final': 999},
+                  'us': {'currency': 'USD', 'initial': 2999, 'final': 2999},
+                  'ru': None}
+
+        self.results.format_region_prices(prices)
+
+        self.assertEqual(['UK          9.99 GBP  -50% from     19.99',
+                          'US         29.99 USD    0% from     29.99',
+                          'RU               N/A                     '],
+                         self.results.regions)
+        self.assertEqual(1, len({len(row) for row in self.results.regions}))
+
+    @mock.patch('builtins.print')
+    def test_should_mention_partial_sections(self, m_print):
+        self.results.steam = ['title']
+        self.results.mark_partial('reviews')
+        self.results.mark_partial('reviews')
+        self.results.mark_partial('historical low')
+
+        self.results.print_results()
+
+        printed = ' '.join(str(arg) for call in m_print.call_args_list for arg in call[0])
+        self.assertIn('Partial results: reviews, historical low did not finish in time.', printed)
@@ -0,0 +1,84 @@
+# To run single test module:
+# >>> python -m unittest test.test_some_module
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from steamCLI.search import FuzzyIndex, trigrams
+
+TITLES = ['borderlands', 'borderlands 2', 'borderlands: the pre-sequel',
+          'tiny tina\'s wonderlands', 'counter-strike', 'half-life',
+          'half-life 2', 'астролорды: оружие пришельцев']
+
+
+class TrigramTests(unittest.TestCase):
+    def test_should_pad_text(self):
+        self.assertEqual({'  a', ' ab', 'ab '}, trigrams('ab'))
+
+
+class FuzzyIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.index = FuzzyIndex.build(TITLES)
+
+    def test_should_find_title_with_typo(self):
+        self.assertEqual('borderlands', self.index.search('bordrelands')[0])
+
+    def test_should_find_title_case_insensitive(self):
+        self.assertEqual('half-life 2', self.index.search('Half Life 2')[0])
+
+    def test_should_find_title_without_ascii_characters(self):
+        self.assertEqual(TITLES[-1], self.index.search('астролорды оружие')[0])
+
+    def test_should_limit_results(self):
+        self.assertEqual(2, len(self.index.search('borderlands', limit=2)))
+
+    def test_should_not_find_anything_for_unrelated_query(self):
+        self.assertEqual([], self.index.search('qqq'))
+
+    def test_should_find_titles_by_prefix_shortest_first(self):
+        actual = self.index.prefix('Borderlands')
+
+        self.assertEqual(['borderlands', 'borderlands 2', 'borderlands: the pre-sequel'], actual)
+
+    def test_should_not_find_titles_with_empty_prefix(self):
+        self.assertEqual([], self.index.prefix(''))
+
+    def test_should_suggest_prefix_matches_first(self):
+        actual = self.index.suggest('half-life', limit=3)
+
+        self.assertEqual(['half-life', 'half-life 2'], actual[:2])
+        self.assertEqual(len(set(actual)), len(actual))
+
+    def test_should_suggest_title_missing_subtitle(self):
+        self.assertIn('borderlands: the pre-sequel', self.index.suggest('borderlands: the pre'))
+
+
+class FuzzyIndexPersistenceTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'fuzzy.idx')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_should_load_saved_index(self):
+        FuzzyIndex.build(TITLES, source_mtime=1.5).save(self.path)
+
+        index = FuzzyIndex.load(self.path, source_mtime=1.5)
+
+        self.assertEqual(sorted(TITLES), index.titles)
+        self.assertEqual('borderlands', index.search('bordrelands')[0])
+
+    def test_should_not_load_index_of_another_app_list(self):
+        FuzzyIndex.build(TITLES, source_mtime=1.5).save(self.path)
+
+        self.assertIsNone(FuzzyIndex.load(self.path, source_mtime=2.5))
+
+    def test_should_not_load_truncated_index(self):
+        FuzzyIndex.build(TITLES).save(self.path)
+        with open(self.path, 'rb+') as f:
+            f.truncate(os.path.getsize(self.path) - 4)
+
+        self.assertIsNone(FuzzyIndex.load(self.path))
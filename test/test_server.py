@@ -0,0 +1,152 @@
+# To run single test module:
+# >>> python -m unittest test.test_some_module
+
+import json
+import threading
+import unittest
+from unittest import mock
+from urllib.error import HTTPError as URLHTTPError
+from urllib.request import urlopen
+
+from requests import HTTPError
+
+from steamCLI.deadline import DeadlineExceeded
+from steamCLI.server import LookupServer, ResponseCache, parse_query
+
+
+class ParseQueryTests(unittest.TestCase):
+    def _parse(self, **query):
+        return parse_query({key: [value] for key, value in query.items()},
+                           ['uk', 'us'], 'uk')
+
+    def test_should_use_defaults(self):
+        self.assertEqual({'title': None, 'app_id': 10, 'region': 'uk',
+                          'scores': False, 'historical_low': False,
+                          'fuzzy': False, 'deadline': None},
+                         self._parse(appid='10'))
+
+    def test_should_treat_blank_flags_as_set(self):
+        params = self._parse(title='Borderlands', region='US', scores='',
+                             historical_low='no', deadline='2.5')
+
+        self.assertEqual(('Borderlands', 'us', True, False, 2.5),
+                         (params['title'], params['region'], params['scores'],
+                          params['historical_low'], params['deadline']))
+
+    def test_should_reject_invalid_queries(self):
+        for query in ({}, {'title': 'CS', 'appid': '10'}, {'appid': 'ten'},
+                      {'appid': '10', 'region': 'mars'},
+                      {'appid': '10', 'deadline': 'soon'},
+                      {'appid': '10', 'deadline': '0'}):
+            with self.assertRaises(ValueError):
+                self._parse(**query)
+
+
+class ResponseCacheTests(unittest.TestCase):
+    @mock.patch('steamCLI.server.time.monotonic')
+    def test_should_expire_records(self, monotonic):
+        cache = ResponseCache(size=10, ttl=60)
+        monotonic.return_value = 100
+        cache.put(('a',), {'appid': 10})
+
+        monotonic.return_value = 160
+        self.assertEqual({'appid': 10}, cache.get(('a',)))
+        monotonic.return_value = 161
+        self.assertIsNone(cache.get(('a',)))
+
+    def test_should_evict_least_recently_used(self):
+        cache = ResponseCache(size=2, ttl=60)
+        cache.put(('a',), {'appid': 10})
+        cache.put(('b',), {'appid': 20})
+        cache.get(('a',))
+        cache.put(('c',), {'appid': 30})
+
+        self.assertIsNone(cache.get(('b',)))
+        self.assertIsNotNone(cache.get(('a',)))
+        self.assertIsNotNone(cache.get(('c',)))
+
+
+class LookupServerTests(unittest.TestCase):
+    def setUp(self):
+        self.lookup = mock.Mock(return_value={'query': 10, 'found': True, 'appid': 10})
+        self.server = LookupServer(('127.0.0.1', 0), self.lookup,
+                                   regions=['uk', 'us'], default_region='uk',
+                                   deadline=30, cache=ResponseCache(10, 60))
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       kwargs={'poll_interval': 0.01})
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+
+    def _get(self, path):
+        host, port = self.server.server_address[:2]
+        try:
+            with urlopen(f'http://{host}:{port}{path}', timeout=5) as response:
+                return response.status, json.loads(response.read())
+        except URLHTTPError as e:
+            with e:
+                return e.code, json.loads(e.read())
+
+    def test_should_answer_lookups(self):
+        status, record = self._get('/lookup?appid=10&region=us&scores')
+
+        self.assertEqual(200, status)
+        self.assertEqual(10, record['appid'])
+        kwargs = self.lookup.call_args[1]
+        self.assertEqual(('us', True, False), (kwargs['region'], kwargs['scores'],
+                                               kwargs['historical_low']))
+        self.assertEqual(30, kwargs['deadline'].seconds)
+
+    def test_should_serve_repeated_lookups_from_memory(self):
+        self._get('/lookup?appid=10')
+        status, record = self._get('/lookup?appid=10')
+
+        self.assertEqual(200, status)
+        self.lookup.assert_called_once()
+
+    def test_should_not_cache_partial_records(self):
+        self.lookup.return_value = {'query': 10, 'found': True, 'partial': ['reviews']}
+
+        self._get('/lookup?appid=10&scores&deadline=1')
+        self._get('/lookup?appid=10&scores')
+
+        self.assertEqual(2, self.lookup.call_count)
+        self.assertEqual(1, self.lookup.call_args_list[0][1]['deadline'].seconds)
+
+    def test_should_map_failures_to_statuses(self):
+        self.assertEqual(400, self._get('/lookup?region=uk')[0])
+        self.assertEqual(404, self._get('/prices?appid=10')[0])
+
+        self.lookup.return_value = {'query': 'Nope', 'found': False}
+        self.assertEqual(404, self._get('/lookup?title=Nope')[0])
+
+        self.lookup.side_effect = DeadlineExceeded()
+        self.assertEqual(504, self._get('/lookup?appid=20')[0])
+
+        self.lookup.side_effect = HTTPError("Resource not found.")
+        status, record = self._get('/lookup?appid=30')
+        self.assertEqual((502, "Resource not found."), (status, record['error']))
+
+    def test_should_handle_requests_at_the_same_time(self):
+        """ Both have to be in flight at once to pass the barrier. """
+
+        barrier = threading.Barrier(2, timeout=5)
+
+        def lookup(**kwargs):
+            barrier.wait()
+            return {'query': kwargs['app_id'], 'found': True}
+        self.lookup.side_effect = lookup
+
+        statuses = []
+        threads = [threading.Thread(target=lambda appid=appid: statuses.append(
+            self._get(f'/lookup?appid={appid}')[0])) for appid in (10, 20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([200, 200], statuses)
+
@@ -0,0 +1,448 @@
+# To run single test module:
+# >>> python -m unittest test.test_some_module
+
+import socketserver
+import threading
+import time
+import unittest
+from concurrent.futures import ALL_COMPLETED, wait
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+
+from requests import ConnectionError, HTTPError, Timeout
+
+from steamCLI.config import Config
+from steamCLI.deadline import Deadline, DeadlineExceeded
+from steamCLI.ratelimit import RateLimiter
+from steamCLI.session import (Endpoint, LatencyTracker, Session, ServerError,
+                              TooManyRequests, raise_for_status)
+
+URL = 'http://api.example.com/test/'
+CHUNKS = [b'{"applist": ', b'{"apps": []}}']
+
+
+class SessionTests(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(timeout=(1, 2), pool_connections=2, pool_maxsize=3)
+
+    def test_should_create_session_from_config(self):
+        config = mock.Mock(Config)
+        config.get_float.side_effect = lambda section, key: {
+            'connect_timeout': 1.5, 'read_timeout': 10.0, 'rate': 5.0,
+            'latency_target': 2.0, 'max_retry_after': 30.0, 'backoff': 0.1,
+            'max_backoff': 1.0, 'hedge_quantile': 0.9}[key]
+        config.get_int.side_effect = lambda section, key: {
+            'pool_connections': 2, 'pool_maxsize': 6, 'burst': 5,
+            'initial_concurrency': 2, 'max_concurrency': 6, 'retries': 3,
+            'hedge_min_samples': 10}[key]
+        config.snapshot.return_value = {'Endpoints': {'appdetails': '...'}}
+        config.get_list.return_value = ['Store.example.com/api/', '1', '4', 'yes']
+
+        session = Session.from_config(config)
+
+        self.assertEqual((1.5, 10.0), session.timeout)
+        self.assertEqual(5.0, session.limiter.rate)
+        self.assertEqual(3, session.retries)
+        self.assertEqual([Endpoint('appdetails', 'store.example.com/api/', (1.0, 4.0), True)],
+                         session.endpoints)
+        adapter = session.get_adapter('https://store.steampowered.com/')
+        self.assertEqual(6, adapter._pool_maxsize)
+        self.assertEqual(2, adapter._pool_connections)
+
+    def test_should_share_one_pooled_adapter_between_schemes(self):
+        self.assertIs(self.session.get_adapter('http://a.example.com/'),
+                      self.session.get_adapter('https://b.example.com/'))
+
+    @mock.patch('requests.Session.request')
+    def test_should_apply_default_timeout(self, m_request):
+        self.session.get(URL)
+
+        self.assertEqual((1, 2), m_request.call_args[1]['timeout'])
+
+    @mock.patch('requests.Session.request')
+    def test_should_keep_timeout_of_request(self, m_request):
+        self.session.get(URL, timeout=5)
+
+        self.assertEqual(5, m_request.call_args[1]['timeout'])
+
+    @mock.patch.object(Session, 'get')
+    def test_should_stream_resource_and_close_response(self, mock_get):
+        mocked_response = mock.MagicMock()
+        mocked_response.__enter__.return_value = mocked_response
+        mocked_response.iter_content.return_value = iter(CHUNKS)
+        mock_get.return_value = mocked_response
+
+        actual = list(self.session.stream_resource(URL))
+
+        self.assertEqual(CHUNKS, actual)
+        mock_get.assert_called_once_with(URL, stream=True)
+        mocked_response.__exit__.assert_called_once()
+
+    @mock.patch.object(Session, 'get')
+    def test_should_raise_error_upon_inaccessible_stream(self, mock_get):
+        mocked_response = mock.Mock()
+        mocked_response.raise_for_status.side_effect = HTTPError()
+        mock_get.return_value = mocked_response
+
+        with self.assertRaises(HTTPError):
+            list(self.session.stream_resource(URL))
+
+    @mock.patch('requests.Session.request')
+    def test_should_pace_requests_through_limiter(self, m_request):
+        m_request.return_value = mock.Mock(status_code=429, headers={'Retry-After': '7'})
+        self.session.limiter = RateLimiter(rate=100, burst=10, initial_concurrency=4,
+                                           max_concurrency=8, latency_target=5)
+
+        with mock.patch('steamCLI.ratelimit.TokenBucket.pause') as m_pause:
+            self.session.get(URL)
+
+        m_pause.assert_called_once_with(7)
+        self.assertEqual(2, self.session.limiter.host(URL)[1].limit)
+
+
+def _response(status, headers=None):
+    return mock.Mock(status_code=status, headers=headers or {})
+
+
+class RetryTests(unittest.TestCase):
+    def setUp(self):
+        self.endpoint = Endpoint('api', 'api.example.com/', (1, 4), False)
+        self.session = Session(endpoints=[self.endpoint], retries=2, backoff=0.01,
+                               max_backoff=0.01)
+
+    @mock.patch('requests.Session.request')
+    def test_should_apply_endpoint_timeout(self, m_request):
+        m_request.return_value = _response(200)
+
+        self.session.get(URL)
+        self.session.get('http://other.example.com/')
+
+        self.assertEqual((1, 4), m_request.call_args_list[0][1]['timeout'])
+        self.assertEqual((3.05, 30), m_request.call_args_list[1][1]['timeout'])
+
+    @mock.patch('requests.Session.request')
+    def test_should_retry_failed_requests(self, m_request):
+        m_request.side_effect = [ConnectionError(), _response(503), _response(200)]
+
+        response = self.session.get(URL)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(3, m_request.call_count)
+
+    @mock.patch('requests.Session.request')
+    def test_should_give_up_after_retries(self, m_request):
+        m_request.side_effect = Timeout()
+
+        with self.assertRaises(Timeout):
+            self.session.get(URL)
+
+        self.assertEqual(3, m_request.call_count)
+
+    @mock.patch('requests.Session.request')
+    def test_should_return_last_error_response(self, m_request):
+        m_request.return_value = _response(503)
+
+        self.assertEqual(503, self.session.get(URL).status_code)
+        self.assertEqual(3, m_request.call_count)
+
+    @mock.patch('requests.Session.request')
+    def test_should_not_retry_other_errors_or_posts(self, m_request):
+        m_request.return_value = _response(404)
+        self.session.get(URL)
+        m_request.side_effect = ConnectionError()
+
+        with self.assertRaises(ConnectionError):
+            self.session.post(URL)
+
+        self.assertEqual(2, m_request.call_count)
+
+    @mock.patch('time.sleep')
+    @mock.patch('requests.Session.request')
+    def test_should_wait_as_long_as_server_asks(self, m_request, m_sleep):
+        self.session.max_backoff = 10
+        m_request.side_effect = [_response(429, {'Retry-After': '3'}), _response(200)]
+
+        self.session.get(URL)
+
+        m_sleep.assert_called_once_with(3)
+
+    @mock.patch('requests.Session.request')
+    def test_should_not_outlast_deadline(self, m_request):
+        m_request.return_value = _response(200)
+
+        self.session.get(URL, deadline=Deadline(0.5))
+
+        connect, read = m_request.call_args[1]['timeout']
+        self.assertLessEqual(connect, 0.5)
+        self.assertLessEqual(read, 0.5)
+        self.assertNotIn('deadline', m_request.call_args[1])
+
+    @mock.patch('requests.Session.request')
+    def test_should_not_send_request_after_deadline(self, m_request):
+        with self.assertRaises(DeadlineExceeded):
+            self.session.get(URL, deadline=Deadline(0))
+
+        m_request.assert_not_called()
+
+    @mock.patch('random.uniform', return_value=4)
+    @mock.patch('requests.Session.request')
+    def test_should_not_retry_when_there_is_no_time_left(self, m_request, _):
+        self.session.backoff = self.session.max_backoff = 5
+        m_request.side_effect = ConnectionError()
+
+        with self.assertRaises(ConnectionError):
+            self.session.get(URL, deadline=Deadline(1))
+
+        m_request.assert_called_once()
+
+
+class SlowServer(socketserver.ThreadingMixIn, HTTPServer):
+    """
+    Local server that answers /slow only after a while, and sends the body
+    of /trickle slowly. Both stop waiting once the server is closed.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, delay: float=4):
+        super().__init__(('127.0.0.1', 0), _SlowHandler)
+        self.delay = delay
+        self.closed = threading.Event()
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        kwargs={'poll_interval': 0.01})
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def close(self):
+        self.closed.set()
+        self.shutdown()
+        self._thread.join()
+        self.server_close()
+
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/slow':
+            self.server.closed.wait(self.server.delay)
+        self.send_response(200)
+        self.send_header('Content-Length', '1000')
+        self.end_headers()
+        self.wfile.write(b'x' * 10)
+        self.wfile.flush()
+        if self.path == '/trickle':
+            self.server.closed.wait(self.server.delay)
+        try:
+            self.wfile.write(b'x' * 990)
+        except OSError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class ClampedTimeoutTests(unittest.TestCase):
+    """ Timeouts that the deadline shortened, against a real server. """
+
+    def setUp(self):
+        self.server = SlowServer()
+        self.session = Session(timeout=(1, 10), retries=2)
+
+    def tearDown(self):
+        self.session.close()
+        self.server.close()
+
+    def test_should_raise_deadline_exceeded_when_headers_are_late(self):
+        started = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            self.session.get(self.server.url + '/slow', deadline=Deadline(0.3))
+
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_should_raise_deadline_exceeded_when_body_is_late(self):
+        with self.assertRaises(DeadlineExceeded):
+            self.session.get(self.server.url + '/trickle', deadline=Deadline(0.3))
+
+    def test_should_raise_deadline_exceeded_when_stream_is_late(self):
+        chunks = self.session.stream_resource(self.server.url + '/trickle',
+                                              chunk_size=10,
+                                              deadline=Deadline(0.3))
+
+        with self.assertRaises(DeadlineExceeded):
+            list(chunks)
+
+    def test_should_not_slow_host_down_when_deadline_cuts_request_short(self):
+        self.session.retries = 0
+        self.session.limiter = RateLimiter(rate=100, burst=10, initial_concurrency=8,
+                                           max_concurrency=8, latency_target=5)
+
+        for _ in range(4):
+            with self.assertRaises(DeadlineExceeded):
+                self.session.get(self.server.url + '/slow', deadline=Deadline(0.05))
+
+        self.assertEqual(8, self.session.limiter.host(self.server.url)[1].limit)
+
+    def test_should_keep_plain_timeouts_without_deadline(self):
+        self.session.retries = 0
+
+        with self.assertRaises(Timeout) as raised:
+            self.session.get(self.server.url + '/slow', timeout=0.2)
+
+        self.assertNotIsInstance(raised.exception, DeadlineExceeded)
+
+
+class HedgingTests(unittest.TestCase):
+    def setUp(self):
+        endpoint = Endpoint('api', 'api.example.com/', (1, 4), True)
+        self.session = Session(endpoints=[endpoint], hedge_min_samples=5)
+        for _ in range(5):
+            self.session._latencies['api'].record(0.01)
+
+    @mock.patch('requests.Session.request')
+    def test_should_not_hedge_without_enough_samples(self, m_request):
+        self.session._latencies['api'] = LatencyTracker(min_samples=5)
+        m_request.return_value = _response(200)
+
+        self.session.get(URL)
+
+        self.assertEqual(1, m_request.call_count)
+
+    @mock.patch('requests.Session.request')
+    def test_should_send_hedge_when_request_is_slow(self, m_request):
+        slow, fast = _response(200), _response(200)
+        released, closed = threading.Event(), threading.Event()
+        slow.close.side_effect = lambda: closed.set()
+
+        def request(method, url, **kwargs):
+            if m_request.call_count == 1:
+                released.wait(1)
+                return slow
+            return fast
+        m_request.side_effect = request
+
+        response = self.session.get(URL)
+        released.set()
+
+        self.assertIs(fast, response)
+        self.assertEqual(2, m_request.call_count)
+        self.assertTrue(closed.wait(1))
+
+    @mock.patch('requests.Session.request')
+    def test_should_prefer_success_when_both_requests_finish_together(self, m_request):
+        fast = _response(200)
+        released = threading.Event()
+
+        def request(method, url, **kwargs):
+            if m_request.call_count == 1:
+                released.wait(1)
+                raise ConnectionError()
+            released.set()
+            return fast
+        m_request.side_effect = request
+
+        with mock.patch('steamCLI.session.wait',
+                        lambda futures, return_when: wait(futures, return_when=ALL_COMPLETED)):
+            response = self.session.get(URL)
+
+        self.assertIs(fast, response)
+        fast.close.assert_not_called()
+
+    @mock.patch('requests.Session.request')
+    def test_should_close_response_that_is_not_used(self, m_request):
+        slow, fast = _response(200), _response(200)
+        released = threading.Event()
+
+        def request(method, url, **kwargs):
+            if m_request.call_count == 1:
+                released.wait(1)
+                return slow
+            released.set()
+            return fast
+        m_request.side_effect = request
+
+        with mock.patch('steamCLI.session.wait',
+                        lambda futures, return_when: wait(futures, return_when=ALL_COMPLETED)):
+            response = self.session.get(URL)
+
+        unused = slow if response is fast else fast
+        unused.close.assert_called_once()
+        response.close.assert_not_called()
+
+    def test_should_cap_hedges_per_host(self):
+        slots = self.session._hedge_slots_of(URL)
+
+        self.assertIs(slots, self.session._hedge_slots_of('http://API.example.com/other'))
+        self.assertIsNot(slots, self.session._hedge_slots_of('http://store.example.com/'))
+
+    @mock.patch('requests.Session.request')
+    def test_should_not_hedge_fast_request(self, m_request):
+        m_request.return_value = _response(200)
+
+        self.session.get(URL)
+
+        self.assertEqual(1, m_request.call_count)
+
+    @mock.patch('requests.Session.request')
+    def test_should_not_count_waiting_for_pace_as_slow(self, m_request):
+        self.session.limiter = RateLimiter(rate=100, burst=1, initial_concurrency=4,
+                                           max_concurrency=4, latency_target=5)
+        self.session.limiter.host(URL)[0].pause(0.2)
+        m_request.return_value = _response(200)
+
+        self.session.get(URL)
+
+        self.assertEqual(1, m_request.call_count)
+        self.assertLess(self.session._latencies['api'].quantile(1), 0.1)
+
+    @mock.patch('requests.Session.request')
+    def test_should_not_hedge_while_requests_to_host_are_queuing(self, m_request):
+        self.session.limiter = mock.Mock(RateLimiter)
+        self.session.limiter.slot.return_value.__enter__ = mock.Mock()
+        self.session.limiter.slot.return_value.__exit__ = mock.Mock(return_value=False)
+        self.session.limiter.queuing.return_value = True
+        slow = _response(200)
+        m_request.side_effect = lambda method, url, **kwargs: time.sleep(0.1) or slow
+
+        self.assertIs(slow, self.session.get(URL))
+        self.assertEqual(1, m_request.call_count)
+        self.session.limiter.queuing.assert_called_once_with(URL)
+
+
+class LatencyTrackerTests(unittest.TestCase):
+    def test_should_estimate_quantile(self):
+        tracker = LatencyTracker(window=100, min_samples=10)
+        for latency in range(1, 101):
+            tracker.record(latency)
+
+        self.assertEqual(96, tracker.quantile(0.95))
+
+    def test_should_keep_latest_latencies_only(self):
+        tracker = LatencyTracker(window=3, min_samples=3)
+        for latency in (100, 1, 2, 3):
+            tracker.record(latency)
+
+        self.assertEqual(3, tracker.quantile(1))
+
+
+class RaiseForStatusTests(unittest.TestCase):
+    def _response(self, status):
+        response = mock.Mock()
+        response.raise_for_status.side_effect = HTTPError(response=mock.Mock(status_code=status))
+        return response
+
+    def test_should_tell_throttling_apart(self):
+        with self.assertRaises(TooManyRequests):
+            raise_for_status(self._response(429))
+
+    def test_should_tell_server_errors_apart(self):
+        with self.assertRaisesRegex(ServerError, '503'):
+            raise_for_status(self._response(503))
+
+    def test_should_report_other_errors_with_message(self):
+        with self.assertRaisesRegex(HTTPError, 'App page not found.') as context:
+            raise_for_status(self._response(404), "App page not found.")
+
+        self.assertNotIsInstance(context.exception, (TooManyRequests, ServerError))
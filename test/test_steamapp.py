@@ -1,25 +1,65 @@
 # To run single test module:
 # >>> python -m unittest test.test_some_module
 
+import re
+import threading
 import unittest
 from unittest import mock
 
+import requests
 from requests import HTTPError
 
 from steamCLI.config import Config
+from steamCLI.deadline import Deadline
+from steamCLI.index import TitleIndex
+from steamCLI.session import Session
 from steamCLI.steamapp import SteamApp
+from steamCLI.store import Entry
+from test.test_session import SlowServer
 
 # Stubs that tests can use.
 RESOURCE = '{"applist": {"apps": {"app": [{"appid": 8,"name": "winui2"}]}}}'
+CHUNKS = [RESOURCE.encode()]
 MOCK_DICT = {"appid": 8, "name": "winui2"}
 MOCK_DATA = {"8": {"success": True, "data": {}}}
 
 
+def _responses_by_appid(*responses):
+    """ Returns a requests.get stand-in that answers based on the queried id. """
+
+    def get(url):
+        appid = int(re.search(r'(\d+)&cc', url).group(1))
+        return responses[appid - 1]
+
+    return get
+
+
 class SteamAppConstructionTests(unittest.TestCase):
     def test_should_raise_FileNotFoundError(self):
         with self.assertRaises(FileNotFoundError):
             SteamApp(config=None)
 
+    def test_should_use_given_session(self):
+        session = mock.Mock()
+        app = SteamApp(config=mock.Mock(Config), session=session)
+        session.get.return_value.text = RESOURCE
+
+        self.assertEqual(RESOURCE, app._fetch_resource('http://api.example.com/'))
+        session.get.assert_called_once_with('http://api.example.com/')
+
+    @mock.patch('requests.Session.get')
+    @mock.patch.object(SteamApp, '_extract_app_dictionary')
+    @mock.patch.object(SteamApp, '_assign_steam_info')
+    def test_should_stream_app_list_through_plain_session(self, _, m_extr, m_get):
+        m_get.return_value.iter_content.return_value = CHUNKS
+        m_extr.side_effect = lambda chunks, **kwargs: list(chunks)
+        app = SteamApp(config=mock.Mock(Config), session=requests.Session())
+
+        app.find_app('http://api.example.com/', app_id=10)
+
+        m_get.assert_called_once_with('http://api.example.com/', stream=True)
+        m_get.return_value.__exit__.assert_called_once()
+
 
 class SteamAppFetchTextAssignIDTests(unittest.TestCase):
     def setUp(self):
@@ -29,7 +69,7 @@ class SteamAppFetchTextAssignIDTests(unittest.TestCase):
         self.config = mock.Mock(Config)
         self.app = SteamApp(self.config)
 
-    @mock.patch('steamCLI.steamapp.requests.get')
+    @mock.patch('steamCLI.session.Session.get')
     def test_should_raise_error_upon_inaccessible_resource(self, mock_get):
         mocked_response = mock.Mock()
         mocked_response.raise_for_status.side_effect = HTTPError()
@@ -40,7 +80,7 @@ class SteamAppFetchTextAssignIDTests(unittest.TestCase):
 
         mock_get.assert_called_once_with(self.url)
 
-    @mock.patch('steamCLI.steamapp.requests.get')
+    @mock.patch('steamCLI.session.Session.get')
     def test_should_fetch_resource_in_json_when_it_exists(self, mock_get):
         mock_obj = mock.Mock()
         mock_obj.json.return_value = MOCK_DATA
@@ -52,7 +92,7 @@ class SteamAppFetchTextAssignIDTests(unittest.TestCase):
         mock_get.assert_called_once_with(self.url)
         mock_obj.json.assert_called_once()
 
-    @mock.patch('steamCLI.steamapp.requests.get')
+    @mock.patch('steamCLI.session.Session.get')
     def test_should_fetch_resource_in_textual_form_if_it_exists(self, mock_get):
         mock_get.return_value = mock.MagicMock(text=RESOURCE)
 
@@ -66,7 +106,7 @@ class SteamAppFetchTextAssignIDTests(unittest.TestCase):
         m_func.return_value = None
         self.app.title = "Test"
 
-        result = self.app._extract_app_dictionary(RESOURCE)
+        result = self.app._extract_app_dictionary(CHUNKS)
 
         self.assertFalse(result)
         m_func.assert_called_once()
@@ -75,7 +115,7 @@ class SteamAppFetchTextAssignIDTests(unittest.TestCase):
     def test_should_extract_relevant_app_data(self, mock_choose):
         mock_choose.return_value = MOCK_DATA
 
-        result = self.app._extract_app_dictionary(RESOURCE, title=self.title)
+        result = self.app._extract_app_dictionary(CHUNKS, title=self.title)
 
         self.assertEqual(MOCK_DATA, result)
         mock_choose.assert_called_once()
@@ -84,7 +124,7 @@ class SteamAppFetchTextAssignIDTests(unittest.TestCase):
     def test_should_extract_app_dictionary_case_insensitive(self, mock_choose):
         mock_choose.return_value = MOCK_DATA
 
-        result = self.app._extract_app_dictionary(RESOURCE, title=(self.title.upper()))
+        result = self.app._extract_app_dictionary(CHUNKS, title=(self.title.upper()))
 
         self.assertEqual(MOCK_DATA, result)
         mock_choose.assert_called_once()
@@ -93,7 +133,7 @@ class SteamAppFetchTextAssignIDTests(unittest.TestCase):
     def test_should_extract_app_dictionary_when_given_id(self, mock_choose):
         mock_choose.return_value = MOCK_DATA
 
-        result = self.app._extract_app_dictionary(RESOURCE, app_id=self.appid)
+        result = self.app._extract_app_dictionary(CHUNKS, app_id=self.appid)
 
         self.assertEqual(MOCK_DATA, result)
         mock_choose.assert_called_once()
@@ -102,51 +142,115 @@ class SteamAppFetchTextAssignIDTests(unittest.TestCase):
     def test_should_not_get_app_dict_with_id_when_no_such_id(self, mock_choose):
         mock_choose.return_value = None
 
-        result = self.app._extract_app_dictionary(RESOURCE, app_id=0)
+        result = self.app._extract_app_dictionary(CHUNKS, app_id=0)
 
         self.assertFalse(result)
         mock_choose.assert_called_once()
 
-    @mock.patch.object(SteamApp, '_fetch_resource')
+    @mock.patch('steamCLI.session.Session.stream_resource')
     @mock.patch.object(SteamApp, '_extract_app_dictionary')
     @mock.patch.object(SteamApp, '_assign_steam_info')
     def test_should_find_app_given_valid_title(self, m_assign, m_extr, m_fetch):
-        m_fetch.return_value = RESOURCE
+        m_fetch.return_value = CHUNKS
         m_extr.return_value = MOCK_DATA
 
         self.app.find_app(self.url, title=self.title)
 
         m_fetch.assert_called_once_with(self.url)
         m_assign.assert_called_once_with(MOCK_DATA)
-        m_extr.assert_called_once_with(RESOURCE, app_id=None, region=None, title=self.title)
+        m_extr.assert_called_once_with(CHUNKS, app_id=None, region=None, title=self.title, deadline=None)
 
-    @mock.patch.object(SteamApp, '_fetch_resource')
+    @mock.patch('steamCLI.session.Session.stream_resource')
     @mock.patch.object(SteamApp, '_extract_app_dictionary')
     @mock.patch.object(SteamApp, '_assign_steam_info')
     def test_should_find_app_given_id(self, m_assign, m_extr, m_fetch):
-        m_fetch.return_value = RESOURCE
+        m_fetch.return_value = CHUNKS
         m_extr.return_value = MOCK_DATA
 
         self.app.find_app(self.url, app_id=self.appid)
 
         m_fetch.assert_called_once_with(self.url)
         m_assign.assert_called_once_with(MOCK_DATA)
-        m_extr.assert_called_once_with(RESOURCE, app_id=self.appid, region=None, title=None)
+        m_extr.assert_called_once_with(CHUNKS, app_id=self.appid, region=None, title=None, deadline=None)
 
-    @mock.patch.object(SteamApp, '_fetch_resource')
+    @mock.patch('steamCLI.session.Session.stream_resource')
+    @mock.patch.object(SteamApp, '_pick_complete_json')
+    @mock.patch.object(SteamApp, '_assign_steam_info')
+    def test_should_find_app_id_in_index(self, m_assign, m_pick, m_stream):
+        applist = mock.Mock()
+        applist.appid_index.return_value.lookup.return_value = self.title
+        m_pick.return_value = MOCK_DATA
+        app = SteamApp(self.config, applist=applist)
+
+        app.find_app(self.url, app_id=self.appid)
+
+        applist.appid_index.assert_called_once_with(self.url, None)
+        applist.appid_index.return_value.lookup.assert_called_once_with(self.appid)
+        m_stream.assert_not_called()
+        m_pick.assert_called_once_with([MOCK_DICT], region=None, deadline=None)
+        m_assign.assert_called_once_with(MOCK_DATA)
+
+    @mock.patch.object(SteamApp, '_pick_complete_json')
+    @mock.patch.object(SteamApp, '_assign_steam_info')
+    def test_should_not_probe_id_missing_from_index(self, m_assign, m_pick):
+        applist = mock.Mock()
+        applist.appid_index.return_value.lookup.return_value = None
+        m_pick.return_value = None
+        app = SteamApp(self.config, applist=applist)
+
+        app.find_app(self.url, app_id=self.appid)
+
+        m_pick.assert_called_once_with([], region=None, deadline=None)
+        m_assign.assert_called_once_with(None)
+
+    @mock.patch.object(SteamApp, '_extract_app_dictionary')
+    @mock.patch.object(SteamApp, '_pick_complete_json')
+    @mock.patch.object(SteamApp, '_assign_steam_info')
+    def test_should_find_app_title_in_index(self, m_assign, m_pick, m_extr):
+        applist = mock.Mock()
+        applist.title_index.return_value = TitleIndex({self.title: [1, 2]})
+        m_pick.return_value = MOCK_DATA
+        app = SteamApp(self.config, applist=applist)
+
+        app.find_app(self.url, title=self.title.upper(), region='uk')
+
+        applist.title_index.assert_called_once_with(self.url, None)
+        m_extr.assert_not_called()
+        m_pick.assert_called_once_with(
+            [{"appid": 1, "name": self.title.upper()},
+             {"appid": 2, "name": self.title.upper()}], region='uk', deadline=None)
+        m_assign.assert_called_once_with(MOCK_DATA)
+
+    @mock.patch('steamCLI.session.Session.stream_resource')
     @mock.patch.object(SteamApp, '_extract_app_dictionary')
     @mock.patch.object(SteamApp, '_assign_steam_info')
     def test_should_not_find_app_with_no_data(self, m_assign, m_get, m_fetch):
-        m_fetch.return_value = RESOURCE
+        m_fetch.return_value = CHUNKS
         m_get.return_value = None
 
         self.app.find_app(self.url)
 
         m_fetch.assert_called_once_with(self.url)
         m_assign.assert_called_once_with(None)
-        m_get.assert_called_once_with(RESOURCE, app_id=None, region=None, title=None)
+        m_get.assert_called_once_with(CHUNKS, app_id=None, region=None, title=None, deadline=None)
 
-    @mock.patch('steamCLI.steamapp.requests.get')
+    def test_should_not_suggest_titles_without_app_list(self):
+        self.assertEqual([], self.app.suggest_titles(self.url, self.title))
+
+    def test_should_suggest_original_app_names(self):
+        applist = mock.Mock()
+        applist.fuzzy_index.return_value.suggest.return_value = ['borderlands 2', 'gone']
+        applist.title_index.return_value = TitleIndex({'borderlands 2': [49520]})
+        applist.appid_index.return_value.lookup.return_value = 'Borderlands 2'
+        app = SteamApp(self.config, applist=applist)
+
+        actual = app.suggest_titles(self.url, 'borderland 2', limit=3)
+
+        self.assertEqual(['Borderlands 2', 'gone'], actual)
+        applist.fuzzy_index.return_value.suggest.assert_called_once_with('borderland 2', 3)
+        applist.appid_index.return_value.lookup.assert_called_once_with(49520)
+
+    @mock.patch('steamCLI.session.Session.get')
     def test_should_choose_json_with_success_true(self, mock_get):
         """
         Ensures that _choose_one() method returns a JSON info that has
@@ -168,7 +272,8 @@ class SteamAppFetchTextAssignIDTests(unittest.TestCase):
         fake_r1.json.return_value = {"1": {"success": False}}
         fake_r2.json.return_value = {"2": {"success": False}}
         fake_r3.json.return_value = {"3": {"success": True, "data": {"test": {}}}}
-        mock_get.side_effect = [fake_r1, fake_r2, fake_r3]
+        mock_get.side_effect = _responses_by_appid(fake_r1, fake_r2, fake_r3)
+        self.config.get_int.return_value = 4
         json_data = self.app._pick_complete_json(dict_list)
 
         fake_r1.json.assert_called_once()
@@ -182,7 +287,7 @@ class SteamAppFetchTextAssignIDTests(unittest.TestCase):
         # 2 False, 1 (last) True, hence 3 calls.
         self.assertEqual(mock_get.call_count, 3)
 
-    @mock.patch('steamCLI.steamapp.requests.get')
+    @mock.patch('steamCLI.session.Session.get')
     def test_should_choose_first_true_json(self, mock_get):
         """
         Ensures that _choose_one() method returns a JSON info that has
@@ -207,7 +312,9 @@ class SteamAppFetchTextAssignIDTests(unittest.TestCase):
         fake_r1.json.return_value = app_d1
         fake_r2.json.return_value = app_d2
         fake_r3.json.return_value = app_d3
-        mock_get.side_effect = [fake_r1, fake_r2, fake_r3]
+        mock_get.side_effect = _responses_by_appid(fake_r1, fake_r2, fake_r3)
+        # One probe at a time keeps the order of the list.
+        self.config.get_int.return_value = 1
         json_data = self.app._pick_complete_json(dict_list)
 
         fake_r1.json.assert_called_once()
@@ -220,7 +327,7 @@ class SteamAppFetchTextAssignIDTests(unittest.TestCase):
         # Second dictionary has True value, hence the third one is not reached.
         self.assertEqual(mock_get.call_count, 2)
 
-    @mock.patch('steamCLI.steamapp.requests.get')
+    @mock.patch('steamCLI.session.Session.get')
     def test_should_not_choose_json_when_all_false(self, mock_get):
         """
         Ensures that when dicts passed do not have 'success: True' None is
@@ -228,6 +335,7 @@ class SteamAppFetchTextAssignIDTests(unittest.TestCase):
         """
 
         self.config.get_value.side_effect = ["doesn't matter", "doesn't matter"]
+        self.config.get_int.return_value = 4
         dict_list = [{"appid": 1, "name": "test"}, ]
         fake_response = mock.Mock()
         fake_response.json.return_value = {"1": {"success": False}}
@@ -239,6 +347,49 @@ class SteamAppFetchTextAssignIDTests(unittest.TestCase):
         self.assertEqual(self.config.get_value.call_count, 2)
         self.assertFalse(json_data)
 
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_probe_candidates_concurrently(self, mock_get):
+        """ All three probes have to be in flight at once to pass the barrier. """
+
+        self.config.get_value.side_effect = ["doesn't matter", "doesn't matter"]
+        self.config.get_int.return_value = 3
+        barrier = threading.Barrier(3, timeout=5)
+        dict_list = [{"appid": appid, "name": "test"} for appid in (1, 2, 3)]
+
+        def get(url):
+            appid = re.search(r'(\d+)&cc', url).group(1)
+            barrier.wait()
+            response = mock.Mock()
+            response.json.return_value = {appid: {"success": appid == "2", "data": {"id": appid}}}
+            return response
+
+        mock_get.side_effect = get
+
+        self.assertEqual({"id": "2"}, self.app._pick_complete_json(dict_list))
+
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_not_wait_for_slow_duds(self, mock_get):
+        self.config.get_value.side_effect = ["doesn't matter", "doesn't matter"]
+        self.config.get_int.return_value = 2
+        release = threading.Event()
+        dict_list = [{"appid": 1, "name": "test"}, {"appid": 2, "name": "test"},
+                     {"appid": 3, "name": "test"}]
+
+        def get(url):
+            appid = re.search(r'(\d+)&cc', url).group(1)
+            response = mock.Mock()
+            if appid == "1":
+                release.wait(5)
+            response.json.return_value = {appid: {"success": appid == "2", "data": {}}}
+            return response
+
+        mock_get.side_effect = get
+
+        self.assertEqual({}, self.app._pick_complete_json(dict_list))
+        release.set()
+        # Third candidate is dropped once the second one succeeds.
+        self.assertNotIn(mock.call("doesn't matter3&cc=doesn't matter"), mock_get.call_args_list)
+
     def test_should_not_do_anything_when_empty_list_is_given(self):
         """ Ensure empty list does not break the function. """
 
@@ -371,6 +522,13 @@ class ScrapingTests(unittest.TestCase):
         self.app.appID = 1
         self.url = 'http://www.example.com/'
 
+    @staticmethod
+    def _page_response(*chunks):
+        response = mock.MagicMock(encoding='utf-8')
+        response.__enter__.return_value = response
+        response.iter_content.return_value = iter(chunks)
+        return response
+
     def test_should_not_download_app_html_when_no_url(self):
         self.url = None
 
@@ -381,20 +539,20 @@ class ScrapingTests(unittest.TestCase):
         self.assertFalse(self.app.overall_count)
         self.assertFalse(self.app.overall_percent)
 
-    @mock.patch('steamCLI.steamapp.requests')
-    def test_should_call_with_correct_params(self, req):
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_call_with_correct_params(self, get):
         age_key = 'birth time'
         age_val = 'some val'
         self.config.get_value.side_effect = [age_key, age_val]
-        req.get.return_value = mock.Mock()
+        get.return_value = self._page_response()
 
         self.app._download_app_html(self.url)
 
-        req.get.assert_called_once_with(self.url, cookies={age_key: age_val})
+        get.assert_called_once_with(self.url, cookies={age_key: age_val}, stream=True)
         self.config.get_value.assert_called()
         self.assertEqual(self.config.get_value.call_count, 2)
 
-    @mock.patch('steamCLI.steamapp.requests.get')
+    @mock.patch('steamCLI.session.Session.get')
     def test_should_throw_exception_when_page_non_existent(self, get):
         mocked_response = mock.Mock()
         mocked_response.raise_for_status.side_effect = HTTPError()
@@ -407,22 +565,80 @@ class ScrapingTests(unittest.TestCase):
         self.config.get_value.assert_called()
         self.assertEqual(self.config.get_value.call_count, 2)
 
-    @mock.patch('steamCLI.steamapp.requests.get')
+    @mock.patch('steamCLI.session.Session.get')
     def test_should_return_string_value(self, get):
         text = "pretend this is html"
         key = 'test_age_key'
         value = 'test_age_value'
         self.config.get_value.side_effect = [key, value]
-        mocked_response = mock.Mock()
-        mocked_response.text = text
+        mocked_response = self._page_response(text[:7].encode(), text[7:].encode())
         get.return_value = mocked_response
 
         actual_text = self.app._download_app_html(self.url)
 
         self.assertEqual(text, actual_text)
-        get.assert_called_with(self.url, cookies={key: value})
+        get.assert_called_with(self.url, cookies={key: value}, stream=True)
         self.config.get_value.assert_called()
         self.assertEqual(self.config.get_value.call_count, 2)
+        mocked_response.__exit__.assert_called_once()
+
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_decode_characters_split_between_chunks(self, get):
+        text = 'Астролорды'.encode()
+        get.return_value = self._page_response(text[:3], text[3:])
+
+        self.assertEqual('Астролорды', self.app._download_app_html(self.url))
+
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_stop_reading_when_page_has_enough(self, get):
+        response = self._page_response(b'<a>', b'<b>', b'<c>')
+        get.return_value = response
+
+        html = self.app._download_app_html(self.url, enough=lambda html: '<b>' in html)
+
+        self.assertEqual('<a><b>', html)
+        response.__exit__.assert_called_once()
+
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_stop_reading_when_deadline_runs_out(self, get):
+        deadline = mock.Mock()
+        deadline.expired.side_effect = [False, True]
+        get.return_value = self._page_response(b'<a>', b'<b>', b'<c>')
+
+        html = self.app._download_app_html(self.url, deadline=deadline)
+
+        self.assertEqual('<a><b>', html)
+        self.assertIs(deadline, get.call_args[1]['deadline'])
+
+    def test_should_scrape_what_arrived_when_deadline_cuts_page_short(self):
+        self.config.get_value.return_value = 'value'
+        server = SlowServer()
+        self.addCleanup(server.close)
+        self.app.session = Session(timeout=(1, 10))
+        self.addCleanup(self.app.session.close)
+        self.app.page_chunk_size = 10
+
+        html = self.app._download_app_html(server.url + '/trickle',
+                                           deadline=Deadline(0.3))
+
+        self.assertEqual('x' * 10, html)
+
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_not_read_more_than_max_page_bytes(self, get):
+        self.app.max_page_bytes = 6
+        get.return_value = self._page_response(b'<a>', b'<b>', b'<c>')
+
+        self.assertEqual('<a><b>', self.app._download_app_html(self.url))
+
+    def test_should_have_review_text_once_both_lines_arrived(self):
+        self.config.get_value.side_effect = lambda section, key: {
+            'reviews_element': 'span', 'reviews_class': 'desc'}[key]
+        overall = '<span class="desc">- 85% of the 16,855 user reviews</span>'
+        recent = '<span class="desc">- 90% of the 1,024 user reviews</span>'
+
+        self.assertFalse(self.app._has_review_text(overall))
+        self.assertFalse(self.app._has_review_text(overall + recent[:30]))
+        self.assertTrue(self.app._has_review_text(overall + recent))
 
     def test_should_not_construct_app_steam_page_url_when_no_app_id(self):
         self.app.appID = None
@@ -513,6 +729,54 @@ class ScrapingTests(unittest.TestCase):
         self.config.get_value.assert_called()
         self.assertEqual(self.config.get_value.call_count, 2)
 
+    def _store_page(self, recent, overall):
+        return f'''<html><body>
+                     <div class="user_reviews_summary_row">
+                       <span class="game_review_summary positive">Very Positive</span>
+                       <span class="nonresponsive_hidden responsive_reviewdesc">
+                         {recent}
+                       </span>
+                     </div>
+                     <div class="user_reviews_summary_row">
+                       <span class="nonresponsive_hidden responsive_reviewdesc">
+                         {overall}
+                       </span>
+                     </div>
+                   </body></html>'''
+
+    @mock.patch('steamCLI.steamapp.BeautifulSoup')
+    def test_should_extract_review_text_without_parsing_page(self, m_soup):
+        self.config.get_value.side_effect = ['span', 'nonresponsive_hidden responsive_reviewdesc']
+        html = self._store_page('- 90% of the 1,024 user reviews in the last 30 days are positive.',
+                                '- 85% of the 16,855 user reviews for this game are positive.')
+
+        reviews = self.app._extract_review_text(html)
+
+        self.assertEqual(['- 85% of the 16,855 user reviews for this game are positive.',
+                          '- 90% of the 1,024 user reviews in the last 30 days are positive.'],
+                         reviews)
+        m_soup.assert_not_called()
+
+    def test_should_extract_same_review_text_as_full_parse(self):
+        classes = 'nonresponsive_hidden responsive_reviewdesc'
+        html = self._store_page('- 90% of the 1,024 user reviews &amp; more',
+                                '- 85% of the 16,855 user reviews')
+        self.config.get_value.side_effect = ['span', classes]
+
+        reviews = self.app._extract_review_text(html)
+
+        self.assertEqual(self.app._parse_review_text(html, 'span', classes), reviews)
+
+    @mock.patch.object(SteamApp, '_parse_review_text')
+    def test_should_parse_page_when_reviews_have_markup(self, m_parse):
+        classes = 'nonresponsive_hidden responsive_reviewdesc'
+        self.config.get_value.side_effect = ['span', classes]
+        html = self._store_page('- 90% of the <b>1,024</b> user reviews', '- 85%')
+
+        self.app._extract_review_text(html)
+
+        m_parse.assert_called_once_with(html, 'span', classes)
+
     def test_should_not_extract_app_scores_wit_no_reviews(self):
         scores = self.app._extract_app_scores(reviews=None)
 
@@ -699,3 +963,254 @@ class IsThereAnyDealAPITests(unittest.TestCase):
         self.assertEqual(expected_price, self.app.historical_low)
         m_fetch.assert_called_once()
         m_url.assert_called_once_with(app_title.replace('_', ''), 'uk')
+
+    @mock.patch.object(SteamApp, '_construct_itad_url')
+    @mock.patch.object(SteamApp, '_fetch_resource')
+    def test_should_use_mapped_plain_before_guessing(self, m_fetch, m_url):
+        self.app.plains = mock.Mock()
+        self.app.plains.lookup.return_value = 'counterstrike'
+        self.app.appID = 10
+        self.app.title = 'Counter-Strike'
+        m_fetch.return_value = {'data': {'counterstrike': {'cut': 90, 'price': 0.99,
+                                                           'shop': {'name': 'Steam'}}}}
+
+        self.app.extract_historical_low(region='uk')
+
+        self.app.plains.lookup.assert_called_once_with(10)
+        m_url.assert_called_once_with('counterstrike', 'uk')
+        self.assertEqual(0.99, self.app.historical_low)
+
+    def test_should_guess_plain_when_app_is_not_mapped(self):
+        self.app.plains = mock.Mock()
+        self.app.plains.lookup.return_value = None
+        self.app.appID = 620
+        self.app.title = 'Portal 2'
+
+        self.assertEqual('portalii', self.app.itad_plain())
+
+
+class SteamAppStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.config = mock.Mock(Config)
+        self.store = mock.Mock()
+        self.app = SteamApp(self.config, store=self.store)
+        self.url = 'http://api.example.com/appdetails?appids='
+
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_serve_fresh_data_without_network(self, m_get):
+        self.store.get.return_value = Entry(MOCK_DATA["8"]["data"], False, False)
+
+        data = self.app._probe_app(self.url, 8, 'uk')
+
+        self.assertEqual({}, data)
+        m_get.assert_not_called()
+        self.store.revalidate.assert_not_called()
+
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_store_fetched_data(self, m_get):
+        self.store.get.return_value = None
+        m_get.return_value.json.return_value = MOCK_DATA
+
+        data = self.app._probe_app(self.url, 8, 'uk')
+
+        self.assertEqual({}, data)
+        m_get.assert_called_once_with(self.url + '8&cc=uk')
+        self.store.put.assert_called_once_with(8, 'uk', {})
+
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_not_store_duds(self, m_get):
+        self.store.get.return_value = None
+        m_get.return_value.json.return_value = {"8": {"success": False}}
+
+        self.assertIsNone(self.app._probe_app(self.url, 8, 'uk'))
+        self.store.put.assert_not_called()
+
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_serve_stale_data_and_revalidate(self, m_get):
+        stale = Entry({"name": "old"}, price_stale=False, static_stale=True)
+        self.store.get.return_value = stale
+        m_get.return_value.json.return_value = {"8": {"success": True, "data": {"name": "new"}}}
+
+        data = self.app._probe_app(self.url, 8, 'uk')
+        m_get.assert_not_called()
+        refresh = self.store.revalidate.call_args[0][2]
+        refresh()
+
+        self.assertEqual({"name": "old"}, data)
+        m_get.assert_called_once_with(self.url + '8&cc=uk')
+        self.store.put.assert_called_once_with(8, 'uk', {"name": "new"})
+
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_refresh_only_price_when_rest_is_fresh(self, m_get):
+        self.config.get_value.return_value = 'http://api.example.com/prices?appids='
+        stale = Entry({"name": "old"}, price_stale=True, static_stale=False)
+        prices = {"currency": "GBP", "initial": 1999, "final": 999}
+        m_get.return_value.json.return_value = {"8": {"success": True, "data": {"price_overview": prices}}}
+
+        self.app._refresh_stored_app(self.url, 8, 'uk', stale)
+
+        m_get.assert_called_once_with('http://api.example.com/prices?appids=8&cc=uk')
+        self.store.put_price.assert_called_once_with(8, 'uk', prices)
+        self.store.put.assert_not_called()
+
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_remember_duds(self, m_get):
+        self.store.get.return_value = None
+        m_get.return_value.json.return_value = {"8": {"success": False}}
+
+        self.app._probe_app(self.url, 8, 'uk')
+
+        self.store.add_failure.assert_called_once_with(8, 'uk')
+
+
+class SteamAppDuplicateTitleStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.config = mock.Mock(Config)
+        self.config.get_value.return_value = 'http://api.example.com/appdetails?appids='
+        self.config.get_int.return_value = 4
+        self.store = mock.Mock()
+        self.store.get.return_value = None
+        self.store.failures.return_value = set()
+        self.store.resolution.return_value = None
+        self.app = SteamApp(self.config, store=self.store)
+        self.dicts = [{"appid": appid, "name": "Borderlands"}
+                      for appid in (8950, 8980, 8989)]
+
+    @staticmethod
+    def _answer(good):
+        def get(url):
+            appid = re.search(r'(\d+)&cc', url).group(1)
+            response = mock.Mock()
+            response.json.return_value = {appid: {"success": int(appid) == good, "data": {"id": appid}}}
+            return response
+
+        return get
+
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_remember_which_candidate_answered(self, m_get):
+        m_get.side_effect = self._answer(8980)
+
+        data = self.app._pick_complete_json(self.dicts, region='uk')
+
+        self.assertEqual({"id": "8980"}, data)
+        self.store.resolution.assert_called_once_with('borderlands', 'uk')
+        self.store.resolve.assert_called_once_with('borderlands', 'uk', 8980)
+
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_skip_known_duds(self, m_get):
+        self.store.failures.return_value = {8950, 8989}
+        m_get.side_effect = self._answer(8980)
+
+        self.app._pick_complete_json(self.dicts, region='uk')
+
+        m_get.assert_called_once_with('http://api.example.com/appdetails?appids=8980&cc=uk')
+        self.store.failures.assert_called_once_with([8950, 8980, 8989], 'uk')
+
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_go_straight_to_resolved_candidate(self, m_get):
+        self.store.resolution.return_value = 8989
+        m_get.side_effect = self._answer(8989)
+
+        data = self.app._pick_complete_json(self.dicts, region='uk')
+
+        self.assertEqual({"id": "8989"}, data)
+        m_get.assert_called_once_with('http://api.example.com/appdetails?appids=8989&cc=uk')
+        self.store.resolve.assert_not_called()
+
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_probe_others_when_resolved_candidate_fails(self, m_get):
+        self.store.resolution.return_value = 8989
+        m_get.side_effect = self._answer(8950)
+
+        data = self.app._pick_complete_json(self.dicts, region='uk')
+
+        self.assertEqual({"id": "8950"}, data)
+        self.store.add_failure.assert_any_call(8989, 'uk')
+        self.store.resolve.assert_called_once_with('borderlands', 'uk', 8950)
+
+    @mock.patch('steamCLI.session.Session.get')
+    def test_should_not_probe_when_all_candidates_are_duds(self, m_get):
+        self.store.failures.return_value = {8950, 8980, 8989}
+
+        self.assertIsNone(self.app._pick_complete_json(self.dicts, region='uk'))
+        m_get.assert_not_called()
+
+
+class ReviewSummaryTests(unittest.TestCase):
+    def setUp(self):
+        self.config = mock.Mock(Config)
+        self.config.get_value.side_effect = lambda section, key: {
+            'reviews_source': 'summary',
+            'appreviews': 'http://api.example.com/appreviews/[id]?json=1',
+            'recent_days': '30',
+        }[key]
+        self.app = SteamApp(self.config)
+        self.app.appID = 49520
+
+    @staticmethod
+    def _summary(total, positive):
+        return {"success": 1, "query_summary": {
+            "total_reviews": total, "total_positive": positive,
+            "total_negative": total - positive, "review_score_desc": "Very Positive"}}
+
+    @mock.patch.object(SteamApp, 'scrape_app_page')
+    @mock.patch.object(SteamApp, 'fetch_review_summary')
+    def test_should_use_configured_source(self, m_summary, m_scrape):
+        self.app.retrieve_review_scores()
+
+        m_summary.assert_called_once()
+        m_scrape.assert_not_called()
+
+    @mock.patch.object(SteamApp, 'scrape_app_page')
+    @mock.patch.object(SteamApp, 'fetch_review_summary')
+    def test_should_scrape_page_by_default(self, m_summary, m_scrape):
+        self.config.get_value.side_effect = None
+        self.config.get_value.return_value = 'page'
+
+        self.app.retrieve_review_scores()
+
+        m_scrape.assert_called_once()
+        m_summary.assert_not_called()
+
+    @mock.patch.object(SteamApp, '_fetch_resource')
+    def test_should_assign_overall_and_recent_scores(self, m_fetch):
+        m_fetch.side_effect = lambda url, text, deadline: (
+            self._summary(1024, 922) if 'day_range' in url else self._summary(16855, 14327))
+
+        self.app.fetch_review_summary()
+
+        self.assertEqual('16,855', self.app.overall_count)
+        self.assertEqual('85%', self.app.overall_percent)
+        self.assertEqual('1,024', self.app.recent_count)
+        self.assertEqual('90%', self.app.recent_percent)
+        m_fetch.assert_any_call('http://api.example.com/appreviews/49520?json=1', text=False,
+                                deadline=None)
+        m_fetch.assert_any_call('http://api.example.com/appreviews/49520?json=1&filter=all&day_range=30',
+                                text=False, deadline=None)
+
+    @mock.patch.object(SteamApp, '_fetch_resource')
+    def test_should_not_assign_scores_without_reviews(self, m_fetch):
+        m_fetch.return_value = self._summary(0, 0)
+
+        self.app.fetch_review_summary()
+
+        self.assertIsNone(self.app.overall_count)
+        self.assertIsNone(self.app.recent_count)
+
+    @mock.patch.object(SteamApp, '_fetch_resource')
+    def test_should_not_assign_recent_scores_without_recent_reviews(self, m_fetch):
+        m_fetch.side_effect = lambda url, text, deadline: (
+            self._summary(0, 0) if 'day_range' in url else self._summary(10, 5))
+
+        self.app.fetch_review_summary()
+
+        self.assertEqual('50%', self.app.overall_percent)
+        self.assertIsNone(self.app.recent_count)
+
+    @mock.patch.object(SteamApp, '_fetch_resource')
+    def test_should_not_fetch_summary_without_id(self, m_fetch):
+        self.app.appID = None
+
+        self.app.fetch_review_summary()
+
+        m_fetch.assert_not_called()
@@ -0,0 +1,150 @@
+# To run single test module:
+# >>> python -m unittest test.test_some_module
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from requests import HTTPError
+
+from steamCLI.store import AppDetailsStore
+
+PRICES = {'currency': 'GBP', 'initial': 1999, 'final': 999}
+DATA = {'steam_appid': 8, 'name': 'winui2', 'price_overview': PRICES}
+
+
+class AppDetailsStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'appdetails.sqlite')
+        self.store = AppDetailsStore(self.path, price_ttl=60, static_ttl=600)
+
+    def tearDown(self):
+        self.store.wait()
+        shutil.rmtree(self.directory)
+
+    def _age(self, column, seconds, table='appdetails'):
+        self.store._db.execute(f'UPDATE {table} SET {column} = ?',
+                               (time.time() - seconds,))
+
+    def test_should_create_store_from_config(self):
+        config = mock.Mock()
+        config.get_value.return_value = self.directory
+        config.get_int.side_effect = [30, 300, 3000]
+
+        store = AppDetailsStore.from_config(config)
+
+        self.assertEqual(self.path, store.path)
+        self.assertEqual(30, store.price_ttl)
+        self.assertEqual(300, store.static_ttl)
+        self.assertEqual(3000, store.failure_ttl)
+
+    def test_should_not_get_unknown_app(self):
+        self.assertIsNone(self.store.get(8, 'uk'))
+
+    def test_should_get_fresh_app_data(self):
+        self.store.put(8, 'uk', DATA)
+
+        entry = self.store.get(8, 'uk')
+
+        self.assertEqual(DATA, entry.data)
+        self.assertFalse(entry.stale)
+
+    def test_should_key_data_by_region(self):
+        self.store.put(8, 'uk', DATA)
+
+        self.assertIsNone(self.store.get(8, 'us'))
+
+    def test_should_keep_data_between_runs(self):
+        self.store.put(8, 'uk', DATA)
+
+        other = AppDetailsStore(self.path, price_ttl=60, static_ttl=600)
+
+        self.assertEqual(DATA, other.get(8, 'uk').data)
+
+    def test_should_store_apps_without_price(self):
+        free = {'steam_appid': 8, 'name': 'winui2'}
+        self.store.put(8, 'uk', free)
+
+        self.assertEqual(free, self.store.get(8, 'uk').data)
+
+    def test_should_expire_price_before_static_data(self):
+        self.store.put(8, 'uk', DATA)
+        self._age('price_fetched', 120)
+        self._age('static_fetched', 120)
+
+        entry = self.store.get(8, 'uk')
+
+        self.assertTrue(entry.price_stale)
+        self.assertFalse(entry.static_stale)
+        self.assertTrue(entry.stale)
+
+    def test_should_replace_price_only(self):
+        self.store.put(8, 'uk', DATA)
+        self._age('price_fetched', 120)
+        self._age('static_fetched', 120)
+        cheaper = dict(PRICES, final=499)
+
+        self.store.put_price(8, 'uk', cheaper)
+        entry = self.store.get(8, 'uk')
+
+        self.assertEqual(cheaper, entry.data['price_overview'])
+        self.assertFalse(entry.price_stale)
+
+    def test_should_revalidate_in_background(self):
+        refresh = mock.Mock()
+
+        self.store.revalidate(8, 'uk', refresh)
+        self.store.wait()
+
+        refresh.assert_called_once()
+
+    def test_should_not_revalidate_same_entry_twice_at_once(self):
+        release = threading.Event()
+        refresh = mock.Mock(side_effect=lambda: release.wait(5))
+
+        self.store.revalidate(8, 'uk', refresh)
+        self.store.revalidate(8, 'uk', refresh)
+        release.set()
+        self.store.wait()
+
+        refresh.assert_called_once()
+
+    def test_should_swallow_failed_revalidation(self):
+        self.store.revalidate(8, 'uk', mock.Mock(side_effect=HTTPError()))
+        self.store.wait()
+
+        refresh = mock.Mock()
+        self.store.revalidate(8, 'uk', refresh)
+        self.store.wait()
+
+        refresh.assert_called_once()
+
+    def test_should_remember_failures_per_region(self):
+        self.store.add_failure(8950, 'uk')
+        self.store.add_failure(8989, 'uk')
+
+        self.assertEqual({8950, 8989}, self.store.failures([8950, 8980, 8989], 'uk'))
+        self.assertEqual(set(), self.store.failures([8950], 'us'))
+
+    def test_should_forget_old_failures(self):
+        self.store.add_failure(8950, 'uk')
+        self._age('failed', 1200, table='failures')
+
+        self.assertEqual(set(), self.store.failures([8950], 'uk'))
+
+    def test_should_remember_resolved_titles(self):
+        self.store.resolve('borderlands', 'uk', 8980)
+
+        self.assertEqual(8980, self.store.resolution('borderlands', 'uk'))
+        self.assertIsNone(self.store.resolution('borderlands', 'us'))
+
+    def test_should_forget_old_resolutions(self):
+        self.store.resolve('borderlands', 'uk', 8980)
+        self._age('resolved', 1200, table='resolutions')
+
+        self.assertIsNone(self.store.resolution('borderlands', 'uk'))
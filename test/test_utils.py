@@ -3,7 +3,8 @@
 
 import unittest
 
-from steamCLI.utils import sanitize_title, calculate_discount, remove_articles
+from steamCLI.utils import (calculate_discount, remove_articles, sanitize_title,
+                            sanitize_titles)
 
 
 class SanitizeTitlesTests(unittest.TestCase):
@@ -46,6 +47,22 @@ class SanitizeTitlesTests(unittest.TestCase):
         self.assertEqual(expected_title, actual_title)
 
 
+class BulkSanitizeTitlesTests(unittest.TestCase):
+    def test_should_match_sanitize_title(self):
+        titles = ['special®char#another', 'LOWErCASE', '131', 'rocketleague 2015',
+                  'The Witcher 3: Wild Hunt', 'THE the theatre Bathe', 'the',
+                  'Zoo\ttHe\xa0Tycoon', 'Half-Life 2: Episode One', '\u212avelvin',
+                  'Астролорды: Оружие Пришельцев', 'İstanbul 1453', '', '   ']
+
+        self.assertEqual([sanitize_title(title) for title in titles],
+                         list(sanitize_titles(titles)))
+
+    def test_should_be_lazy(self):
+        titles = sanitize_titles(iter(['Portal 2', None]))
+
+        self.assertEqual('portalii', next(titles))
+
+
 class RemoveArticlesTests(unittest.TestCase):
     """ Test suite to ensure that articles are properly removed from titles. """
 
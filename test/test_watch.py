@@ -0,0 +1,133 @@
+# To run single test module:
+# >>> python -m unittest test.test_some_module
+
+import argparse
+import io
+import json
+import unittest
+from unittest import mock
+
+from requests import HTTPError
+
+from steamCLI.steamapp import SteamApp
+from steamCLI.watch import Watcher, parse_interval, resolve_apps
+
+URL = 'http://api.example.com/applist/'
+
+
+class ParseIntervalTests(unittest.TestCase):
+    def test_should_convert_units_to_seconds(self):
+        self.assertEqual([90, 30, 900, 21600, 86400, 5400],
+                         [parse_interval(value) for value in ('90', '30s', '15m', '6H', '1d', '1.5h')])
+
+    def test_should_reject_invalid_intervals(self):
+        for value in ('', 'soon', '15 minutes', '0', '-5m'):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_interval(value)
+
+
+class ResolveAppsTests(unittest.TestCase):
+    def test_should_split_found_apps_from_missing_ones(self):
+        def make_app():
+            app = SteamApp(config=mock.Mock())
+
+            def find_app(origin, region, title=None, app_id=None, deadline=None):
+                if app_id == 10:
+                    app.appID = 10
+                elif title == 'Broken':
+                    raise HTTPError("Resource not found.")
+            app.find_app = find_app
+            return app
+
+        apps, missing = resolve_apps([(None, 10), ('Nope', None), ('Broken', None)],
+                                     make_app, URL, workers=2)
+
+        self.assertEqual([10], [app.appID for app in apps])
+        self.assertEqual(['Nope', 'Broken'], missing)
+
+
+class WatcherTests(unittest.TestCase):
+    def setUp(self):
+        self.apps = []
+        for appid, title in ((10, 'Counter-Strike'), (20, 'Team Fortress Classic')):
+            app = SteamApp(config=mock.Mock())
+            app.appID, app.title = appid, title
+            app.retrieve_review_scores = mock.Mock()
+            self.apps.append(app)
+        self.prices = {10: (999, 0), 20: (499, 0)}
+        self.catalog = mock.Mock()
+        self.catalog.assign_prices.side_effect = self._assign_prices
+        self.output = io.StringIO()
+        self.watcher = Watcher(self.apps, self.catalog, region='uk', output=self.output)
+
+    def _assign_prices(self, apps, region):
+        for app in apps:
+            app.final_price, app.discount = self.prices[app.appID]
+
+    def _records(self):
+        records = [json.loads(line) for line in self.output.getvalue().splitlines()]
+        self.output.seek(0)
+        self.output.truncate()
+        return records
+
+    def test_should_write_every_app_in_first_cycle(self):
+        changed = self.watcher.poll()
+
+        self.assertEqual(self.apps, changed)
+        self.assertEqual([10, 20], [record['appid'] for record in self._records()])
+        self.catalog.assign_prices.assert_called_once_with(self.apps, region='uk')
+
+    def test_should_write_only_apps_whose_price_changed(self):
+        self.watcher.poll()
+        self._records()
+        self.prices[20] = (249, -50)
+
+        self.watcher.poll()
+        self.watcher.poll()
+
+        records = self._records()
+        self.assertEqual(1, len(records))
+        self.assertEqual({'cycle': 2, 'appid': 20, 'final_price': 249, 'discount': -50,
+                          'previous_final_price': 499, 'previous_discount': 0},
+                         {key: records[0][key] for key in ('cycle', 'appid', 'final_price', 'discount',
+                                                           'previous_final_price',
+                                                           'previous_discount')})
+
+    @mock.patch('time.monotonic')
+    def test_should_refresh_scores_and_lows_on_their_own_cadences(self, m_time):
+        self.watcher.scores_interval = 100
+        self.watcher.historical_interval = 1000
+
+        for now in (0, 50, 100, 500, 1000):
+            m_time.return_value = now
+            self.watcher.poll()
+
+        self.assertEqual(4, self.apps[0].retrieve_review_scores.call_count)
+        self.assertEqual(2, self.catalog.assign_historical_lows.call_count)
+        self.assertIn('overall_count', self._records()[0])
+
+    def test_should_stop_polling_lows_without_api_key(self):
+        self.watcher.historical_interval = 1
+        self.catalog.assign_historical_lows.side_effect = KeyError()
+
+        self.watcher.poll()
+
+        self.assertIsNone(self.watcher.historical_interval)
+        self.assertEqual("API key was not found", self._records()[0]['error'])
+
+    def test_should_report_failed_poll_and_keep_going(self):
+        self.catalog.assign_prices.side_effect = HTTPError("Too many requests, try again later.")
+
+        self.assertEqual([], self.watcher.poll())
+        self.assertEqual([{'cycle': 1, 'error': "Too many requests, try again later."}],
+                         self._records())
+
+    @mock.patch('time.sleep')
+    def test_should_run_given_number_of_cycles(self, m_sleep):
+        self.watcher.interval = 60
+
+        self.watcher.run(cycles=3)
+
+        self.assertEqual(3, self.catalog.assign_prices.call_count)
+        self.assertEqual(2, m_sleep.call_count)
+        self.assertLessEqual(m_sleep.call_args[0][0], 60)